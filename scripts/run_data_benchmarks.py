@@ -0,0 +1,356 @@
+import sys
+import os
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from utils import set_path_to_imports
+
+# Set up paths
+root_dir = set_path_to_imports()
+
+try:
+    import numpy as np
+    import pandas as pd
+    from internal.data_retrieval.adapters.datasus_loader_csv import DatasusCsvAdapter
+    from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+    from internal.data_retrieval.analytics_db import build_analytics_db, open_analytics_db, write_analytics_tables
+    from internal.data_retrieval.sql_engines import open_duckdb_frame, DUCKDB_INSTALLED
+    from sqlalchemy import create_engine
+    from langchain_community.utilities import SQLDatabase
+    from src.domain.sars.frame_schema import parse_dates
+    from src.domain.sars.cleaning import clean_srag_frame, latest_date
+except ImportError as e:
+    print(f"Import Error: {e}")
+    print("Ensure you are running this script from the 'scripts' directory.")
+    sys.exit(1)
+
+
+# ----------------------------------------------------------------------
+# Measurement helpers
+# ----------------------------------------------------------------------
+# Every loader runs in a fresh (spawned) process, so ru_maxrss is the peak
+# RSS of that loader alone and not of whatever ran before it.
+
+def _measure_in_child(func, *args):
+    start = time.perf_counter()
+    rows = func(*args)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"rows": rows, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024}
+
+
+def measure(func, *args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_measure_in_child, (func, *args))
+
+
+def print_table(title: str, results: dict):
+    print(f"\n{title}")
+    print(f"{'loader':<28}{'rows':>12}{'wall (s)':>12}{'peak RSS (MB)':>16}")
+    print("-" * 68)
+    for name, r in results.items():
+        print(f"{name:<28}{r['rows']:>12}{r['seconds']:>12.2f}{r['peak_rss_mb']:>16.1f}")
+
+
+# ----------------------------------------------------------------------
+# CSV ingestion: full read vs. streaming
+# ----------------------------------------------------------------------
+
+def _legacy_csv_load(path: str) -> int:
+    # Mirrors the original DatasusCsvAdapter: full read, then column selection.
+    df = pd.read_csv(path, sep=';', encoding='latin1')
+    df = df[['DT_NOTIFIC', 'EVOLUCAO', 'DT_INTERNA', 'UTI', 'VACINA']]
+    return len(df)
+
+
+def _streaming_csv_load(path: str, chunksize: int) -> int:
+    return len(DatasusCsvAdapter(path, chunksize=chunksize).get_raw_srag_data())
+
+
+def _streaming_sqlite_write(path: str, chunksize: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        return DatasusCsvAdapter(path, chunksize=chunksize).write_to_sqlite(os.path.join(tmp, "bench.db"))
+
+
+def bench_csv(args):
+    results = {
+        "legacy read_csv (all cols)": measure(_legacy_csv_load, args.path),
+        "streaming -> DataFrame": measure(_streaming_csv_load, args.path, args.chunksize),
+        "streaming -> SQLite": measure(_streaming_sqlite_write, args.path, args.chunksize),
+    }
+    print_table(f"CSV ingestion: {args.path} (chunksize={args.chunksize})", results)
+
+
+# ----------------------------------------------------------------------
+# In-memory representation: legacy object/float frame vs compact schema
+# ----------------------------------------------------------------------
+
+def _load_legacy_frame(path: str) -> pd.DataFrame:
+    """The frame as the adapters returned it before the compact schema."""
+    if path.endswith(".db"):
+        df = SqliteSragAdapter(f"sqlite:///{os.path.abspath(path)}")._query_srag_data()
+    else:
+        df = pd.read_csv(path, sep=';', encoding='latin1', usecols=['DT_NOTIFIC', 'EVOLUCAO', 'UTI', 'VACINA'])
+    df['UTI'] = df['UTI'].fillna(9)
+    return df
+
+
+def _synthetic_scale(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Repeats the frame `factor` times, shifting each copy back by one year."""
+    parts = []
+    dates = parse_dates(df['DT_NOTIFIC'])
+    for i in range(factor):
+        part = df.copy()
+        part['DT_NOTIFIC'] = (dates - pd.DateOffset(years=i)).dt.strftime('%Y-%m-%d')
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _legacy_node_date_prep(df: pd.DataFrame) -> float:
+    """Date prep MetricsAnalystNode/ChartCalculatorNode did on the legacy frame."""
+    start = time.perf_counter()
+    df_analysis = df.copy()
+    df_analysis['DT_NOTIFIC'] = pd.to_datetime(df_analysis['DT_NOTIFIC'], errors='coerce')
+    df_analysis['DT_NOTIFIC'].max()
+    return time.perf_counter() - start
+
+
+def _compact_node_date_prep(df: pd.DataFrame) -> float:
+    """Date prep the nodes do on the cleaned frame: read the cached anchor, no copy."""
+    start = time.perf_counter()
+    latest_date(df)
+    return time.perf_counter() - start
+
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def bench_compact(args):
+    base = _load_legacy_frame(args.path)
+    datasets = {"real": base, f"synthetic x{args.scale}": _synthetic_scale(base, args.scale)}
+
+    print(f"\nCompact schema: {args.path}")
+    print(f"{'dataset':<16}{'rows':>12}{'legacy MB':>12}{'compact MB':>12}{'legacy prep (ms)':>18}{'compact prep (ms)':>19}{'clean (ms)':>14}")
+    print("-" * 103)
+    for name, legacy in datasets.items():
+        start = time.perf_counter()
+        compact = clean_srag_frame(legacy)
+        convert = time.perf_counter() - start
+
+        legacy_prep = np.median([_legacy_node_date_prep(legacy) for _ in range(args.repeat)])
+        compact_prep = np.median([_compact_node_date_prep(compact) for _ in range(args.repeat)])
+        print(
+            f"{name:<16}{len(legacy):>12}{_frame_mb(legacy):>12.1f}{_frame_mb(compact):>12.1f}"
+            f"{legacy_prep * 1000:>18.1f}{compact_prep * 1000:>19.1f}{convert * 1000:>14.1f}"
+        )
+
+
+# ----------------------------------------------------------------------
+# SQL agents' database: per-node :memory: copies vs shared analytics DB
+# ----------------------------------------------------------------------
+
+# Representative agent queries (metrics + both charts).
+AGENT_QUERIES = {
+    "mortality": "SELECT 100.0 * SUM(EVOLUCAO = 2) / SUM(EVOLUCAO IN (1, 2, 3)) FROM srag_records",
+    "daily 30d": "SELECT DT_NOTIFIC, COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= '{start_30d}' GROUP BY DT_NOTIFIC",
+    "monthly 12m": "SELECT substr(DT_NOTIFIC, 1, 7), COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= '{start_12m}' GROUP BY 1",
+    "icu count": "SELECT COUNT(*) FROM srag_records WHERE UTI = 1",
+}
+
+# The same answers from the srag_daily rollup.
+ROLLUP_QUERIES = {
+    "mortality": "SELECT SUM(n_deaths) * 100.0 / SUM(n_closed) FROM srag_daily",
+    "daily 30d": "SELECT date, n_cases FROM srag_daily WHERE date >= '{start_30d}'",
+    "monthly 12m": "SELECT substr(date, 1, 7), SUM(n_cases) FROM srag_daily WHERE date >= '{start_12m}' GROUP BY 1",
+    "icu count": "SELECT SUM(n_icu) FROM srag_daily",
+}
+
+
+def _ephemeral_db(df: pd.DataFrame) -> SQLDatabase:
+    # Mirrors the nodes' _create_ephemeral_db.
+    engine = create_engine("sqlite:///:memory:")
+    write_analytics_tables(df, engine)
+    return SQLDatabase(engine=engine)
+
+
+def _time_queries(db: SQLDatabase, latest: pd.Timestamp, repeat: int, queries: dict = AGENT_QUERIES) -> dict:
+    params = {
+        "start_30d": (latest - pd.Timedelta(days=30)).strftime('%Y-%m-%d'),
+        "start_12m": (latest - pd.DateOffset(months=12)).strftime('%Y-%m-%d'),
+    }
+    timings = {}
+    for name, sql in queries.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.run(sql.format(**params))
+            runs.append(time.perf_counter() - start)
+        timings[name] = float(np.median(runs))
+    return timings
+
+
+def bench_analytics(args):
+    base = clean_srag_frame(_load_legacy_frame(args.path))
+    datasets = {"real": base, f"synthetic x{args.scale}": clean_srag_frame(_synthetic_scale(base, args.scale))}
+
+    print(f"\nAgent DB setup per run (2 SQL nodes in parallel): {args.path}")
+    print(f"{'dataset':<16}{'rows':>12}{'2x :memory: (s)':>18}{'first build (s)':>18}{'reuse (s)':>12}")
+    print("-" * 76)
+    query_rows = []
+    for name, df in datasets.items():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            start = time.perf_counter()
+            list(pool.map(_ephemeral_db, [df, df]))
+            legacy = time.perf_counter() - start
+        # A :memory: engine is per thread: query one built on this thread.
+        ephemeral = _ephemeral_db(df)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            db_path = build_analytics_db(df, tmp)
+            first = time.perf_counter() - start
+
+            start = time.perf_counter()
+            build_analytics_db(df, tmp)
+            shared = [open_analytics_db(db_path) for _ in range(2)][0]
+            reuse = time.perf_counter() - start
+
+            latest = latest_date(df)
+            query_rows.append((
+                name,
+                _time_queries(ephemeral, latest, args.repeat),
+                _time_queries(shared, latest, args.repeat),
+                _time_queries(shared, latest, args.repeat, ROLLUP_QUERIES),
+            ))
+
+        print(f"{name:<16}{len(df):>12}{legacy:>18.2f}{first:>18.2f}{reuse:>12.3f}")
+
+    print("\nQuery latency, median ms (:memory: without indexes / analytics DB / srag_daily rollup)")
+    print(f"{'dataset':<16}" + "".join(f"{q:>26}" for q in AGENT_QUERIES))
+    print("-" * (16 + 26 * len(AGENT_QUERIES)))
+    for name, before, after, rollup in query_rows:
+        cells = "".join(
+            f"{f'{before[q] * 1000:.1f} / {after[q] * 1000:.1f} / {rollup[q] * 1000:.1f}':>26}" for q in AGENT_QUERIES
+        )
+        print(f"{name:<16}{cells}")
+
+
+# ----------------------------------------------------------------------
+# SQL engine behind the agents: SQLite analytics DB vs DuckDB
+# ----------------------------------------------------------------------
+
+# The same agent queries, written in each engine's dialect.
+ENGINE_QUERIES = {
+    "sqlite": {
+        "mortality": AGENT_QUERIES["mortality"],
+        "daily 30d": AGENT_QUERIES["daily 30d"],
+        "monthly 12m": "SELECT strftime('%Y-%m', DT_NOTIFIC), COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= '{start_12m}' GROUP BY 1",
+        "by outcome": "SELECT EVOLUCAO, COUNT(*) FROM srag_records GROUP BY EVOLUCAO",
+    },
+    "duckdb": {
+        "mortality": "SELECT 100.0 * COUNT(*) FILTER (EVOLUCAO = 2) / COUNT(*) FILTER (EVOLUCAO IN (1, 2, 3)) FROM srag_records",
+        "daily 30d": "SELECT DT_NOTIFIC, COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= DATE '{start_30d}' GROUP BY DT_NOTIFIC",
+        "monthly 12m": "SELECT strftime(DT_NOTIFIC, '%Y-%m'), COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= DATE '{start_12m}' GROUP BY 1",
+        "by outcome": "SELECT EVOLUCAO, COUNT(*) FROM srag_records GROUP BY EVOLUCAO",
+    },
+}
+
+
+def _synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A cleaned SRAG frame of `rows` rows spread over the last ~5 years."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp('2025-06-30')
+    days = rng.integers(0, 5 * 365, rows)
+    df = pd.DataFrame({
+        'DT_NOTIFIC': (end - pd.to_timedelta(days, unit='D')).astype('datetime64[s]'),
+        'EVOLUCAO': rng.choice(np.array([1, 2, 3, 9], dtype=np.uint8), rows, p=[0.6, 0.2, 0.05, 0.15]),
+        'UTI': rng.choice(np.array([1, 2, 9], dtype=np.uint8), rows, p=[0.3, 0.5, 0.2]),
+        'VACINA': rng.choice(np.array([1, 2, 9], dtype=np.uint8), rows, p=[0.4, 0.3, 0.3]),
+    })
+    return clean_srag_frame(df, reference_date=end)
+
+
+def _time_engine_queries(db: SQLDatabase, queries: dict, latest: pd.Timestamp, repeat: int) -> dict:
+    params = {
+        "start_30d": (latest - pd.Timedelta(days=30)).strftime('%Y-%m-%d'),
+        "start_12m": (latest - pd.DateOffset(months=12)).strftime('%Y-%m-%d'),
+    }
+    db.run(queries["mortality"].format(**params))  # warm-up (page cache / first scan)
+    timings = {}
+    for name, sql in queries.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.run(sql.format(**params))
+            runs.append(time.perf_counter() - start)
+        timings[name] = float(np.median(runs))
+    return timings
+
+
+def bench_engines(args):
+    if not DUCKDB_INSTALLED:
+        print("DuckDB is not installed. Run: pip install duckdb duckdb-engine")
+        return
+
+    names = list(ENGINE_QUERIES["sqlite"])
+    print("\nAgent query latency, median ms (SQLite analytics DB / DuckDB)")
+    print(f"{'rows':>12}{'setup (s)':>18}" + "".join(f"{q:>22}" for q in names))
+    print("-" * (30 + 22 * len(names)))
+
+    for rows in args.sizes:
+        df = _synthetic_frame(rows)
+        latest = latest_date(df)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            sqlite_db = open_analytics_db(build_analytics_db(df, tmp))
+            sqlite_setup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            duck_db = open_duckdb_frame(df)
+            duck_setup = time.perf_counter() - start
+
+            sqlite_t = _time_engine_queries(sqlite_db, ENGINE_QUERIES["sqlite"], latest, args.repeat)
+            duck_t = _time_engine_queries(duck_db, ENGINE_QUERIES["duckdb"], latest, args.repeat)
+
+        setup = f"{sqlite_setup:.1f} / {duck_setup:.1f}"
+        cells = "".join(f"{f'{sqlite_t[q] * 1000:.1f} / {duck_t[q] * 1000:.1f}':>22}" for q in names)
+        print(f"{rows:>12}{setup:>18}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data layer benchmarks for the SRAG pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    csv_parser = sub.add_parser("csv", help="Legacy vs streaming DATASUS CSV ingestion.")
+    csv_parser.add_argument("path", help="INFLUD CSV or the DATASUS .zip archive")
+    csv_parser.add_argument("--chunksize", type=int, default=50_000)
+    csv_parser.set_defaults(func=bench_csv)
+
+    compact_parser = sub.add_parser("compact", help="Memory and per-node parse time: legacy vs cleaned compact frame.")
+    compact_parser.add_argument("path", help="SRAG SQLite DB (.db) or INFLUD CSV/.zip")
+    compact_parser.add_argument("--scale", type=int, default=10, help="Size of the synthetic dataset (x real)")
+    compact_parser.add_argument("--repeat", type=int, default=5)
+    compact_parser.set_defaults(func=bench_compact)
+
+    analytics_parser = sub.add_parser("analytics", help="Per-node :memory: DBs vs the shared, indexed analytics DB.")
+    analytics_parser.add_argument("path", help="SRAG SQLite DB (.db) or INFLUD CSV/.zip")
+    analytics_parser.add_argument("--scale", type=int, default=10, help="Size of the synthetic dataset (x real)")
+    analytics_parser.add_argument("--repeat", type=int, default=5)
+    analytics_parser.set_defaults(func=bench_analytics)
+
+    engines_parser = sub.add_parser("engines", help="Agent query latency: SQLite analytics DB vs DuckDB.")
+    engines_parser.add_argument("--sizes", type=int, nargs="+", default=[165_000, 2_000_000, 20_000_000])
+    engines_parser.add_argument("--repeat", type=int, default=5)
+    engines_parser.set_defaults(func=bench_engines)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import sys
+import argparse
+from utils import set_path_to_imports
+
+# Set up paths
+root_dir = set_path_to_imports()
+
+try:
+    from settings import settings
+    from internal.data_retrieval.adapters.datasus_loader_csv import DatasusCsvAdapter
+    from internal.data_retrieval.adapters.incremental_loader import IncrementalSragIngestor
+except ImportError as e:
+    print(f"Import Error: {e}")
+    print("Ensure you are running this script from the 'scripts' directory.")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Turns a DATASUS INFLUD drop (CSV or .zip) into the SQLite DB used by the pipeline."
+    )
+    parser.add_argument("source", help="Path to the INFLUD CSV or the DATASUS .zip archive")
+    parser.add_argument("--db", default=str(settings.DB_PATH), help="Target SQLite file")
+    parser.add_argument("--table", default="srag_records", help="Target table name")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Rows per streamed chunk")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Upsert only new/changed records (watermark-based) instead of rebuilding the table",
+    )
+    args = parser.parse_args()
+
+    if args.incremental:
+        ingestor = IncrementalSragIngestor(args.db, table_name=args.table)
+        result = ingestor.ingest(args.source, chunksize=args.chunksize)
+        print(f"Affected date ranges: {result.affected_ranges}")
+        return
+
+    adapter = DatasusCsvAdapter(args.source, chunksize=args.chunksize)
+    adapter.write_to_sqlite(args.db, table_name=args.table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+from utils import set_path_to_imports
+
+# Set up paths
+root_dir = set_path_to_imports()
+
+try:
+    from settings import settings
+    from workflows.factory import WorkflowFactory
+    from workflows.srag_linear_workflow import SragWorkflow as LinearWorkflow
+    from workflows.srag_parallel_workflow import SragWorkflow as ParallelWorkflow
+    from workflows.srag_conditional_workflow import SragWorkflow as ConditionalWorkflow
+    from internal.llm_usage import RUN_SUMMARY_SUFFIX
+except ImportError as e:
+    print(f"Import Error: {e}")
+    print("Ensure you are running this script from the 'scripts' directory.")
+    sys.exit(1)
+
+# Record a real run once, then replay it offline as often as needed:
+#   python run_workflow_benchmarks.py record
+#   python run_workflow_benchmarks.py replay --latency 0.5 --repeat 3
+# Replayed runs make no LLM or search calls, so timings only vary with the
+# code under test (and the simulated latency).
+
+WORKFLOWS = {
+    "linear": LinearWorkflow,
+    "parallel": ParallelWorkflow,
+    "conditional": ConditionalWorkflow,
+}
+
+
+def benchmark_config(args):
+    """Factory config in fixture mode, without the caches that would hide LLM calls."""
+    return WorkflowFactory.get_config().model_copy(update={
+        "fixture_mode": args.mode,
+        "fixture_dir": args.fixture_dir,
+        "fixture_latency_s": args.latency,
+        "llm_cache_dir": None,
+        "sql_replay_dir": None,
+    })
+
+
+def run_once(workflow, name: str, args) -> dict:
+    start = time.perf_counter()
+    prompt = (args.prompt,) if name == "conditional" else ()
+    if args.use_async:
+        result = asyncio.run(workflow.arun(*prompt))
+    else:
+        result = workflow.run(*prompt)
+    seconds = time.perf_counter() - start
+
+    report_path = result.get("final_report_path")
+    llm_calls = None
+    summary_path = os.path.splitext(report_path)[0] + RUN_SUMMARY_SUFFIX if report_path else None
+    if summary_path and os.path.isfile(summary_path):
+        with open(summary_path, "r", encoding="utf-8") as f:
+            llm_calls = json.load(f)["totals"]["llm_calls"]
+    return {"seconds": seconds, "llm_calls": llm_calls, "report": report_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record / replay benchmarks of the SRAG workflows.")
+    parser.add_argument("mode", choices=["record", "replay"], help="Record real LLM and search calls, or replay them offline")
+    parser.add_argument("--workflows", nargs="+", choices=list(WORKFLOWS), default=list(WORKFLOWS))
+    parser.add_argument("--fixture-dir", default=str(settings.FIXTURE_DIR))
+    parser.add_argument("--latency", type=float, default=None, help="Simulated seconds per replayed call (default: as recorded)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per workflow (replay mode)")
+    parser.add_argument("--prompt", default="Create a full report", help="User request for the conditional workflow")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the workflows with arun()")
+    args = parser.parse_args()
+
+    config = benchmark_config(args)
+    repeat = args.repeat if args.mode == "replay" else 1
+
+    results = {}
+    for name in args.workflows:
+        workflow = WORKFLOWS[name](config)
+        results[name] = [run_once(workflow, name, args) for _ in range(repeat)]
+
+    print(f"\nWorkflow runs ({args.mode}, fixtures: {args.fixture_dir})")
+    print(f"{'workflow':<14}{'runs':>6}{'best (s)':>12}{'mean (s)':>12}{'LLM calls':>12}")
+    print("-" * 56)
+    for name, runs in results.items():
+        times = [r["seconds"] for r in runs]
+        calls = runs[-1]["llm_calls"]
+        print(f"{name:<14}{len(runs):>6}{min(times):>12.2f}{sum(times) / len(times):>12.2f}{calls if calls is not None else '-':>12}")
+
+
+if __name__ == "__main__":
+    main()
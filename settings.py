@@ -25,6 +25,49 @@ class Settings(BaseSettings):
     
     # --- Data Paths ---
     DB_FILENAME: str = "INFLUD19-26-06-2025.db"
+    # Yearly DBs (e.g. ["INFLUD19.db", ..., "INFLUD25.db"]) queried as one
+    # 'srag_records' table. Empty means only DB_FILENAME is used.
+    DB_FILENAMES: list[str] = []
+
+    # --- Data Loading ---
+    # Reports only look at the last ~13 months; older rows are not loaded.
+    DATA_LOOKBACK_DAYS: int | None = 400
+
+    # --- SQL Agents ---
+    # "sqlite" or "duckdb" (needs: pip install duckdb duckdb-engine)
+    SQL_ENGINE: str = "sqlite"
+    # On-disk cache of agent query results, per data snapshot (0 disables it).
+    SQL_CACHE_MAX_MB: int = 64
+    # Report KPIs: "deterministic" (no LLM), "agent" or "crosscheck" (both, compared)
+    METRICS_MODE: str = "deterministic"
+    # Chart series: "deterministic" (no LLM) or "agent"
+    CHARTS_MODE: str = "deterministic"
+    # Replay the compiled SQL of successful agent runs instead of calling the LLM
+    SQL_REPLAY_ENABLED: bool = True
+    # Guardrails on agent-generated SQL: max rows returned, per-statement timeout
+    SQL_GUARD_MAX_ROWS: int = 1000
+    SQL_GUARD_TIMEOUT_S: float = 15.0
+    # Sample rows per table in the schema injected into the SQL agents' prompt
+    SQL_SCHEMA_SAMPLE_ROWS: int = 3
+    # Opt-in disk cache of LLM replies for nodes with fixed prompts (see DEFAULT_LLM_CACHE_TTLS)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_MAX_MB: int = 32
+    # Ignore cached replies (still refreshing the cache)
+    LLM_CACHE_BYPASS: bool = False
+    # Offline runs: "record" LLM replies and search results into FIXTURE_DIR, "replay" them, or "off"
+    FIXTURE_MODE: str = "off"
+    # Simulated latency of replayed calls (None: the latency recorded)
+    FIXTURE_LATENCY_S: float | None = None
+    # Conditional workflow: route requests locally (keywords + BM25) when at least
+    # this confident, else ask the LLM. None always asks the LLM.
+    INTENT_ROUTER_THRESHOLD: float | None = 0.6
+
+    # --- LLM Models ---
+    # Default model of the workflow nodes (synthesis, SQL agents, chart design)
+    LLM_MODEL: str = "gpt-4o"
+    # Per-node overrides of DEFAULT_NODE_LLMS (model, temperature, timeout_s, max_tokens), e.g.
+    # NODE_LLMS='{"NewsResearcher": {"model": "gpt-4.1-nano"}, "SynthesisAgent": {"timeout_s": 60}}'
+    NODE_LLMS: dict[str, dict] = {}
     
     @property
     def DB_PATH(self) -> Path:
@@ -34,6 +77,35 @@ class Settings(BaseSettings):
     def DB_URI(self) -> str:
         return f"sqlite:///{self.DB_PATH}"
 
+    @property
+    def DB_URIS(self) -> list[str]:
+        filenames = self.DB_FILENAMES or [self.DB_FILENAME]
+        return [f"sqlite:///{self.DATA_DIR / name}" for name in filenames]
+
+    @property
+    def SNAPSHOT_DIR(self) -> Path:
+        return self.DATA_DIR / "snapshots"
+
+    @property
+    def ANALYTICS_DIR(self) -> Path:
+        return self.DATA_DIR / "analytics"
+
+    @property
+    def SQL_CACHE_DIR(self) -> Path:
+        return self.DATA_DIR / "sql_cache"
+
+    @property
+    def SQL_REPLAY_DIR(self) -> Path:
+        return self.DATA_DIR / "sql_replay"
+
+    @property
+    def LLM_CACHE_DIR(self) -> Path:
+        return self.DATA_DIR / "llm_cache"
+
+    @property
+    def FIXTURE_DIR(self) -> Path:
+        return self.DATA_DIR / "fixtures"
+
     @property
     def IMG_OUTPUT_DIR(self) -> Path:
         return self.REPORTS_DIR / "images"
@@ -0,0 +1,77 @@
+# src/domain/sars/cleaning.py
+
+import datetime
+import pandas as pd
+
+from .frame_schema import to_compact_frame, DATE_COLUMNS
+
+# Bump when the cleaning rules change, so cached snapshots are rebuilt.
+CLEANING_VERSION = 2
+
+# The SRAG series the reports cover starts in 2019 (INFLUD19); earlier
+# notification dates are typos.
+MIN_VALID_DATE = pd.Timestamp('2019-01-01')
+
+
+def clean_srag_frame(df: pd.DataFrame, reference_date=None, sort_by_date: bool = False) -> pd.DataFrame:
+    """
+    The single cleaning stage, run once when data is loaded or ingested:
+    - compact schema: codes as uint8 (NULL/unknown -> 9), dates parsed with
+      fixed formats (ISO and DD/MM/YYYY)
+    - rows whose DT_NOTIFIC is impossible (before 2019 or after
+      `reference_date`) are dropped; other impossible dates become NaT
+    - df.attrs['latest_date'] holds the latest DT_NOTIFIC ('YYYY-MM-DD')
+
+    Args:
+        reference_date: Latest possible date. Defaults to the data's own
+            anchor (see `reference_date_of`); pass one when cleaning a part
+            of a larger source (a chunk or a date window).
+    """
+    out = to_compact_frame(df, sort_by_date=sort_by_date)
+    ref = pd.Timestamp(reference_date).normalize() if reference_date else reference_date_of(out)
+
+    if 'DT_NOTIFIC' in out.columns:
+        dates = out['DT_NOTIFIC']
+        impossible = (dates < MIN_VALID_DATE) | (dates > ref)
+        if impossible.any():
+            out = out[~impossible.to_numpy()].reset_index(drop=True)
+
+    for col in DATE_COLUMNS:
+        if col != 'DT_NOTIFIC' and col in out.columns:
+            dates = out[col]
+            out[col] = dates.where((dates >= MIN_VALID_DATE) & (dates <= ref))
+
+    set_latest_date(out)
+    out.attrs['cleaning_version'] = CLEANING_VERSION
+    return out
+
+
+def set_latest_date(df: pd.DataFrame) -> pd.DataFrame:
+    """(Re)computes df.attrs['latest_date'], e.g. after concatenating cleaned frames."""
+    latest = df['DT_NOTIFIC'].max() if 'DT_NOTIFIC' in df.columns else pd.NaT
+    df.attrs['latest_date'] = latest.strftime('%Y-%m-%d') if pd.notna(latest) else ""
+    return df
+
+
+def latest_date(df: pd.DataFrame) -> pd.Timestamp:
+    """The time anchor for reports: attrs['latest_date'] when present, else computed."""
+    value = df.attrs.get('latest_date')
+    if value:
+        return pd.Timestamp(value)
+    if 'DT_NOTIFIC' not in df.columns or not pd.api.types.is_datetime64_any_dtype(df['DT_NOTIFIC'].dtype):
+        return pd.NaT
+    return df['DT_NOTIFIC'].max()
+
+
+def reference_date_of(df: pd.DataFrame) -> pd.Timestamp:
+    """
+    The latest DT_NOTIFIC that is not in the future, the anchor every later
+    date is measured against (as SqliteSragAdapter.latest_date does in SQL).
+    Today when there is no such date.
+    """
+    today = pd.Timestamp(datetime.date.today())
+    if 'DT_NOTIFIC' not in df.columns:
+        return today
+    dates = df['DT_NOTIFIC']
+    latest = dates[dates < today + pd.Timedelta(days=1)].max()
+    return latest.normalize() if pd.notna(latest) else today
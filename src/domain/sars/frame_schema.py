@@ -0,0 +1,83 @@
+# src/domain/sars/frame_schema.py
+
+import numpy as np
+import pandas as pd
+
+# Bump when the compact layout changes, so cached snapshots are rebuilt.
+FRAME_SCHEMA_VERSION = 1
+
+IGNORED_CODE = 9
+
+# Valid codes per categorical column (see DATA_DICTIONARY_TEXT).
+# Anything else - NULL, 9, typos - is normalized to IGNORED_CODE.
+CODE_COLUMNS = {
+    'EVOLUCAO': (1, 2, 3),
+    'UTI': (1, 2),
+    'VACINA': (1, 2),
+}
+
+DATE_COLUMNS = ('DT_NOTIFIC', 'DT_INTERNA')
+
+# pandas cannot hold datetime64[D]; seconds is the coarsest unit it supports
+# and still packs each date in 8 bytes, memory-mappable from a snapshot.
+DATE_DTYPE = 'datetime64[s]'
+
+
+def normalize_codes(series: pd.Series, valid_codes: tuple) -> pd.Series:
+    """Maps a code column to uint8, with NULL/unknown values folded into 9."""
+    values = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    codes = np.full(len(values), IGNORED_CODE, dtype=np.uint8)
+    for code in valid_codes:
+        codes[values == code] = code
+    return pd.Series(codes, index=series.index, name=series.name)
+
+
+def parse_dates(series: pd.Series) -> pd.Series:
+    """
+    Parses DATASUS dates with fixed formats (no per-row inference).
+    Handles ISO (YYYY-MM-DD) and the DD/MM/YYYY used by older CSV drops.
+    Unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.astype(DATE_DTYPE)
+
+    text = series.astype('string').str.slice(0, 10)
+    parsed = pd.to_datetime(text, format='%Y-%m-%d', errors='coerce')
+    missing = parsed.isna() & text.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(text[missing], format='%d/%m/%Y', errors='coerce')
+    return parsed.astype(DATE_DTYPE)
+
+
+def to_compact_frame(df: pd.DataFrame, sort_by_date: bool = False) -> pd.DataFrame:
+    """
+    Converts an adapter frame to the compact schema:
+    - code columns (EVOLUCAO, UTI, VACINA) as uint8, NULL/unknown -> 9
+    - date columns as datetime64, parsed once here instead of in every node
+    Columns not in the schema are passed through untouched.
+    """
+    compact = {}
+    for col in df.columns:
+        if col in CODE_COLUMNS:
+            compact[col] = normalize_codes(df[col], CODE_COLUMNS[col])
+        elif col in DATE_COLUMNS:
+            compact[col] = parse_dates(df[col])
+        else:
+            compact[col] = df[col]
+
+    out = pd.DataFrame(compact, index=df.index)
+    if sort_by_date and 'DT_NOTIFIC' in out.columns:
+        out = out.sort_values('DT_NOTIFIC', kind='stable')
+    return out.reset_index(drop=True)
+
+
+def to_sql_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns a copy suited for `to_sql`: date columns as 'YYYY-MM-DD' strings,
+    the format the agents' data dictionary promises.
+    """
+    out = df.copy()
+    for col in DATE_COLUMNS:
+        if col in out.columns and pd.api.types.is_datetime64_any_dtype(out[col].dtype):
+            out[col] = out[col].dt.strftime('%Y-%m-%d')
+    return out
@@ -0,0 +1,75 @@
+# src/domain/sars/metrics_engine.py
+
+import numpy as np
+import pandas as pd
+
+from .frame_schema import CODE_COLUMNS, IGNORED_CODE, normalize_codes
+
+# The report KPIs (see REQUEST_METRICS), all percentages (0-100).
+METRIC_KEYS = ('mortality_rate', 'icu_rate', 'vaccination_rate', 'increase_rate')
+
+# metric -> (code column, numerator codes); the denominator is every known code.
+_RATES = {
+    'mortality_rate': ('EVOLUCAO', (2,)),
+    'icu_rate': ('UTI', (1,)),
+    'vaccination_rate': ('VACINA', (1,)),
+}
+
+INCREASE_WINDOW_DAYS = 30
+
+
+def describe_window(days) -> str:
+    """Report wording of the data window the metrics cover (None: no lookback)."""
+    return f"last {days} days of data" if days else "all available data"
+
+
+def _code_counts(df: pd.DataFrame, col: str) -> np.ndarray:
+    """Occurrences of each code 0..9 in a compact (uint8) code column."""
+    codes = df[col]
+    if codes.dtype != np.uint8:
+        codes = normalize_codes(codes, CODE_COLUMNS[col])
+    return np.bincount(codes.to_numpy(), minlength=IGNORED_CODE + 1)
+
+
+def _pct(numerator, denominator) -> float:
+    return round(float(numerator) * 100.0 / float(denominator), 2) if denominator else 0.0
+
+
+def compute_metrics(df: pd.DataFrame, reference_date=None) -> dict:
+    """
+    Computes the report KPIs from a cleaned SRAG frame, with the formulas
+    of REQUEST_METRICS:
+    - mortality_rate: EVOLUCAO = 2 over EVOLUCAO IN (1, 2, 3)
+    - icu_rate: UTI = 1 over UTI IN (1, 2)
+    - vaccination_rate: VACINA = 1 over VACINA IN (1, 2)
+    - increase_rate: cases in the 30 days up to `reference_date` vs the
+      30 days before; 0.0 when the previous window is empty.
+
+    Each code column is counted in a single vectorized pass; unknown codes
+    (9) are left out of the denominators. Missing columns yield 0.0.
+
+    Args:
+        reference_date: End of the "last 30 days" window. Defaults to the
+            frame's latest notification date.
+    """
+    metrics = {}
+    for key, (col, hits) in _RATES.items():
+        if col not in df.columns or df.empty:
+            metrics[key] = 0.0
+            continue
+        counts = _code_counts(df, col)
+        metrics[key] = _pct(counts[list(hits)].sum(), counts[list(CODE_COLUMNS[col])].sum())
+
+    metrics['increase_rate'] = 0.0
+    if 'DT_NOTIFIC' in df.columns and not df.empty:
+        days = df['DT_NOTIFIC'].to_numpy(dtype='datetime64[D]')
+        ref = days.max() if reference_date is None else np.datetime64(pd.Timestamp(reference_date).date(), 'D')
+        if not np.isnat(ref):
+            # Days before `ref`: 0..29 is the current window, 30..59 the previous one.
+            age = (ref - days).astype('int64')
+            valid = ~np.isnat(days)
+            current = np.count_nonzero(valid & (age >= 0) & (age < INCREASE_WINDOW_DAYS))
+            previous = np.count_nonzero(valid & (age >= INCREASE_WINDOW_DAYS) & (age < 2 * INCREASE_WINDOW_DAYS))
+            metrics['increase_rate'] = _pct(current - previous, previous)
+
+    return metrics
@@ -0,0 +1,82 @@
+# src/domain/sars/rollups.py
+
+import sqlite3
+import pandas as pd
+
+# One row per notification date with the counts every report metric and
+# chart is built from (see DATA_DICTIONARY_TEXT).
+DAILY_ROLLUP_TABLE = "srag_daily"
+
+DAILY_ROLLUP_COLUMNS = (
+    'date', 'n_cases', 'n_deaths', 'n_closed', 'n_icu', 'n_icu_known', 'n_vac', 'n_vac_known',
+)
+
+# column -> (source column, codes counted)
+_COUNTERS = {
+    'n_deaths': ('EVOLUCAO', (2,)),
+    'n_closed': ('EVOLUCAO', (1, 2, 3)),
+    'n_icu': ('UTI', (1,)),
+    'n_icu_known': ('UTI', (1, 2)),
+    'n_vac': ('VACINA', (1,)),
+    'n_vac_known': ('VACINA', (1, 2)),
+}
+
+
+def daily_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates a cleaned SRAG frame into the `srag_daily` layout.
+    Rows without a notification date are left out.
+    """
+    dated = df[df['DT_NOTIFIC'].notna().to_numpy()]
+    counters = pd.DataFrame({'date': dated['DT_NOTIFIC'], 'n_cases': 1}, index=dated.index)
+    for name, (col, codes) in _COUNTERS.items():
+        counters[name] = dated[col].isin(codes).astype('int64')
+
+    out = counters.groupby('date', sort=True).sum().reset_index()
+    return out[list(DAILY_ROLLUP_COLUMNS)]
+
+
+def rollup_select_sql(source_table: str, date_expr: str = "substr(DT_NOTIFIC, 1, 10)") -> str:
+    """
+    SELECT computing the `srag_daily` columns from a record table (before
+    GROUP BY 1). Portable SQL; `date_expr` adapts the date column type.
+    """
+    counts = ", ".join(
+        f"SUM(CASE WHEN {col} IN ({', '.join(map(str, codes))}) THEN 1 ELSE 0 END) AS {name}"
+        for name, (col, codes) in _COUNTERS.items()
+    )
+    return (
+        f'SELECT {date_expr} AS date, COUNT(*) AS n_cases, {counts} '
+        f'FROM {source_table} WHERE DT_NOTIFIC IS NOT NULL'
+    )
+
+
+def refresh_daily_rollup(conn: sqlite3.Connection, source_table: str, dates: list = None):
+    """
+    Maintains `srag_daily` inside a SQLite DB whose `source_table` stores
+    ISO date strings. With `dates`, only those days are recomputed (what an
+    incremental ingestion run touched); without, the table is rebuilt.
+    """
+    table_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (DAILY_ROLLUP_TABLE,)
+    ).fetchone()
+    select = rollup_select_sql(f'"{source_table}"')
+
+    if dates is None or not table_exists:
+        conn.execute(f'DROP TABLE IF EXISTS "{DAILY_ROLLUP_TABLE}"')
+        conn.execute(
+            f'CREATE TABLE "{DAILY_ROLLUP_TABLE}" (date TEXT PRIMARY KEY, '
+            + ", ".join(f"{c} INTEGER NOT NULL" for c in DAILY_ROLLUP_COLUMNS[1:]) + ")"
+        )
+        conn.execute(f'INSERT INTO "{DAILY_ROLLUP_TABLE}" {select} GROUP BY 1')
+        return
+
+    dates = [d for d in dates if d]
+    for start in range(0, len(dates), 500):
+        batch = dates[start:start + 500]
+        marks = ", ".join("?" * len(batch))
+        conn.execute(f'DELETE FROM "{DAILY_ROLLUP_TABLE}" WHERE date IN ({marks})', batch)
+        conn.execute(
+            f'INSERT INTO "{DAILY_ROLLUP_TABLE}" {select} AND DT_NOTIFIC IN ({marks}) GROUP BY 1',
+            batch,
+        )
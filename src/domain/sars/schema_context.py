@@ -1,9 +1,20 @@
 # src/domain/srag/schema_context.py
 
-DATA_DICTIONARY_TEXT = """
+_BASE_DATA_DICTIONARY = """
 **DATA DICTIONARY & SCHEMA:**
-You have access to a table named 'srag_records'.
-Here are the critical columns and their value mappings:
+You have access to two tables:
+
+A. 'srag_daily' (PREFERRED): one row per notification date, pre-aggregated.
+   Use it for every count, rate and time series; it is far smaller than 'srag_records'.
+   - date: notification date (same format as DT_NOTIFIC below)
+   - n_cases: number of cases notified that day
+   - n_deaths: cases with EVOLUCAO = 2      | n_closed: cases with EVOLUCAO IN (1, 2, 3)
+   - n_icu: cases with UTI = 1              | n_icu_known: cases with UTI IN (1, 2)
+   - n_vac: cases with VACINA = 1           | n_vac_known: cases with VACINA IN (1, 2)
+   Rates are ratios of sums, e.g. mortality = SUM(n_deaths) * 100.0 / SUM(n_closed).
+
+B. 'srag_records': one row per case. Only query it for something 'srag_daily' cannot answer.
+Here are its critical columns and their value mappings:
 
 1. DT_NOTIFIC (Date): The notification date of the case. Format: YYYY-MM-DD.
    - Use this column for all time-series grouping and filtering.
@@ -21,3 +32,24 @@ Here are the critical columns and their value mappings:
    - 2: No
    - 9 or NULL: Ignored
 """
+
+# How dates behave in each SQL engine the agents can run on (Config.sql_engine).
+SQL_DIALECT_HINTS = {
+    "sqlite": """5. SQL DIALECT (SQLite):
+   - DT_NOTIFIC and srag_daily.date are TEXT 'YYYY-MM-DD'; compare them with string literals (date >= '2024-01-01').
+   - Month buckets: strftime('%Y-%m', DT_NOTIFIC). Date arithmetic: date('2024-01-31', '-30 days').
+""",
+    "duckdb": """5. SQL DIALECT (DuckDB):
+   - DT_NOTIFIC and srag_daily.date are DATEs; compare them with DATE literals (date >= DATE '2024-01-01').
+   - Month buckets: strftime(DT_NOTIFIC, '%Y-%m') or date_trunc('month', DT_NOTIFIC).
+   - Date arithmetic: DATE '2024-01-31' - INTERVAL 30 DAY.
+""",
+}
+
+
+def build_data_dictionary(sql_engine: str = "sqlite") -> str:
+    """DATA_DICTIONARY_TEXT with the date/SQL hints for `sql_engine`."""
+    return _BASE_DATA_DICTIONARY + SQL_DIALECT_HINTS[sql_engine]
+
+
+DATA_DICTIONARY_TEXT = build_data_dictionary("sqlite")
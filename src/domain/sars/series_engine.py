@@ -0,0 +1,114 @@
+# src/domain/sars/series_engine.py
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import latest_date
+
+GRANULARITIES = ('day', 'epiweek', 'month')
+
+# The report charts (see REQUEST_CHARTS): name -> (granularity, periods).
+CHART_SERIES = {
+    'daily_cases_30d': ('day', 30),
+    'monthly_cases_12m': ('month', 12),
+}
+
+# datetime64[D] counts days from 1970-01-01, a Thursday.
+_EPOCH_WEEKDAY_FROM_SUNDAY = 4
+
+
+def _buckets(days: np.ndarray, granularity: str) -> np.ndarray:
+    """Bucket of each date, as an integer (days, Sunday-start weeks or months since the epoch)."""
+    if granularity == 'day':
+        return days.astype('int64')
+    if granularity == 'epiweek':
+        # Epidemiological weeks run Sunday to Saturday.
+        return (days.astype('int64') + _EPOCH_WEEKDAY_FROM_SUNDAY) // 7
+    if granularity == 'month':
+        return days.astype('datetime64[M]').astype('int64')
+    raise ValueError(f"Unknown granularity '{granularity}'. Use one of {GRANULARITIES}.")
+
+
+def _labels(last_bucket: int, periods: int, granularity: str) -> list:
+    buckets = np.arange(last_bucket - periods + 1, last_bucket + 1)
+    if granularity == 'day':
+        return [str(d) for d in buckets.astype('datetime64[D]')]
+    if granularity == 'epiweek':
+        # Labelled by the week's Sunday.
+        return [str(d) for d in (buckets * 7 - _EPOCH_WEEKDAY_FROM_SUNDAY).astype('datetime64[D]')]
+    return [str(m) for m in buckets.astype('datetime64[M]')]
+
+
+def _last_bucket(end: pd.Timestamp, granularity: str) -> int:
+    return int(_buckets(np.array([end.to_datetime64()], dtype='datetime64[D]'), granularity)[0])
+
+
+def case_series(df: pd.DataFrame, granularity: str = 'day', periods: int = 30, end_date=None) -> list:
+    """
+    Case counts per period for the `periods` periods ending at `end_date`,
+    oldest first and gap-filled with zeros, in the chart schema:
+    [{"date": label, "count": int}, ...]
+
+    Labels are 'YYYY-MM-DD' for days, the Sunday 'YYYY-MM-DD' for epi-weeks
+    and 'YYYY-MM' for months. Rows without DT_NOTIFIC are ignored.
+
+    Args:
+        end_date: Last day covered. Defaults to the frame's latest date.
+    """
+    end = latest_date(df) if end_date is None else pd.Timestamp(end_date)
+    if pd.isna(end) or periods <= 0:
+        return []
+
+    last_bucket = _last_bucket(end, granularity)
+    counts = np.zeros(periods, dtype='int64')
+
+    if 'DT_NOTIFIC' in df.columns and not df.empty:
+        days = df['DT_NOTIFIC'].to_numpy(dtype='datetime64[D]')
+        days = days[~np.isnat(days)]
+        offsets = _buckets(days, granularity) - (last_bucket - periods + 1)
+        offsets = offsets[(offsets >= 0) & (offsets < periods)]
+        counts = np.bincount(offsets, minlength=periods)
+
+    return [
+        {"date": label, "count": int(count)}
+        for label, count in zip(_labels(last_bucket, periods, granularity), counts)
+    ]
+
+
+def fill_series(rows: list, granularity: str = 'day', periods: int = 30, end_date=None) -> list:
+    """
+    Puts sparse [{"date", "count"}] rows (e.g. a SQL agent's answer) on the
+    same window and labels as `case_series`: each row's count is added to
+    the period its date falls in, rows outside the window are dropped and
+    empty periods are zero.
+    """
+    end = pd.Timestamp(end_date) if end_date is not None else pd.NaT
+    if pd.isna(end) or periods <= 0:
+        return []
+
+    last_bucket = _last_bucket(end, granularity)
+    counts = np.zeros(periods, dtype='int64')
+    for row in rows:
+        day = pd.to_datetime(str(row['date'])[:10], errors='coerce')
+        if pd.isna(day):
+            continue
+        offset = _last_bucket(day, granularity) - (last_bucket - periods + 1)
+        if 0 <= offset < periods:
+            counts[offset] += int(row['count'])
+
+    return [
+        {"date": label, "count": int(count)}
+        for label, count in zip(_labels(last_bucket, periods, granularity), counts)
+    ]
+
+
+def build_chart_data(df: pd.DataFrame, end_date=None, series: dict = None) -> dict:
+    """
+    All chart series (CHART_SERIES by default) in the layout
+    ChartDesignerNode consumes: {name: [{"date": ..., "count": ...}, ...]}.
+    """
+    series = series or CHART_SERIES
+    return {
+        name: case_series(df, granularity, periods, end_date)
+        for name, (granularity, periods) in series.items()
+    }
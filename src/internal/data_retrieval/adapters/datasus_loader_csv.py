@@ -1,19 +1,149 @@
 # sars_lens/internal/data_retrieval/adapters/csv/datasus_loader.py
+import os
+import sqlite3
+import zipfile
+import tempfile
+import datetime
+from contextlib import contextmanager
 import pandas as pd
-from ..ports.clinical_data import ClinicalDataPort
+try:
+    from ..ports.clinical_data import ClinicalDataPort
+except ImportError:
+    # The ports package is not shipped with every checkout; the adapter
+    # only uses the port as its base class.
+    ClinicalDataPort = object
+from .ingest_log import carry_over_history
+from src.domain.sars.frame_schema import to_sql_frame
+from src.domain.sars.cleaning import clean_srag_frame, set_latest_date
+from src.domain.sars.rollups import refresh_daily_rollup, DAILY_ROLLUP_TABLE
+
+# Pertinent columns and their explicit dtypes. Reading only these (usecols)
+# keeps pandas from parsing and type-inferring the other ~95 columns.
+SRAG_CSV_DTYPES = {
+    'DT_NOTIFIC': str,
+    'EVOLUCAO': 'float32',
+    'DT_INTERNA': str,
+    'UTI': 'float32',
+    'VACINA': 'float32',
+}
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def create_date_index(conn: sqlite3.Connection, table_name: str):
+    """Index on DT_NOTIFIC: date windows and the ingestor's revised-date lookups filter on it."""
+    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table_name}_dt_notific" ON "{table_name}" (DT_NOTIFIC)')
+
 
 class DatasusCsvAdapter(ClinicalDataPort):
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, chunksize: int = DEFAULT_CHUNKSIZE, sort_by_date: bool = False):
+        """
+        Args:
+            csv_path: Path to the DATASUS INFLUD CSV, or to the .zip archive
+                DATASUS distributes (the first .csv member is read).
+            chunksize: Rows per chunk when streaming. Bounds peak memory.
+            sort_by_date: Return rows ordered by DT_NOTIFIC.
+        """
         self.csv_path = csv_path
+        self.chunksize = chunksize
+        self.sort_by_date = sort_by_date
+
+    @contextmanager
+    def _open_source(self):
+        """Yields something `pd.read_csv` can read: a path or a zip member stream."""
+        if not zipfile.is_zipfile(self.csv_path):
+            yield self.csv_path
+            return
+
+        with zipfile.ZipFile(self.csv_path) as archive:
+            members = [n for n in archive.namelist() if n.lower().endswith('.csv')]
+            if not members:
+                raise ValueError(f"No CSV file found inside archive: {self.csv_path}")
+            with archive.open(members[0]) as stream:
+                yield stream
+
+    def iter_chunks(self, iso_dates: bool = False):
+        """
+        Streams the pertinent columns in bounded-size chunks, each one
+        already through the cleaning stage (see domain.sars.cleaning).
+
+        Args:
+            iso_dates: Normalize date columns to 'YYYY-MM-DD' strings (the
+                format used in the SQLite store).
+        """
+        # Every chunk is cleaned against today, not its own latest date, so
+        # chunks agree. Rows dropped are the same as with the data anchor
+        # (DT_NOTIFIC after today); only other dates keep a looser bound.
+        reference_date = datetime.date.today()
+        with self._open_source() as source:
+            reader = pd.read_csv(
+                source,
+                sep=';',
+                encoding='latin1',
+                usecols=list(SRAG_CSV_DTYPES),
+                dtype=SRAG_CSV_DTYPES,
+                chunksize=self.chunksize,
+            )
+            for chunk in reader:
+                chunk = clean_srag_frame(chunk, reference_date=reference_date)
+                yield to_sql_frame(chunk) if iso_dates else chunk
 
     def get_raw_srag_data(self) -> pd.DataFrame:
-        # 1. Load Data
-        df = pd.read_csv(self.csv_path, sep=';', encoding='latin1')
-        
-        # 2. Select pertinent columns (as requested in prompt)
-        cols = ['DT_NOTIFIC', 'EVOLUCAO', 'DT_INTERNA', 'UTI', 'VACINA']
-        df = df[cols]
-        
-        # 3. Clean Data (Handle missing values)
-        df['UTI'] = df['UTI'].fillna(9) # Assuming 9 is 'Ignored'
-        return df
\ No newline at end of file
+        """Returns the cleaned SRAG frame (see domain.sars.cleaning)."""
+        # Cleaning chunk by chunk keeps only the small typed columns alive.
+        chunks = list(self.iter_chunks())
+        if not chunks:
+            return clean_srag_frame(pd.DataFrame(columns=list(SRAG_CSV_DTYPES)))
+
+        df = pd.concat(chunks, ignore_index=True)
+        if self.sort_by_date:
+            df = df.sort_values('DT_NOTIFIC', kind='stable', ignore_index=True)
+        return set_latest_date(df)
+
+    def write_to_sqlite(self, db_path: str, table_name: str = 'srag_records') -> int:
+        """
+        Streams the CSV into a SQLite table, one chunk at a time, so peak
+        memory does not grow with the file size. Dates are stored as ISO
+        strings (YYYY-MM-DD), the format the agents' data dictionary assumes.
+        The DT_NOTIFIC index and the `srag_daily` rollup are built alongside.
+
+        The DB is built in a temporary file next to `db_path` and then
+        replaces it whole, so readers (which open it immutable) never see a
+        partial DB and a failed load leaves the old one in place. The run
+        history of an incrementally ingested store survives the reload,
+        which is logged as one more run (see `ingest_log.carry_over_history`).
+
+        Returns:
+            Number of rows written.
+        """
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        total = 0
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".db", dir=db_dir)
+        os.close(fd)
+        try:
+            with sqlite3.connect(tmp_path) as conn:
+                # Bulk-load settings: a failed build is discarded anyway.
+                conn.execute("PRAGMA journal_mode=OFF;")
+                conn.execute("PRAGMA synchronous=OFF;")
+
+                for chunk in self.iter_chunks(iso_dates=True):
+                    chunk.to_sql(table_name, conn, if_exists='append', index=False)
+                    total += len(chunk)
+                    conn.commit()
+
+                create_date_index(conn, table_name)
+                refresh_daily_rollup(conn, table_name)
+                if os.path.exists(db_path):
+                    carry_over_history(conn, db_path, table_name, self.csv_path, total)
+            conn.close()
+            os.replace(tmp_path, db_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        print(f"Adapter wrote {total} rows to '{table_name}' (+ '{DAILY_ROLLUP_TABLE}') in {db_path}.")
+        return total
+
@@ -0,0 +1,189 @@
+# src/internal/data_retrieval/adapters/federated_loader.py
+import os
+import sqlite3
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from ..ports.clinical_data import ClinicalDataPort
+from .snapshot_cache import ColumnarSnapshotCache
+from .sqlite_loader import SqliteSragAdapter, DEFAULT_COLUMNS, detect_srag_table
+from ..connection_pool import pooled_engine, file_version, readonly_uri, tune_connection
+from src.domain.sars.frame_schema import FRAME_SCHEMA_VERSION
+from src.domain.sars.cleaning import set_latest_date, CLEANING_VERSION
+from src.domain.sars.rollups import DAILY_ROLLUP_TABLE, DAILY_ROLLUP_COLUMNS
+
+FEDERATED_VIEW_NAME = "srag_records"
+
+
+def _load_source(db_path: str, adapter_kwargs: dict, request: dict) -> pd.DataFrame:
+    """Process pool worker: loads one yearly DB with a regular SqliteSragAdapter."""
+    adapter = SqliteSragAdapter(f"sqlite:///{db_path}", **adapter_kwargs)
+    return adapter.get_raw_srag_data(**request)
+
+
+class FederatedSragAdapter(ClinicalDataPort):
+    """
+    Exposes several yearly DATASUS DBs (INFLUD19 ... INFLUD25) as one SRAG frame.
+
+    Each file is loaded by its own SqliteSragAdapter in a process pool, so
+    yearly files are read (and snapshotted) in parallel; the results are
+    concatenated and, when a snapshot dir is set, cached as one merged
+    columnar snapshot. For SQL access see `get_federated_engine`.
+    """
+
+    def __init__(
+        self,
+        db_uris: list,
+        root_dir: str = None,
+        snapshot_dir: str = None,
+        sort_by_date: bool = False,
+        columns: tuple = DEFAULT_COLUMNS,
+        lookback_days: int = None,
+        max_workers: int = None,
+    ):
+        """
+        Args:
+            db_uris: One URI per yearly DB (e.g. 'sqlite:///data/INFLUD24.db').
+            root_dir / snapshot_dir / sort_by_date / columns / lookback_days:
+                As in SqliteSragAdapter; the lookback is measured from the
+                latest date across all sources.
+            max_workers: Size of the process pool (defaults to one per source,
+                capped at the CPU count).
+        """
+        if not db_uris:
+            raise ValueError("FederatedSragAdapter needs at least one DB URI.")
+
+        self.adapters = [
+            SqliteSragAdapter(uri, root_dir=root_dir, snapshot_dir=snapshot_dir, sort_by_date=sort_by_date, columns=columns)
+            for uri in db_uris
+        ]
+        self.db_paths = [os.path.abspath(a.db_path) for a in self.adapters]
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_cache = ColumnarSnapshotCache(snapshot_dir) if snapshot_dir else None
+        self.sort_by_date = sort_by_date
+        self.columns = tuple(columns)
+        self.lookback_days = lookback_days
+        self.max_workers = max_workers or min(len(self.db_paths), os.cpu_count() or 1)
+
+    def get_raw_srag_data(
+        self,
+        columns: tuple = None,
+        start_date: str = None,
+        end_date: str = None,
+        lookback_days: int = None,
+    ) -> pd.DataFrame:
+        """Same contract as SqliteSragAdapter.get_raw_srag_data, over all sources."""
+        columns = tuple(columns or self.columns)
+        lookback_days = lookback_days if lookback_days is not None else self.lookback_days
+        start_date = SqliteSragAdapter._iso(start_date)
+        end_date = SqliteSragAdapter._iso(end_date)
+
+        # Resolve the lookback once, against the newest source, and skip
+        # yearly files that end before the window starts.
+        sources = self.db_paths
+        if lookback_days:
+            latest = {path: a.latest_date() for path, a in zip(self.db_paths, self.adapters)}
+            anchors = [d for d in latest.values() if d]
+            if anchors:
+                lookback_start = (pd.Timestamp(max(anchors)) - pd.Timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+                start_date = max(start_date, lookback_start) if start_date else lookback_start
+                sources = [p for p in self.db_paths if latest[p] and latest[p] >= start_date]
+
+        request = {"columns": columns, "start_date": start_date, "end_date": end_date, "lookback_days": None}
+
+        def build():
+            return self._load_sources(sources, request)
+
+        if self.snapshot_cache is None or not sources:
+            return build()
+
+        # The merged snapshot hangs off the first source; the other files'
+        # versions go into the variant, so replacing any of them rebuilds it.
+        versions = ",".join(f"{os.path.basename(p)}@{file_version(p)}" for p in sources[1:])
+        variant = (
+            f"federated-compact-v{FRAME_SCHEMA_VERSION};clean-v{CLEANING_VERSION};sorted={self.sort_by_date};"
+            f"cols={','.join(columns)};start={start_date};end={end_date};sources={versions}"
+        )
+        return self.snapshot_cache.get_or_build(sources[0], build, variant)
+
+    def _load_sources(self, sources: list, request: dict) -> pd.DataFrame:
+        if not sources:
+            print("[Federated Adapter] No source has data inside the requested window.")
+            return self.adapters[0].get_raw_srag_data(**request).iloc[0:0]
+
+        adapter_kwargs = {"snapshot_dir": self.snapshot_dir, "sort_by_date": self.sort_by_date}
+        print(f"[Federated Adapter] Loading {len(sources)} source(s) with {self.max_workers} worker(s)...")
+
+        if len(sources) == 1 or self.max_workers == 1:
+            frames = [_load_source(path, adapter_kwargs, request) for path in sources]
+        else:
+            # 'spawn' keeps the workers clean of the parent's open connections.
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx) as pool:
+                frames = list(pool.map(_load_source, sources, [adapter_kwargs] * len(sources), [request] * len(sources)))
+
+        df = pd.concat(frames, ignore_index=True)
+        if self.sort_by_date and 'DT_NOTIFIC' in df.columns:
+            df = df.sort_values('DT_NOTIFIC', kind='stable').reset_index(drop=True)
+        set_latest_date(df)
+
+        print(f"[Federated Adapter] Loaded {len(df)} rows from {len(sources)} source(s).")
+        return df
+
+
+# --- SQL Federation (ATTACH + UNION ALL view) ---
+
+def attach_federation(conn: sqlite3.Connection, db_paths: list, view_name: str = FEDERATED_VIEW_NAME):
+    """
+    Attaches every yearly DB read-only to `conn` and creates a TEMP view
+    `view_name` that UNIONs their SRAG tables over the columns they share.
+    When every DB has its `srag_daily` rollup, a combined one is exposed too.
+    `conn` must have been opened with uri=True.
+    """
+    tables, column_sets = [], []
+    for i, path in enumerate(db_paths):
+        schema = f"src{i}"
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (readonly_uri(path),))
+        tune_connection(conn, schema=schema)
+        table = detect_srag_table(conn, schema)
+        tables.append((schema, table))
+        column_sets.append([row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')])
+
+    # Yearly layouts drift; only the columns every year has are exposed.
+    shared = [c for c in column_sets[0] if all(c in cols for cols in column_sets[1:])]
+    select = ", ".join(f'"{c}"' for c in shared)
+    union = " UNION ALL ".join(f'SELECT {select} FROM {schema}."{table}"' for schema, table in tables)
+    conn.execute(f'CREATE TEMP VIEW "{view_name}" AS {union}')
+
+    schemas = [schema for schema, _ in tables]
+    has_rollup = all(
+        conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type='table' AND name=?", (DAILY_ROLLUP_TABLE,)).fetchone()
+        for schema in schemas
+    )
+    if has_rollup:
+        # A day can straddle two yearly files (late notifications): re-sum.
+        counts = ", ".join(f"SUM({c}) AS {c}" for c in DAILY_ROLLUP_COLUMNS[1:])
+        rollups = " UNION ALL ".join(f'SELECT * FROM {schema}."{DAILY_ROLLUP_TABLE}"' for schema in schemas)
+        conn.execute(f'CREATE TEMP VIEW "{DAILY_ROLLUP_TABLE}" AS SELECT date, {counts} FROM ({rollups}) GROUP BY date')
+
+
+def _connect_federated(db_paths: list, view_name: str) -> sqlite3.Connection:
+    conn = sqlite3.connect("file::memory:", uri=True, check_same_thread=False)
+    attach_federation(conn, db_paths, view_name)
+    return conn
+
+
+def get_federated_engine(db_paths: list, view_name: str = FEDERATED_VIEW_NAME):
+    """
+    Pooled engine over all yearly DBs, exposing them as one `view_name` table.
+    Use with `SQLDatabase(engine=..., schema="temp", view_support=True)` so
+    the TEMP view is reflected.
+    """
+    db_paths = [os.path.abspath(p) for p in db_paths]
+    if len(db_paths) > 9:
+        # SQLite's default SQLITE_MAX_ATTACHED is 10, main DB included.
+        raise ValueError(f"Cannot attach {len(db_paths)} databases to one connection (max 9).")
+
+    name = "federated:" + "|".join(db_paths)
+    version = tuple(file_version(p) for p in db_paths)
+    return pooled_engine(name, version, lambda: _connect_federated(db_paths, view_name))
@@ -0,0 +1,318 @@
+# src/internal/data_retrieval/adapters/incremental_loader.py
+import os
+import json
+import shutil
+import hashlib
+import sqlite3
+import datetime
+import tempfile
+from collections import Counter
+from urllib.parse import quote
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+from .datasus_loader_csv import DatasusCsvAdapter, SRAG_CSV_DTYPES, DEFAULT_CHUNKSIZE, create_date_index
+from .ingest_log import (
+    PARTITIONS_TABLE, STATE_TABLE, LOG_TABLE, NULL_DATE_KEY, ensure_schema, next_run_id, log_run,
+)
+from src.domain.sars.rollups import refresh_daily_rollup, DAILY_ROLLUP_TABLE
+
+ROW_HASH_COLUMN = "_row_hash"
+
+
+@dataclass
+class IngestionResult:
+    run_id: int
+    rows_inserted: int = 0
+    rows_deleted: int = 0
+    new_dates: List[str] = field(default_factory=list)
+    revised_dates: List[str] = field(default_factory=list)
+    removed_dates: List[str] = field(default_factory=list)
+    watermark_date: str = None
+
+    @property
+    def changed_dates(self) -> List[str]:
+        return sorted(set(self.new_dates) | set(self.revised_dates) | set(self.removed_dates))
+
+    @property
+    def affected_ranges(self) -> List[Tuple[str, str]]:
+        return merge_date_ranges(self.changed_dates)
+
+
+class IncrementalSragIngestor:
+    """
+    Applies a new DATASUS INFLUD release to an existing SQLite store,
+    touching only the records that changed.
+
+    Every stored row carries a fingerprint (hash of its normalized values),
+    and every notification date keeps an order-independent digest of its rows.
+    A release is streamed twice: the first pass only computes per-date digests
+    to find new/revised/removed dates; the second pass upserts the rows of
+    those dates, diffing fingerprints so unchanged rows are left alone.
+    Memory stays bounded by the chunk size plus the fingerprints of revised dates.
+
+    Each run advances the high-water mark (latest DT_NOTIFIC and a fingerprint
+    of the whole release) and is appended to an audit log, so downstream caches
+    can refresh only the affected date ranges (see `changes_since`).
+
+    A run works on a copy of the store that then replaces it whole, like
+    `DatasusCsvAdapter.write_to_sqlite`: readers open the file immutable
+    and must never see it change under them.
+    """
+
+    def __init__(self, db_path: str, table_name: str = "srag_records"):
+        self.db_path = db_path
+        self.table_name = table_name
+
+    # --- Public API ---
+
+    def ingest(self, source_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> IngestionResult:
+        adapter = DatasusCsvAdapter(source_path, chunksize=chunksize)
+        db_dir = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".db", dir=db_dir)
+        os.close(fd)
+        try:
+            if os.path.exists(self.db_path):
+                shutil.copyfile(self.db_path, tmp_path)
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                with conn:
+                    result = self._ingest(conn, adapter, source_path)
+            os.replace(tmp_path, self.db_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        print(
+            f"Ingestor run #{result.run_id}: +{result.rows_inserted} / -{result.rows_deleted} rows, "
+            f"{len(result.new_dates)} new, {len(result.revised_dates)} revised, "
+            f"{len(result.removed_dates)} removed dates. Watermark: {result.watermark_date}"
+        )
+        return result
+
+    def _ingest(self, conn: sqlite3.Connection, adapter: DatasusCsvAdapter, source_path: str) -> IngestionResult:
+        ensure_schema(conn)
+        self._ensure_fingerprints(conn)
+
+        # Pass 1: per-date digests of the release
+        source_digests = self._compute_digests(adapter)
+        stored_digests = dict(conn.execute(f"SELECT date, digest FROM {PARTITIONS_TABLE}").fetchall())
+
+        new_dates = sorted(set(source_digests) - set(stored_digests))
+        removed_dates = sorted(set(stored_digests) - set(source_digests))
+        revised_dates = sorted(
+            d for d in set(source_digests) & set(stored_digests)
+            if source_digests[d] != stored_digests[d]
+        )
+
+        run_id = next_run_id(conn)
+        result = IngestionResult(
+            run_id=run_id,
+            new_dates=new_dates,
+            revised_dates=revised_dates,
+            removed_dates=removed_dates,
+        )
+
+        # Pass 2: upsert only the changed dates
+        if new_dates or revised_dates:
+            inserted, deleted = self._apply_changes(conn, adapter, set(new_dates), revised_dates)
+            result.rows_inserted += inserted
+            result.rows_deleted += deleted
+
+        for date_key in removed_dates:
+            where, params = self._date_predicate(date_key)
+            result.rows_deleted += conn.execute(
+                f'DELETE FROM "{self.table_name}" WHERE {where}', params
+            ).rowcount
+
+        self._ensure_date_index(conn)
+        # Keep the srag_daily rollup in step: only the touched days.
+        if conn.execute(f'PRAGMA table_info("{self.table_name}")').fetchone():
+            refresh_daily_rollup(conn, self.table_name, result.changed_dates)
+        self._save_partitions(conn, source_digests, new_dates + revised_dates, removed_dates)
+        result.watermark_date = self._save_state(conn, source_digests)
+        self._log_run(conn, source_path, result)
+        return result
+
+    def watermark(self) -> Dict[str, str]:
+        """Returns the persisted high-water mark (empty before the first run)."""
+        return dict(self._read(STATE_TABLE, f"SELECT key, value FROM {STATE_TABLE}"))
+
+    def changes_since(self, run_id: int = 0) -> List[Tuple[str, str]]:
+        """
+        Merged (start, end) date ranges touched by every run after `run_id`.
+        Consumers store the last run id they processed and refresh only these.
+        """
+        rows = self._read(LOG_TABLE, f"SELECT changed_dates FROM {LOG_TABLE} WHERE run_id > ?", (run_id,))
+        dates = set()
+        for (changed,) in rows:
+            dates.update(json.loads(changed))
+        return merge_date_ranges(sorted(dates))
+
+    def last_run_id(self) -> int:
+        rows = self._read(LOG_TABLE, f"SELECT COALESCE(MAX(run_id), 0) FROM {LOG_TABLE}")
+        return rows[0][0] if rows else 0
+
+    def _read(self, table: str, sql: str, params: tuple = ()) -> list:
+        """Rows of a bookkeeping query, or [] before the first run. Never writes to the store."""
+        if not os.path.exists(self.db_path):
+            return []
+        with closing(sqlite3.connect(f"file:{quote(os.path.abspath(self.db_path))}?mode=ro", uri=True)) as conn:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone():
+                return []
+            return conn.execute(sql, params).fetchall()
+
+    # --- Schema ---
+
+    def _ensure_fingerprints(self, conn: sqlite3.Connection):
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{self.table_name}")')]
+        if columns and ROW_HASH_COLUMN not in columns:
+            # A table built by a full load has no fingerprints to diff against:
+            # drop it and let this run re-ingest everything once.
+            print(f"Ingestor: '{self.table_name}' has no row fingerprints. Rebuilding it from this release.")
+            conn.execute(f'DROP TABLE "{self.table_name}"')
+            conn.execute(f"DELETE FROM {PARTITIONS_TABLE}")
+            conn.execute(f'DROP TABLE IF EXISTS "{DAILY_ROLLUP_TABLE}"')
+
+    def _ensure_date_index(self, conn: sqlite3.Connection):
+        # Revised dates are looked up by DT_NOTIFIC on every run.
+        if conn.execute(f'PRAGMA table_info("{self.table_name}")').fetchone():
+            create_date_index(conn, self.table_name)
+
+    # --- Pass 1 ---
+
+    def _compute_digests(self, adapter: DatasusCsvAdapter) -> Dict[str, str]:
+        # date -> [row count, sum of high 32 bits, sum of low 32 bits]
+        # Summing the two halves separately avoids uint64 overflow and makes
+        # the digest independent of row order.
+        totals: Dict[str, List[int]] = {}
+
+        for chunk in adapter.iter_chunks(iso_dates=True):
+            hashes = _row_hashes(chunk)
+            grouped = pd.DataFrame({
+                "date": chunk["DT_NOTIFIC"].fillna(NULL_DATE_KEY).to_numpy(),
+                "n": 1,
+                "hi": (hashes >> np.uint64(32)).astype(np.int64),
+                "lo": (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64),
+            }).groupby("date").sum()
+
+            for date_key, n, hi, lo in grouped.itertuples():
+                acc = totals.setdefault(date_key, [0, 0, 0])
+                acc[0] += int(n)
+                acc[1] += int(hi)
+                acc[2] += int(lo)
+
+        return {d: f"{n}:{hi:x}:{lo:x}" for d, (n, hi, lo) in totals.items()}
+
+    # --- Pass 2 ---
+
+    def _apply_changes(self, conn, adapter, new_dates: set, revised_dates: List[str]):
+        # Fingerprints currently stored for the revised dates (usually a handful)
+        stored = {}
+        for date_key in revised_dates:
+            where, params = self._date_predicate(date_key)
+            stored[date_key] = Counter(
+                h for (h,) in conn.execute(
+                    f'SELECT "{ROW_HASH_COLUMN}" FROM "{self.table_name}" WHERE {where}', params
+                )
+            )
+
+        inserted = 0
+        for chunk in adapter.iter_chunks(iso_dates=True):
+            date_keys = chunk["DT_NOTIFIC"].fillna(NULL_DATE_KEY)
+            chunk[ROW_HASH_COLUMN] = _row_hashes(chunk).astype(np.int64)
+
+            # New dates: every row is new
+            keep = date_keys.isin(new_dates).to_numpy()
+
+            # Revised dates: only rows whose fingerprint is not already stored
+            revised_mask = date_keys.isin(list(stored)).to_numpy()
+            for pos in np.flatnonzero(revised_mask):
+                counts = stored[date_keys.iat[pos]]
+                row_hash = int(chunk[ROW_HASH_COLUMN].iat[pos])
+                if counts[row_hash] > 0:
+                    counts[row_hash] -= 1
+                else:
+                    keep[pos] = True
+
+            if keep.any():
+                chunk[keep].to_sql(self.table_name, conn, if_exists="append", index=False)
+                inserted += int(keep.sum())
+
+        # Whatever is left in `stored` no longer exists in the release
+        deleted = 0
+        for date_key, counts in stored.items():
+            where, params = self._date_predicate(date_key)
+            for row_hash, surplus in counts.items():
+                if surplus <= 0:
+                    continue
+                deleted += conn.execute(
+                    f'DELETE FROM "{self.table_name}" WHERE rowid IN ('
+                    f'SELECT rowid FROM "{self.table_name}" WHERE {where} AND "{ROW_HASH_COLUMN}" = ? LIMIT ?)',
+                    (*params, row_hash, surplus),
+                ).rowcount
+
+        return inserted, deleted
+
+    # --- Bookkeeping ---
+
+    @staticmethod
+    def _date_predicate(date_key: str):
+        if date_key == NULL_DATE_KEY:
+            return "DT_NOTIFIC IS NULL", ()
+        return "DT_NOTIFIC = ?", (date_key,)
+
+    @staticmethod
+    def _save_partitions(conn, source_digests, changed_dates, removed_dates):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {PARTITIONS_TABLE} (date, n_rows, digest) VALUES (?, ?, ?)",
+            [(d, int(source_digests[d].split(":")[0]), source_digests[d]) for d in changed_dates],
+        )
+        conn.executemany(f"DELETE FROM {PARTITIONS_TABLE} WHERE date = ?", [(d,) for d in removed_dates])
+
+    @staticmethod
+    def _save_state(conn, source_digests) -> str:
+        dated = [d for d in source_digests if d != NULL_DATE_KEY]
+        watermark_date = max(dated) if dated else None
+        fingerprint = hashlib.sha1(json.dumps(sorted(source_digests.items())).encode("utf-8")).hexdigest()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {STATE_TABLE} (key, value) VALUES (?, ?)",
+            [("watermark_date", watermark_date), ("release_fingerprint", fingerprint)],
+        )
+        return watermark_date
+
+    @staticmethod
+    def _log_run(conn, source_path: str, result: IngestionResult):
+        log_run(
+            conn, result.run_id, source_path,
+            rows_inserted=result.rows_inserted,
+            rows_deleted=result.rows_deleted,
+            new_dates=len(result.new_dates),
+            revised_dates=len(result.revised_dates),
+            removed_dates=len(result.removed_dates),
+            watermark_date=result.watermark_date,
+            changed_dates=result.changed_dates,
+        )
+
+
+def _row_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(chunk[list(SRAG_CSV_DTYPES)], index=False).to_numpy()
+
+
+def merge_date_ranges(dates: List[str]) -> List[Tuple[str, str]]:
+    """Collapses sorted ISO dates into contiguous (start, end) ranges."""
+    ranges = []
+    for d in dates:
+        if d == NULL_DATE_KEY:
+            continue
+        day = datetime.date.fromisoformat(d)
+        if ranges and (day - datetime.date.fromisoformat(ranges[-1][1])).days == 1:
+            ranges[-1][1] = d
+        else:
+            ranges.append([d, d])
+    return [tuple(r) for r in ranges]
@@ -0,0 +1,105 @@
+# src/internal/data_retrieval/adapters/ingest_log.py
+import os
+import json
+import sqlite3
+import datetime
+from typing import List
+
+# Bookkeeping tables of the incremental ingestion (see incremental_loader).
+# Their names deliberately avoid 'srag'/'influd' so SqliteSragAdapter's
+# table detection never picks them up.
+PARTITIONS_TABLE = "ingest_partitions"
+STATE_TABLE = "ingest_state"
+LOG_TABLE = "ingest_log"
+
+NULL_DATE_KEY = ""
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {PARTITIONS_TABLE} "
+        "(date TEXT PRIMARY KEY, n_rows INTEGER, digest TEXT)"
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {LOG_TABLE} ("
+        "run_id INTEGER PRIMARY KEY, run_at TEXT, source TEXT, "
+        "rows_inserted INTEGER, rows_deleted INTEGER, "
+        "new_dates INTEGER, revised_dates INTEGER, removed_dates INTEGER, "
+        "watermark_date TEXT, changed_dates TEXT)"
+    )
+
+
+def next_run_id(conn: sqlite3.Connection) -> int:
+    (last,) = conn.execute(f"SELECT COALESCE(MAX(run_id), 0) FROM {LOG_TABLE}").fetchone()
+    return last + 1
+
+
+def log_run(conn: sqlite3.Connection, run_id: int, source_path: str, rows_inserted: int, rows_deleted: int,
+            new_dates: int, revised_dates: int, removed_dates: int, watermark_date: str, changed_dates: List[str]):
+    conn.execute(
+        f"INSERT INTO {LOG_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            run_id,
+            datetime.datetime.now().isoformat(timespec="seconds"),
+            os.path.abspath(source_path),
+            rows_inserted,
+            rows_deleted,
+            new_dates,
+            revised_dates,
+            removed_dates,
+            watermark_date,
+            json.dumps(changed_dates),
+        ),
+    )
+
+
+def carry_over_history(conn: sqlite3.Connection, previous_db: str, table_name: str, source_path: str, rows: int):
+    """
+    Called when a full load rebuilds an ingest-managed store (`conn`, the
+    new file) that replaces `previous_db`. Copies the run log and state over
+    and logs the rebuild as one more run touching every date, so run ids
+    keep growing and `changes_since` consumers refresh everything instead
+    of silently missing the reload.
+
+    Partitions are not copied: a fully loaded table has no row fingerprints,
+    so the next incremental run re-ingests it once anyway.
+    """
+    conn.commit()  # DETACH cannot run inside a transaction.
+    conn.execute("ATTACH DATABASE ? AS previous", (previous_db,))
+    try:
+        tables = {name for (name,) in conn.execute("SELECT name FROM previous.sqlite_master WHERE type='table'")}
+        if LOG_TABLE not in tables:
+            return
+        old_dates, old_rows = set(), 0
+        if table_name in tables:
+            old_dates = {
+                d or NULL_DATE_KEY for (d,) in conn.execute(f'SELECT DISTINCT DT_NOTIFIC FROM previous."{table_name}"')
+            }
+            (old_rows,) = conn.execute(f'SELECT COUNT(*) FROM previous."{table_name}"').fetchone()
+
+        ensure_schema(conn)
+        conn.execute(f"INSERT INTO main.{LOG_TABLE} SELECT * FROM previous.{LOG_TABLE}")
+        if STATE_TABLE in tables:
+            conn.execute(f"INSERT INTO main.{STATE_TABLE} SELECT * FROM previous.{STATE_TABLE}")
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE previous")
+
+    dates = {d or NULL_DATE_KEY for (d,) in conn.execute(f'SELECT DISTINCT DT_NOTIFIC FROM "{table_name}"')}
+    dated = [d for d in dates if d != NULL_DATE_KEY]
+    watermark_date = max(dated) if dated else None
+    log_run(
+        conn, next_run_id(conn), source_path,
+        rows_inserted=rows,
+        rows_deleted=old_rows,
+        new_dates=len(dates - old_dates),
+        revised_dates=len(dates & old_dates),
+        removed_dates=len(old_dates - dates),
+        watermark_date=watermark_date,
+        changed_dates=sorted(dates | old_dates),
+    )
+    # The release fingerprint described the replaced store.
+    conn.execute(f"DELETE FROM {STATE_TABLE} WHERE key = 'release_fingerprint'")
+    conn.execute(f"INSERT OR REPLACE INTO {STATE_TABLE} (key, value) VALUES ('watermark_date', ?)", (watermark_date,))
+    conn.commit()
@@ -0,0 +1,194 @@
+# src/internal/data_retrieval/adapters/snapshot_cache.py
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Bump whenever the on-disk layout (or what gets stored in it) changes,
+# so old snapshots are ignored instead of misread.
+SNAPSHOT_FORMAT_VERSION = 2
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class ColumnarSnapshotCache:
+    """
+    Typed columnar cache for frames derived from a source file.
+
+    Each snapshot is a directory with one `.npy` file per column plus a
+    manifest. Snapshots are keyed by the source file's path, size and mtime,
+    so a rebuilt/replaced source is detected without reading it. Numeric
+    columns are loaded memory-mapped (no copy, no parsing); string columns
+    come back as categoricals whose codes are memory-mapped.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = os.path.abspath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # --- Keys ---
+
+    @staticmethod
+    def source_signature(source_path: str) -> dict:
+        stat = os.stat(source_path)
+        return {
+            "path": os.path.abspath(source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def snapshot_key(self, source_path: str, variant: str = "") -> str:
+        """
+        Args:
+            source_path: File the snapshot is derived from.
+            variant: Free-form discriminator for different derivations of the
+                same source (e.g. a column list or query window).
+        """
+        payload = {
+            **self.source_signature(source_path),
+            "variant": variant,
+            "version": SNAPSHOT_FORMAT_VERSION,
+        }
+        raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()[:16]
+
+    def _snapshot_path(self, source_path: str, key: str) -> str:
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{key}")
+
+    # --- Public API ---
+
+    def get_or_build(self, source_path: str, builder, variant: str = "") -> pd.DataFrame:
+        """
+        Returns the cached frame for `source_path`, calling `builder()` and
+        persisting its result when no valid snapshot exists.
+        """
+        df = self.load(source_path, variant)
+        if df is not None:
+            return df
+
+        df = builder()
+        try:
+            self.save(source_path, df, variant)
+        except OSError as e:
+            # A read-only or full disk must not break data loading.
+            print(f"[Snapshot Cache] Could not write snapshot: {e}")
+        return df
+
+    def load(self, source_path: str, variant: str = ""):
+        key = self.snapshot_key(source_path, variant)
+        snapshot_path = self._snapshot_path(source_path, key)
+        manifest_path = os.path.join(snapshot_path, MANIFEST_FILENAME)
+
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            columns = {}
+            for col in manifest["columns"]:
+                columns[col["name"]] = self._load_column(snapshot_path, col)
+
+            df = pd.DataFrame(columns, copy=False)
+            df.attrs.update(manifest.get("attrs", {}))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Snapshot Cache] Ignoring unreadable snapshot {snapshot_path}: {e}")
+            return None
+
+        print(f"[Snapshot Cache] Loaded {len(df)} rows from snapshot {os.path.basename(snapshot_path)}.")
+        return df
+
+    def save(self, source_path: str, df: pd.DataFrame, variant: str = "") -> str:
+        key = self.snapshot_key(source_path, variant)
+        snapshot_path = self._snapshot_path(source_path, key)
+
+        # Write into a temp dir and rename, so concurrent readers never
+        # see a half-written snapshot.
+        tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            columns = []
+            for i, name in enumerate(df.columns):
+                columns.append(self._save_column(tmp_path, f"c{i}", df[name]))
+
+            manifest = {
+                "version": SNAPSHOT_FORMAT_VERSION,
+                "key": key,
+                "variant": variant,
+                "source": self.source_signature(source_path),
+                "rows": len(df),
+                "columns": columns,
+                "attrs": self._json_attrs(df.attrs),
+            }
+            with open(os.path.join(tmp_path, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+            try:
+                os.replace(tmp_path, snapshot_path)
+            except OSError:
+                # Another process published the same snapshot first.
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self._prune_stale(source_path, keep=snapshot_path)
+        print(f"[Snapshot Cache] Wrote snapshot {os.path.basename(snapshot_path)} ({len(df)} rows).")
+        return snapshot_path
+
+    # --- Column Encoding ---
+
+    def _save_column(self, snapshot_path: str, file_id: str, series: pd.Series) -> dict:
+        meta = {"name": str(series.name), "file": f"{file_id}.npy"}
+
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+            # Fixed-width types are stored as-is and memory-mapped on load.
+            meta["kind"] = "array"
+            values = series.to_numpy()
+        else:
+            # Strings become categorical codes (mmap-able, -1 for nulls) plus
+            # their distinct values, which are all that gets copied on load.
+            meta["kind"] = "category"
+            mask = series.isna().to_numpy()
+            categorical = pd.Categorical(np.where(mask, None, series.astype(str).to_numpy()))
+            values = categorical.codes
+            meta["categories"] = f"{file_id}.categories.npy"
+            np.save(os.path.join(snapshot_path, meta["categories"]), categorical.categories.to_numpy(dtype=np.str_))
+
+        np.save(os.path.join(snapshot_path, meta["file"]), values)
+        return meta
+
+    def _load_column(self, snapshot_path: str, meta: dict):
+        values = np.load(os.path.join(snapshot_path, meta["file"]), mmap_mode="r")
+        if meta["kind"] == "array":
+            return values
+
+        categories = np.load(os.path.join(snapshot_path, meta["categories"])).astype(object)
+        return pd.Categorical.from_codes(values, categories=pd.Index(categories, dtype=object))
+
+    @staticmethod
+    def _json_attrs(attrs: dict) -> dict:
+        # Only keep attrs that survive a JSON round trip.
+        return {k: v for k, v in attrs.items() if isinstance(v, (str, int, float, bool))}
+
+    # --- Housekeeping ---
+
+    def _prune_stale(self, source_path: str, keep: str):
+        """Removes snapshots of the same source built from an older version of it."""
+        current = self.source_signature(source_path)
+        for entry in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, entry)
+            if path == keep or entry.startswith(".tmp-"):
+                continue
+            manifest_path = os.path.join(path, MANIFEST_FILENAME)
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    source = json.load(f).get("source", {})
+            except (OSError, ValueError):
+                continue
+            if source.get("path") == current["path"] and source != current:
+                shutil.rmtree(path, ignore_errors=True)
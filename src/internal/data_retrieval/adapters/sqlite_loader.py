@@ -1,16 +1,76 @@
 import os
 import sqlite3
+import datetime
 import pandas as pd
-from ..ports.clinical_data import ClinicalDataPort
+try:
+    from ..ports.clinical_data import ClinicalDataPort
+except ImportError:
+    # The ports package is not shipped with every checkout; the adapter
+    # only uses the port as its base class.
+    ClinicalDataPort = object
+from .snapshot_cache import ColumnarSnapshotCache
+from ..connection_pool import readonly_connection
+from src.domain.sars.frame_schema import parse_dates, FRAME_SCHEMA_VERSION
+from src.domain.sars.cleaning import clean_srag_frame, CLEANING_VERSION
+from src.domain.sars.rollups import DAILY_ROLLUP_TABLE
+
+DEFAULT_COLUMNS = ('DT_NOTIFIC', 'EVOLUCAO', 'UTI', 'VACINA')
+
+# DT_NOTIFIC values SQL range predicates can compare: 'YYYY-MM-DD...'.
+ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+
+
+def detect_srag_table(conn: sqlite3.Connection, schema: str = "main") -> str:
+    """
+    Returns the SRAG table of a DB (or of an attached `schema`): the first
+    table whose name contains 'srag' or 'influd', else the first table.
+    The `srag_daily` rollup is never picked.
+    """
+    tables = conn.execute(
+        f'SELECT name FROM "{schema}".sqlite_master WHERE type=\'table\' AND name != ?;', (DAILY_ROLLUP_TABLE,)
+    ).fetchall()
+
+    if not tables:
+        raise ValueError("The database is empty (no tables found).")
+
+    # Default to first, or prioritize known table names
+    table_name = tables[0][0]
+    for t in tables:
+        name = t[0].lower()
+        if "srag" in name or "influd" in name:
+            table_name = t[0]
+            break
+    return table_name
 
 class SqliteSragAdapter(ClinicalDataPort):
-    def __init__(self, db_uri: str, root_dir: str = None):
+    def __init__(
+        self,
+        db_uri: str,
+        root_dir: str = None,
+        snapshot_dir: str = None,
+        sort_by_date: bool = False,
+        columns: tuple = DEFAULT_COLUMNS,
+        lookback_days: int = None,
+    ):
         """
         Args:
             db_uri: The database URI (e.g., 'sqlite:///data/db.sqlite')
             root_dir: Optional root directory to resolve relative paths against.
+            snapshot_dir: Optional directory for the columnar snapshot cache.
+                When set, the table is read from SQLite only once per version
+                of the DB file; later loads memory-map the snapshot.
+            sort_by_date: Return rows ordered by DT_NOTIFIC.
+            columns: Default column projection for `get_raw_srag_data`.
+            lookback_days: Default window: only rows notified in the last N days
+                before the latest DT_NOTIFIC. None loads the whole table.
         """
         self.db_path = self._resolve_path(db_uri, root_dir)
+        self.snapshot_cache = ColumnarSnapshotCache(snapshot_dir) if snapshot_dir else None
+        self.sort_by_date = sort_by_date
+        self.columns = tuple(columns)
+        self.lookback_days = lookback_days
+        self._table_name = None
+        self._iso_dates = None
 
     def _resolve_path(self, uri: str, root_dir: str) -> str:
         # Strip protocol
@@ -25,39 +85,223 @@ class SqliteSragAdapter(ClinicalDataPort):
             
         return path
 
-    def get_raw_srag_data(self) -> pd.DataFrame:
+    def get_raw_srag_data(
+        self,
+        columns: tuple = None,
+        start_date: str = None,
+        end_date: str = None,
+        lookback_days: int = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the cleaned SRAG frame (see domain.sars.cleaning), with
+        df.attrs['latest_date'] set. The column list and date window are
+        pushed down into the SQL query.
+
+        Args:
+            columns: Columns to load (defaults to the adapter's projection).
+            start_date / end_date: Inclusive DT_NOTIFIC bounds ('YYYY-MM-DD').
+            lookback_days: Only the last N days before the latest DT_NOTIFIC
+                (defaults to the adapter's lookback_days).
+        """
+        request = {
+            "columns": tuple(columns or self.columns),
+            "start_date": self._iso(start_date),
+            "end_date": self._iso(end_date),
+            "lookback_days": lookback_days if lookback_days is not None else self.lookback_days,
+        }
+
+        def build():
+            # A windowed frame is cleaned against the whole table's anchor,
+            # not the latest date inside its window.
+            windowed = request["start_date"] or request["end_date"] or request["lookback_days"]
+            return clean_srag_frame(
+                self._query_srag_data(**request),
+                reference_date=self.latest_date() if windowed else None,
+                sort_by_date=self.sort_by_date,
+            )
+
+        if self.snapshot_cache is None:
+            return build()
+
+        variant = (
+            f"compact-v{FRAME_SCHEMA_VERSION};clean-v{CLEANING_VERSION};sorted={self.sort_by_date};"
+            f"cols={','.join(request['columns'])};start={request['start_date']};"
+            f"end={request['end_date']};lookback={request['lookback_days']}"
+        )
+        return self.snapshot_cache.get_or_build(self.db_path, build, variant)
+
+    def _query_srag_data(
+        self,
+        columns: tuple = DEFAULT_COLUMNS,
+        start_date: str = None,
+        end_date: str = None,
+        lookback_days: int = None,
+    ) -> pd.DataFrame:
         print(f"Adapter connecting to SQLite DB at {self.db_path}...")
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            windowed = bool(start_date or end_date or lookback_days)
+            with readonly_connection(self.db_path) as conn:
                 # 1. Dynamic Table Detection
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = cursor.fetchall()
-                
-                if not tables:
-                    raise ValueError("The database is empty (no tables found).")
-                
-                # Default to first, or prioritize known table names
-                table_name = tables[0][0]
-                for t in tables:
-                    name = t[0].lower()
-                    if "srag" in name or "influd" in name:
-                        table_name = t[0]
-                        break
-                
-                print(f"Adapter detected table: '{table_name}'")
-
-                # 2. Optimized Query
-                query = f"SELECT DT_NOTIFIC, EVOLUCAO, UTI, VACINA FROM {table_name}"
-                df = pd.read_sql_query(query, conn)
-                
-                # 3. Basic Cleaning (Schema Compliance)
-                df['UTI'] = df['UTI'].fillna(9) 
-                
+                table_name = self._detect_table(conn)
+                if windowed:
+                    self._check_dates(conn, table_name)
+
+                # 2. Column Projection
+                available = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+                missing = [c for c in columns if c not in available]
+                if missing:
+                    raise ValueError(f"Columns not found in '{table_name}': {missing}")
+
+                query_columns = list(columns)
+                if windowed and 'DT_NOTIFIC' not in query_columns:
+                    query_columns.append('DT_NOTIFIC')
+                select = ", ".join(f'"{c}"' for c in query_columns)
+
+                # 3. Window Pushdown
+                where, params, pushed = "", [], False
+                if windowed and self._iso_dates:
+                    start_date = self._window_start(conn, table_name, start_date, lookback_days)
+                    clauses = []
+                    if start_date:
+                        clauses.append("DT_NOTIFIC >= ?")
+                        params.append(start_date)
+                    if end_date:
+                        # '< next day' keeps values with a time part on the
+                        # end day ('YYYY-MM-DD HH:MM:SS') and the index usable.
+                        clauses.append("DT_NOTIFIC < ?")
+                        params.append(self._next_day(end_date))
+                    if clauses:
+                        where = " WHERE " + " AND ".join(clauses)
+                    pushed = True
+
+                query = f'SELECT {select} FROM "{table_name}"{where}'
+                df = pd.read_sql_query(query, conn, params=params)
+
+                # Dates that are not ISO strings cannot be range-compared in SQL:
+                # apply the same window in pandas instead.
+                if windowed and not pushed:
+                    print("Adapter: DT_NOTIFIC is not ISO formatted; applying the date window after loading.")
+                    df = self._filter_window(df, start_date, end_date, lookback_days)
+
+                df = df[list(columns)]
                 print(f"Adapter loaded {len(df)} rows.")
                 return df
 
         except Exception as e:
             print(f"Adapter Error: {e}")
-            raise e
\ No newline at end of file
+            raise e
+
+    def latest_date(self) -> str:
+        """
+        Latest non-future DT_NOTIFIC in the DB ('YYYY-MM-DD'), or None.
+        This is the anchor `lookback_days` windows are measured from.
+        """
+        with readonly_connection(self.db_path) as conn:
+            table_name = self._detect_table(conn)
+            self._check_dates(conn, table_name)
+            if self._iso_dates:
+                latest = self._latest_iso_date(conn, table_name)
+                return latest[:10] if latest else None
+
+            dates = parse_dates(pd.read_sql_query(f'SELECT DT_NOTIFIC FROM "{table_name}"', conn)['DT_NOTIFIC'])
+        latest = dates[dates <= pd.Timestamp.today()].max()
+        return latest.strftime('%Y-%m-%d') if pd.notna(latest) else None
+
+    # --- Table & Index Management ---
+
+    def _detect_table(self, conn: sqlite3.Connection) -> str:
+        if self._table_name:
+            return self._table_name
+
+        table_name = detect_srag_table(conn)
+        print(f"Adapter detected table: '{table_name}'")
+        self._table_name = table_name
+        return table_name
+
+    def _check_dates(self, conn: sqlite3.Connection, table_name: str):
+        """
+        Runs once per adapter, the first time a window is requested: checks
+        whether DT_NOTIFIC holds ISO strings (so SQL range predicates work)
+        and is indexed. Read-only, like every pooled connection: the index is
+        created when the DB is built (`DatasusCsvAdapter.write_to_sqlite`,
+        `IncrementalSragIngestor`).
+        """
+        if self._iso_dates is not None:
+            return
+
+        self._iso_dates = self._has_iso_dates(conn, table_name)
+        indexed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql LIKE '%DT_NOTIFIC%'",
+            (table_name,)
+        ).fetchone()
+        if self._iso_dates and not indexed:
+            print(
+                f"Adapter Warning: '{table_name}' has no index on DT_NOTIFIC. Window queries will scan; "
+                "rebuild the DB with scripts/run_ingestion.py to add it."
+            )
+
+    # --- Window Helpers ---
+
+    @staticmethod
+    def _iso(value) -> str:
+        if value is None:
+            return None
+        return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _next_day(date: str) -> str:
+        return (pd.Timestamp(date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _has_iso_dates(conn: sqlite3.Connection, table_name: str) -> bool:
+        """
+        True when every non-null DT_NOTIFIC starts with 'YYYY-MM-DD'. Checks
+        the whole column (once per adapter): a single mixed-format row
+        would otherwise fall outside every SQL range predicate.
+        """
+        (has_dates,) = conn.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{table_name}" WHERE DT_NOTIFIC IS NOT NULL)'
+        ).fetchone()
+        (has_other,) = conn.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{table_name}" '
+            f'WHERE DT_NOTIFIC IS NOT NULL AND DT_NOTIFIC NOT GLOB ?)', (ISO_DATE_GLOB,)
+        ).fetchone()
+        return bool(has_dates) and not has_other
+
+    @classmethod
+    def _latest_iso_date(cls, conn, table_name: str) -> str:
+        """Latest DT_NOTIFIC not after today, times included. Served from the DT_NOTIFIC index."""
+        tomorrow = cls._next_day(datetime.date.today())
+        (latest,) = conn.execute(
+            f'SELECT MAX(DT_NOTIFIC) FROM "{table_name}" WHERE DT_NOTIFIC < ?', (tomorrow,)
+        ).fetchone()
+        return latest
+
+    @classmethod
+    def _window_start(cls, conn, table_name: str, start_date: str, lookback_days: int) -> str:
+        if not lookback_days:
+            return start_date
+
+        # Anchor on the latest non-future date, so one mistyped year does not
+        # shift the whole window.
+        latest = cls._latest_iso_date(conn, table_name)
+        if not latest:
+            return start_date
+
+        lookback_start = (pd.Timestamp(latest[:10]) - pd.Timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+        return max(start_date, lookback_start) if start_date else lookback_start
+
+    @staticmethod
+    def _filter_window(df: pd.DataFrame, start_date: str, end_date: str, lookback_days: int) -> pd.DataFrame:
+        dates = parse_dates(df['DT_NOTIFIC'])
+        mask = pd.Series(True, index=df.index)
+        if lookback_days:
+            latest = dates[dates <= pd.Timestamp.today()].max()
+            if pd.notna(latest):
+                mask &= dates >= latest.normalize() - pd.Timedelta(days=lookback_days)
+        if start_date:
+            mask &= dates >= pd.Timestamp(start_date)
+        if end_date:
+            mask &= dates < pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        return df[mask.to_numpy()]
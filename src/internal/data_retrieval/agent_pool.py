@@ -0,0 +1,60 @@
+# src/internal/data_retrieval/agent_pool.py
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Snapshots kept per pool; older ones are dropped (a new data release replaces them).
+DEFAULT_MAX_SNAPSHOTS = 2
+
+
+class SQLAgentPool:
+    """
+    Prebuilt SQL agent executors, per data snapshot.
+
+    `build()` returns an (executor, toolkit) pair; building it (DB handle,
+    toolkit, prompt, runnable graph) happens once per snapshot and
+    concurrent run instead of on every run. The entry's DB is its
+    toolkit's `db`. A run checks a pair out, so no two runs share
+    one - its toolkit's per-run state (stats, executed SQL) is reset on
+    checkout - and returns it afterwards for the next run.
+    """
+
+    def __init__(self, name: str, max_snapshots: int = DEFAULT_MAX_SNAPSHOTS):
+        self.name = name
+        self.max_snapshots = max_snapshots
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, snapshot: str, build):
+        """
+        Yields (executor, toolkit, build_seconds) for `snapshot`: an idle
+        prebuilt pair (build_seconds 0.0) or a new one from `build()`.
+        """
+        with self._lock:
+            idle = self._idle.setdefault(snapshot, [])
+            self._idle.move_to_end(snapshot)
+            while len(self._idle) > self.max_snapshots:
+                self._idle.popitem(last=False)
+            entry = idle.pop() if idle else None
+
+        build_seconds = 0.0
+        if entry is None:
+            start = time.perf_counter()
+            entry = build()
+            build_seconds = time.perf_counter() - start
+        executor, toolkit = entry
+        toolkit.reset_run_state()
+
+        try:
+            yield executor, toolkit, build_seconds
+        finally:
+            with self._lock:
+                # Dropped meanwhile when its snapshot aged out.
+                if snapshot in self._idle:
+                    self._idle[snapshot].append(entry)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
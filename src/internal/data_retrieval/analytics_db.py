@@ -0,0 +1,150 @@
+# src/internal/data_retrieval/analytics_db.py
+import os
+import glob
+import time
+import sqlite3
+import hashlib
+import tempfile
+import pandas as pd
+from langchain_community.utilities import SQLDatabase
+from .connection_pool import get_readonly_engine
+from .schema_cache import get_sql_database, DEFAULT_SAMPLE_ROWS
+from src.domain.sars.frame_schema import to_sql_frame, FRAME_SCHEMA_VERSION
+from src.domain.sars.cleaning import CLEANING_VERSION
+from src.domain.sars.rollups import daily_rollup, DAILY_ROLLUP_TABLE
+
+ANALYTICS_TABLE = "srag_records"
+
+# Columns the agents filter and group by (see DATA_DICTIONARY_TEXT).
+INDEXED_COLUMNS = ('DT_NOTIFIC', 'EVOLUCAO', 'UTI', 'VACINA')
+
+# Bump when the layout of the analytics DB changes.
+ANALYTICS_DB_VERSION = 2
+
+# DBs of other snapshots are pruned after a build, but only beyond the most
+# recently used few and once idle for a while: a concurrent run may still
+# be building or reading one.
+ANALYTICS_DB_KEEP = 3
+ANALYTICS_DB_GRACE_S = 24 * 3600
+
+# Last use is tracked on a sidecar file, never on the DB itself: its mtime
+# is part of the connection pool's key (see connection_pool.file_version).
+USED_SUFFIX = ".used"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a frame: equal data -> same analytics DB."""
+    digest = hashlib.sha1()
+    digest.update(f"v{ANALYTICS_DB_VERSION};{FRAME_SCHEMA_VERSION};{CLEANING_VERSION};".encode())
+    digest.update(",".join(f"{c}:{t}" for c, t in df.dtypes.astype(str).items()).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def write_analytics_tables(df: pd.DataFrame, con):
+    """
+    Writes `srag_records` and its `srag_daily` rollup into `con` (a sqlite3
+    connection or SQLAlchemy engine). Dates go in as ISO strings, as
+    DATA_DICTIONARY_TEXT describes them.
+    """
+    to_sql_frame(df).to_sql(ANALYTICS_TABLE, con, index=False, if_exists='replace')
+    rollup = daily_rollup(df)
+    rollup['date'] = rollup['date'].dt.strftime('%Y-%m-%d')
+    rollup.to_sql(DAILY_ROLLUP_TABLE, con, index=False, if_exists='replace')
+
+
+def build_analytics_db(df: pd.DataFrame, analytics_dir: str) -> str:
+    """
+    Writes the SRAG frame once into an indexed, on-disk SQLite file that
+    the SQL agents share (read-only, through the connection pool), together
+    with its `srag_daily` rollup.
+
+    The file is named after the frame's content, so the same data snapshot
+    reuses the DB across runs; DBs of other snapshots are pruned once
+    they fall out of the most recently used and have been idle for a while
+    (see `prune_analytics_dbs`).
+
+    Returns:
+        Path to the analytics DB.
+    """
+    os.makedirs(analytics_dir, exist_ok=True)
+    db_path = os.path.join(os.path.abspath(analytics_dir), f"analytics-{frame_fingerprint(df)}.db")
+    if os.path.exists(db_path):
+        print(f"[Analytics DB] Reusing {os.path.basename(db_path)}.")
+        _mark_used(db_path)
+        return db_path
+
+    # Build next to the target and rename, so readers never see a partial DB.
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".db", dir=analytics_dir)
+    os.close(fd)
+    try:
+        with sqlite3.connect(tmp_path) as conn:
+            conn.execute("PRAGMA journal_mode=OFF;")
+            conn.execute("PRAGMA synchronous=OFF;")
+            write_analytics_tables(df, conn)
+            for col in INDEXED_COLUMNS:
+                if col in df.columns:
+                    conn.execute(f'CREATE INDEX "idx_{ANALYTICS_TABLE}_{col.lower()}" ON "{ANALYTICS_TABLE}" ("{col}")')
+            conn.execute(f'CREATE UNIQUE INDEX "idx_{DAILY_ROLLUP_TABLE}_date" ON "{DAILY_ROLLUP_TABLE}" (date)')
+            conn.execute("ANALYZE;")
+        conn.close()
+        os.replace(tmp_path, db_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _mark_used(db_path)
+    prune_analytics_dbs(analytics_dir, keep=db_path)
+    print(f"[Analytics DB] Built {os.path.basename(db_path)} ({len(df)} rows).")
+    return db_path
+
+
+def prune_analytics_dbs(analytics_dir: str, keep: str = None,
+                        max_dbs: int = ANALYTICS_DB_KEEP, grace_s: float = ANALYTICS_DB_GRACE_S):
+    """
+    Removes analytics DBs beyond the `max_dbs` most recently used that have
+    not been used for `grace_s` seconds. `keep` (the DB just built) is
+    never removed.
+    """
+    now = time.time()
+    dbs = []
+    for path in glob.glob(os.path.join(analytics_dir, "analytics-*.db")):
+        try:
+            dbs.append((_last_used(path), os.path.abspath(path)))
+        except OSError:
+            continue
+    dbs.sort(reverse=True)
+    for used, path in dbs[max_dbs:]:
+        if path == keep or now - used < grace_s:
+            continue
+        for stale in (path, path + USED_SUFFIX):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _mark_used(db_path: str):
+    try:
+        with open(db_path + USED_SUFFIX, "a"):
+            pass
+        os.utime(db_path + USED_SUFFIX)
+    except OSError:
+        pass
+
+
+def _last_used(db_path: str) -> float:
+    """When `db_path` was last built or reused (its own mtime for DBs without a sidecar)."""
+    try:
+        return os.path.getmtime(db_path + USED_SUFFIX)
+    except OSError:
+        return os.path.getmtime(db_path)
+
+
+def open_analytics_db(db_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> SQLDatabase:
+    """
+    SQLDatabase handle on the shared, read-only pool for `db_path`, with
+    `sample_rows` rows per table in its table_info. Reflected once per DB.
+    """
+    return get_sql_database(get_readonly_engine(db_path), sample_rows)
@@ -0,0 +1,122 @@
+# src/internal/data_retrieval/connection_pool.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Tuned for a read-mostly, few-hundred-MB SRAG file: map it into memory
+# instead of copying pages through read(), and keep a generous page cache.
+DEFAULT_MMAP_SIZE = 512 * 1024 * 1024       # bytes
+DEFAULT_CACHE_SIZE_KB = 64 * 1024           # per connection
+DEFAULT_POOL_SIZE = 4                       # >= parallel workflow branches
+DEFAULT_MAX_OVERFLOW = 4
+
+# One engine (and thus one pool) per version of each DB file.
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def path_from_uri(db_uri: str) -> str:
+    """'sqlite:///path/to/file.db' -> 'path/to/file.db'"""
+    return db_uri.replace("sqlite:///", "")
+
+
+def readonly_uri(db_path: str) -> str:
+    """
+    SQLite URI opening `db_path` read-only and immutable: no locks, no
+    change detection. Safe because pools are keyed by the file's
+    size/mtime, so a rewritten file gets new connections.
+    """
+    return f"file:{quote(os.path.abspath(db_path))}?mode=ro&immutable=1"
+
+
+def _connect(db_path: str, mmap_size: int, cache_size_kb: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(readonly_uri(db_path), uri=True, check_same_thread=False)
+    tune_connection(conn, mmap_size, cache_size_kb)
+    return conn
+
+
+def tune_connection(conn: sqlite3.Connection, mmap_size: int = DEFAULT_MMAP_SIZE,
+                    cache_size_kb: int = DEFAULT_CACHE_SIZE_KB, schema: str = "main"):
+    conn.execute(f'PRAGMA "{schema}".mmap_size={int(mmap_size)};')
+    conn.execute(f'PRAGMA "{schema}".cache_size=-{int(cache_size_kb)};')
+
+
+def get_readonly_engine(
+    db_path: str,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    mmap_size: int = DEFAULT_MMAP_SIZE,
+    cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+) -> Engine:
+    """
+    Returns the process-wide SQLAlchemy engine for `db_path`.
+
+    The engine's QueuePool is the single connection pool shared by the data
+    adapter (via `readonly_connection`), `sql_tool` and the SQL agent nodes
+    (via `SQLDatabase(engine=...)`). Connections are thread-safe to hand
+    across threads, so parallel workflow branches reuse them.
+    """
+    abs_path = os.path.abspath(db_path)
+    return pooled_engine(
+        abs_path,
+        file_version(abs_path),
+        lambda: _connect(abs_path, mmap_size, cache_size_kb),
+        pool_size=pool_size,
+    )
+
+
+def file_version(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def pooled_engine(name: str, version: tuple, creator, pool_size: int = DEFAULT_POOL_SIZE,
+                  url: str = "sqlite://") -> Engine:
+    """
+    Returns the cached engine for (`name`, `version`), building it around
+    `creator` on first use. Engines of older versions of `name` are disposed.
+    `url` only selects the SQLAlchemy dialect (e.g. "duckdb://").
+    """
+    key = (name, version)
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            return engine
+
+        # The file changed on disk: retire pools opened on the old version.
+        for old_key in [k for k in _engines if k[0] == name]:
+            _engines.pop(old_key).dispose()
+
+        engine = create_engine(
+            url,
+            creator=creator,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=DEFAULT_MAX_OVERFLOW,
+        )
+        _engines[key] = engine
+        return engine
+
+
+@contextmanager
+def readonly_connection(db_path: str):
+    """Borrows a raw `sqlite3.Connection` from the shared pool for `db_path`."""
+    pooled = get_readonly_engine(db_path).raw_connection()
+    try:
+        yield pooled.driver_connection
+    finally:
+        # Returns the connection to the pool instead of closing it.
+        pooled.close()
+
+
+def dispose_all():
+    """Closes every pooled connection (e.g. before replacing DB files)."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -0,0 +1,207 @@
+# src/internal/data_retrieval/query_cache.py
+import os
+import re
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, fields
+from typing import Any, List, Optional
+from pydantic import Field
+from langchain_core.tools import BaseTool
+from langchain_community.agent_toolkits import SQLDatabaseToolkit
+from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from .connection_pool import file_version
+from .schema_cache import get_db_context
+from ..lru_store import SQLiteLRUStore, get_shared_cache
+
+DEFAULT_CACHE_MAX_MB = 64
+
+CACHE_FILENAME = "sql_results.db"
+
+# Bump when what gets stored (or how keys are built) changes.
+QUERY_CACHE_VERSION = 1
+
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonical form of a statement for cache keys: whitespace collapsed,
+    trailing semicolons dropped and everything outside quotes lower-cased
+    (keywords and unquoted identifiers are case-insensitive in SQLite and
+    DuckDB). Literals and quoted identifiers are kept verbatim.
+    """
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part).lower()
+        for i, part in enumerate(parts)
+    )
+
+
+def snapshot_of_files(db_paths: list, sql_engine: str = "sqlite") -> str:
+    """Snapshot id for agents querying SQLite files directly."""
+    versions = ",".join(f"{os.path.abspath(p)}@{file_version(p)}" for p in db_paths)
+    return f"{sql_engine}:files:{hashlib.sha1(versions.encode()).hexdigest()[:16]}"
+
+
+@dataclass
+class QueryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0     # DB time the hits originally cost
+    query_seconds: float = 0.0     # DB time actually spent on misses
+    guard_trips: int = 0           # statements refused or stopped by the SQLGuard
+
+    def __str__(self):
+        return (
+            f"{self.hits} hit(s), {self.misses} miss(es), "
+            f"{self.saved_seconds:.3f}s DB time saved, {self.query_seconds:.3f}s spent, "
+            f"{self.guard_trips} guard trip(s)"
+        )
+
+
+class SQLResultCache:
+    """
+    Disk cache of SQL agent query results, bounded in size with LRU eviction.
+
+    Entries are keyed by the normalized SQL text plus a data-snapshot id
+    (the frame fingerprint or the source files' versions), so a new data
+    release never serves stale answers; old snapshots simply age out.
+    Stored in a small SQLite file (SQLiteLRUStore), which makes it safe to
+    share between threads and processes.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: int = DEFAULT_CACHE_MAX_MB):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.path = os.path.join(self.cache_dir, CACHE_FILENAME)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = QueryCacheStats()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.store = SQLiteLRUStore(
+            self.path, "results",
+            {"snapshot": "TEXT NOT NULL", "sql": "TEXT NOT NULL", "result": "TEXT NOT NULL", "seconds": "REAL NOT NULL"},
+            self.max_bytes, "SQL Cache",
+        )
+
+    @staticmethod
+    def key(snapshot: str, sql: str) -> str:
+        raw = f"v{QUERY_CACHE_VERSION}\n{snapshot}\n{normalize_sql(sql)}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    # --- Public API ---
+
+    def get(self, snapshot: str, sql: str):
+        """Returns (result, seconds the query originally took), or None."""
+        row = self.store.get(self.key(snapshot, sql), ["result", "seconds"])
+        with self._lock:
+            if row is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                self.stats.saved_seconds += row[1]
+        return row
+
+    def put(self, snapshot: str, sql: str, result: str, seconds: float):
+        with self._lock:
+            self.stats.query_seconds += seconds
+        self.store.put(
+            self.key(snapshot, sql), len(result.encode("utf-8")) + len(sql),
+            snapshot=snapshot, sql=normalize_sql(sql), result=result, seconds=seconds,
+        )
+
+    def clear(self):
+        self.store.clear()
+
+
+def get_query_cache(cache_dir: str, max_mb: int = DEFAULT_CACHE_MAX_MB) -> Optional[SQLResultCache]:
+    """
+    Process-wide SQLResultCache for `cache_dir`, or None (caching off) when
+    no directory is given or it cannot be created.
+    """
+    return get_shared_cache(SQLResultCache, cache_dir, max_mb, "SQL Cache")
+
+
+# --- Agent Tooling ---
+
+class CachedQuerySQLDatabaseTool(QuerySQLDatabaseTool):
+    """
+    `sql_db_query` answering repeated statements from an SQLResultCache and
+    running the others through an SQLGuard (when set).
+    """
+
+    cache: Any = None
+    guard: Any = None
+    snapshot: str = ""
+    stats: QueryCacheStats = Field(default_factory=QueryCacheStats)
+    executed_sql: Any = None   # list shared with the toolkit (so not re-validated), None records nothing
+
+    def _run(self, query: str, run_manager=None):
+        if self.cache is not None:
+            cached = self.cache.get(self.snapshot, query)
+            if cached is not None:
+                self.stats.hits += 1
+                self.stats.saved_seconds += cached[1]
+                self._record(query)
+                return cached[0]
+
+        start = time.perf_counter()
+        if self.guard is not None:
+            result, trip = self.guard.run(self.db, query)
+            self.stats.guard_trips += trip is not None
+        else:
+            result = self.db.run_no_throw(query)
+        elapsed = time.perf_counter() - start
+        self.stats.misses += 1
+        self.stats.query_seconds += elapsed
+
+        # Errors are neither cached nor recorded: the agent rewrites the query and retries.
+        if isinstance(result, str) and not result.startswith("Error:"):
+            self._record(query)
+            if self.cache is not None:
+                self.cache.put(self.snapshot, query, result, elapsed)
+        return result
+
+    def _record(self, query: str):
+        if self.executed_sql is not None:
+            self.executed_sql.append(query)
+
+
+class CachedSQLDatabaseToolkit(SQLDatabaseToolkit):
+    """
+    SQLDatabaseToolkit whose query tool goes through `cache` and `guard`
+    (None disables either). `stats` counts this toolkit's hits, misses,
+    DB time and guard trips;
+    `executed_sql` lists the statements that ran successfully, in order,
+    when given a list (e.g. for a replay store to compile); with None
+    nothing is recorded, so long-lived toolkits do not grow.
+    Its context (table_info / table_names) is cached under `schema_key`.
+    """
+
+    cache: Any = None
+    guard: Any = None
+    snapshot: str = ""
+    stats: QueryCacheStats = Field(default_factory=QueryCacheStats)
+    executed_sql: Any = None
+    schema_key: str = ""
+
+    def get_context(self) -> dict:
+        return get_db_context(self.db, self.schema_key)
+
+    def reset_run_state(self):
+        """Clears `stats` and `executed_sql` in place (the tools share them) before a reused toolkit's next run."""
+        for f in fields(self.stats):
+            setattr(self.stats, f.name, f.default)
+        if self.executed_sql is not None:
+            self.executed_sql.clear()
+
+    def get_tools(self) -> List[BaseTool]:
+        tools = []
+        for t in super().get_tools():
+            if isinstance(t, QuerySQLDatabaseTool):
+                t = CachedQuerySQLDatabaseTool(
+                    db=self.db, description=t.description, cache=self.cache, guard=self.guard, snapshot=self.snapshot,
+                    stats=self.stats, executed_sql=self.executed_sql,
+                )
+            tools.append(t)
+        return tools
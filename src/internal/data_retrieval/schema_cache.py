@@ -0,0 +1,88 @@
+# src/internal/data_retrieval/schema_cache.py
+import threading
+from collections import OrderedDict
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, MessagesPlaceholder, SystemMessagePromptTemplate
+from langchain_community.agent_toolkits.sql.prompt import SQL_PREFIX
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy.engine import Engine
+
+# Sample rows per table shown to the agents (SQLDatabase's default).
+DEFAULT_SAMPLE_ROWS = 3
+
+# Snapshots whose schema description is kept in memory.
+MAX_CACHED_SCHEMAS = 32
+
+_contexts = OrderedDict()
+_contexts_lock = threading.Lock()
+_databases = OrderedDict()
+_databases_lock = threading.Lock()
+
+SCHEMA_SECTION = """
+The complete, current schema of the database (with sample rows) is below.
+Do NOT call sql_db_list_tables or sql_db_schema: write your query directly.
+
+Tables: {table_names}
+
+{table_info}
+"""
+
+
+def get_sql_database(engine: Engine, sample_rows: int = DEFAULT_SAMPLE_ROWS, **kwargs) -> SQLDatabase:
+    """
+    SQLDatabase on `engine`, built (and its schema reflected) once per
+    engine - engines are per data version - instead of on every agent run.
+    Extra `kwargs` go to SQLDatabase on first construction.
+    """
+    key = (engine, sample_rows)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = SQLDatabase(engine=engine, sample_rows_in_table_info=sample_rows, **kwargs)
+            _databases[key] = db
+            while len(_databases) > MAX_CACHED_SCHEMAS:
+                _databases.popitem(last=False)
+        else:
+            _databases.move_to_end(key)
+    return db
+
+
+def get_db_context(db: SQLDatabase, key: str = "") -> dict:
+    """
+    `db.get_context()` (table names and CREATE TABLE text with sample rows),
+    computed once per `key` - the data snapshot plus sample-row count -
+    instead of on every agent run. An empty key disables caching.
+    """
+    if not key:
+        return db.get_context()
+    with _contexts_lock:
+        if key in _contexts:
+            _contexts.move_to_end(key)
+            return _contexts[key]
+
+    context = db.get_context()
+    with _contexts_lock:
+        _contexts[key] = context
+        while len(_contexts) > MAX_CACHED_SCHEMAS:
+            _contexts.popitem(last=False)
+    return context
+
+
+def sql_agent_prompt(instructions: str = "") -> ChatPromptTemplate:
+    """
+    Prompt for `create_sql_agent(prompt=...)` with the schema injected:
+    because it asks for `table_info` and `table_names`, create_sql_agent
+    fills them from the toolkit's (cached) context and drops the discovery
+    tools, saving the agent its first turns. `instructions` are appended to
+    the system message.
+    """
+    system = SQL_PREFIX + SCHEMA_SECTION
+    messages = [SystemMessagePromptTemplate.from_template(system)]
+    if instructions:
+        # Literal text: no template variables in it.
+        messages.append(SystemMessage(content=instructions))
+    messages += [
+        HumanMessagePromptTemplate.from_template("{input}"),
+        MessagesPlaceholder(variable_name="agent_scratchpad"),
+    ]
+    return ChatPromptTemplate.from_messages(messages)
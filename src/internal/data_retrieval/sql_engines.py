@@ -0,0 +1,156 @@
+# src/internal/data_retrieval/sql_engines.py
+import os
+import threading
+import pandas as pd
+import sqlalchemy as sa
+from langchain_community.utilities import SQLDatabase
+from .connection_pool import pooled_engine, file_version, readonly_connection
+from .analytics_db import ANALYTICS_TABLE, frame_fingerprint
+from .schema_cache import get_sql_database, DEFAULT_SAMPLE_ROWS
+from .adapters.sqlite_loader import detect_srag_table
+from src.domain.sars.rollups import daily_rollup, rollup_select_sql, DAILY_ROLLUP_TABLE
+
+try:
+    import duckdb
+    import duckdb_engine
+    DUCKDB_INSTALLED = True
+except ImportError:
+    DUCKDB_INSTALLED = False
+
+SQL_ENGINES = ("sqlite", "duckdb")
+
+# DuckDB type -> SQLAlchemy type, for the table description the agents see.
+_DUCKDB_TYPES = {
+    "DATE": sa.Date,
+    "TIMESTAMP": sa.DateTime,
+    "TIMESTAMP_S": sa.DateTime,
+    "UTINYINT": sa.SmallInteger,
+    "TINYINT": sa.SmallInteger,
+    "SMALLINT": sa.SmallInteger,
+    "INTEGER": sa.Integer,
+    "BIGINT": sa.BigInteger,
+    "FLOAT": sa.Float,
+    "DOUBLE": sa.Float,
+    "VARCHAR": sa.String,
+}
+
+# One in-memory DuckDB database per data version; pooled connections are
+# cursors on it (DuckDB cursors are independent, thread-safe connections).
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def require_duckdb():
+    if not DUCKDB_INSTALLED:
+        raise ImportError("sql_engine='duckdb' needs the 'duckdb' and 'duckdb-engine' packages. Run: pip install duckdb duckdb-engine")
+
+
+def open_duckdb_frame(df: pd.DataFrame, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> SQLDatabase:
+    """
+    DuckDB over the cleaned (columnar) SRAG frame, as table `srag_records`
+    with DT_NOTIFIC as a DATE, plus its `srag_daily` rollup. Built once per
+    frame content.
+    """
+    require_duckdb()
+    name = "duckdb-frame"
+    version = (frame_fingerprint(df),)
+
+    def load(conn):
+        conn.register("srag_frame", df)
+        conn.execute(f'CREATE TABLE "{ANALYTICS_TABLE}" AS SELECT {_date_select(df.columns)} FROM srag_frame')
+        conn.unregister("srag_frame")
+        conn.register("rollup_frame", daily_rollup(df))
+        conn.execute(f'CREATE TABLE "{DAILY_ROLLUP_TABLE}" AS SELECT * REPLACE (CAST(date AS DATE) AS date) FROM rollup_frame')
+        conn.unregister("rollup_frame")
+
+    return _open(name, version, load, sample_rows)
+
+
+def open_duckdb_files(db_paths: list, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> SQLDatabase:
+    """
+    DuckDB over one or more SRAG SQLite files, as table `srag_records`
+    (plus the `srag_daily` rollup, computed on open).
+    Files are scanned in place through DuckDB's sqlite extension when it is
+    available; otherwise their SRAG tables are copied in once per version.
+    """
+    require_duckdb()
+    db_paths = [os.path.abspath(p) for p in db_paths]
+    name = "duckdb-files:" + "|".join(db_paths)
+    version = tuple(file_version(p) for p in db_paths)
+
+    def load(conn):
+        selects = []
+        for i, path in enumerate(db_paths):
+            with readonly_connection(path) as sqlite_conn:
+                table = detect_srag_table(sqlite_conn)
+                try:
+                    conn.execute(f"ATTACH '{path.replace(chr(39), chr(39) * 2)}' AS src{i} (TYPE sqlite, READ_ONLY)")
+                    source = f'src{i}."{table}"'
+                except duckdb.Error as e:
+                    print(f"[DuckDB] sqlite extension unavailable ({e.__class__.__name__}); copying {os.path.basename(path)} in.")
+                    # Kept out of the default schema, so the agents only see srag_records.
+                    conn.execute("CREATE SCHEMA IF NOT EXISTS sources")
+                    source = f"sources.copy{i}"
+                    conn.register("sqlite_frame", pd.read_sql_query(f'SELECT * FROM "{table}"', sqlite_conn))
+                    conn.execute(f"CREATE TABLE {source} AS SELECT * FROM sqlite_frame")
+                    conn.unregister("sqlite_frame")
+            columns = [row[0] for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+            selects.append(f"SELECT {_date_select(columns, text_dates=True)} FROM {source}")
+
+        conn.execute(f'CREATE VIEW "{ANALYTICS_TABLE}" AS ' + " UNION ALL BY NAME ".join(selects))
+        conn.execute(
+            f'CREATE TABLE "{DAILY_ROLLUP_TABLE}" AS '
+            f'{rollup_select_sql(ANALYTICS_TABLE, date_expr="DT_NOTIFIC")} GROUP BY 1 ORDER BY 1'
+        )
+
+    return _open(name, version, load, sample_rows)
+
+
+def _date_select(columns, text_dates: bool = False) -> str:
+    # Dates are exposed as DATE. Text dates may be ISO or DD/MM/YYYY (older
+    # DATASUS drops); anything else becomes NULL.
+    def date_expr(c):
+        if not text_dates:
+            return f'CAST("{c}" AS DATE)'
+        return f'COALESCE(TRY_CAST("{c}" AS DATE), CAST(TRY_STRPTIME(CAST("{c}" AS VARCHAR), \'%d/%m/%Y\') AS DATE))'
+
+    return ", ".join(f'{date_expr(c)} AS "{c}"' if c.startswith("DT_") else f'"{c}"' for c in columns)
+
+
+def _open(name: str, version: tuple, load, sample_rows: int) -> SQLDatabase:
+    with _databases_lock:
+        cached = _databases.get(name)
+        stale = None
+        if cached is None or cached[0] != version:
+            stale = cached[1] if cached else None
+            conn = duckdb.connect()
+            load(conn)
+            _databases[name] = (version, conn)
+        conn = _databases[name][1]
+
+        # Disposes the pool of the previous version before its DB is closed.
+        engine = pooled_engine(name, version, lambda: duckdb_engine.ConnectionWrapper(conn.cursor()), url="duckdb://")
+        if stale is not None:
+            stale.close()
+
+    # The table is described from DuckDB itself: SQLAlchemy's Postgres-style
+    # reflection does not work against DuckDB's catalog.
+    return get_sql_database(
+        engine,
+        sample_rows,
+        metadata=_metadata(conn),
+        include_tables=[ANALYTICS_TABLE, DAILY_ROLLUP_TABLE],
+        lazy_table_reflection=True,
+        view_support=True,
+    )
+
+
+def _metadata(conn) -> sa.MetaData:
+    metadata = sa.MetaData()
+    for table in (ANALYTICS_TABLE, DAILY_ROLLUP_TABLE):
+        columns = [
+            sa.Column(col_name, _DUCKDB_TYPES.get(col_type, sa.String)())
+            for col_name, col_type, *_ in conn.execute(f'DESCRIBE "{table}"').fetchall()
+        ]
+        sa.Table(table, metadata, *columns)
+    return metadata
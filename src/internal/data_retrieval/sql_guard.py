@@ -0,0 +1,226 @@
+# src/internal/data_retrieval/sql_guard.py
+import re
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from langchain_community.utilities import SQLDatabase
+from src.domain.sars.rollups import DAILY_ROLLUP_TABLE
+
+try:
+    import duckdb
+    DUCKDB_INSTALLED = True
+except ImportError:
+    DUCKDB_INSTALLED = False
+
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_MAX_RESULT_CHARS = 20000
+DEFAULT_TIMEOUT_S = 15.0
+
+# DuckDB plans carry row estimates; joins without a usable condition whose
+# two largest inputs multiply past this are refused.
+MAX_CROSS_ROWS = 10 ** 8
+
+# SQLite checks the progress handler every N virtual machine instructions.
+_PROGRESS_STEPS = 10000
+
+# SQLite authorizer actions a read query needs; any other action is denied.
+_SQLITE_READ_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33),
+})
+_NOT_READ_ONLY = "only a single SELECT statement is allowed."
+
+_CTE_NAME = re.compile(r"(?:\bWITH|,)\s*(?:RECURSIVE\s+)?\"?(\w+)\"?\s*(?:\([^)]*\)\s*)?AS\s*(?:NOT\s+)?(?:MATERIALIZED\s*)?\(", re.IGNORECASE)
+_TABLE_REF = re.compile(r"(?:\bFROM|\bJOIN|,)\s+\"?(\w+)\"?(?:\s+(?:AS\s+)?(?!ON\b|USING\b|WHERE\b|GROUP\b|ORDER\b|HAVING\b|LIMIT\b|JOIN\b|LEFT\b|INNER\b|CROSS\b|UNION\b|FROM\b)(\w+))?", re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_DUCKDB_ESTIMATE = re.compile(r"~([\d,]+) rows")
+_DUCKDB_UNCONDITIONED_JOINS = ("CROSS_PRODUCT", "NESTED_LOOP_JOIN", "BLOCKWISE_NL_JOIN")
+
+
+class GuardTrip(Exception):
+    """A statement refused (or stopped) by the SQLGuard; the message is shown to the agent."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class SQLGuard:
+    """
+    Cost guardrails in front of the agents' `sql_db_query` tool.
+
+    Statements run read-only: on SQLite an authorizer on the connection
+    denies every action but reads, on DuckDB the statement must parse as a
+    single SELECT. Before running a statement its plan
+    (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on DuckDB) must not contain a
+    cartesian join of the record table. While it runs, a wall-clock timeout
+    interrupts it (SQLite progress handler / DuckDB interrupt), and at most
+    `max_rows` rows and `max_result_chars` characters come back. A trip
+    returns a one-line "Error: ..." the agent can correct its query from.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS, timeout_s: float = DEFAULT_TIMEOUT_S,
+                 max_result_chars: int = DEFAULT_MAX_RESULT_CHARS):
+        self.max_rows = max_rows
+        self.timeout_s = timeout_s
+        self.max_result_chars = max_result_chars
+        # Process-wide trip counts per reason.
+        self.trips = {}
+        self._lock = threading.Lock()
+
+    def run(self, db: SQLDatabase, sql: str):
+        """
+        Runs `sql` on `db` under the guard.
+
+        Returns:
+            (result, trip reason): the result formatted like
+            SQLDatabase.run (or an "Error: ..." message), and the reason
+            when the guard refused or stopped the statement, else None.
+        """
+        try:
+            return self._run(db, sql.strip().rstrip(";")), None
+        except GuardTrip as e:
+            self._count(e, sql)
+            return f"Error: {e}", e.reason
+        except Exception as e:
+            # The driver's message, without SQLAlchemy's statement echo and links.
+            return f"Error: {getattr(e, 'orig', None) or e}", None
+
+    def fetch(self, db: SQLDatabase, sql: str) -> list:
+        """
+        Rows of `sql` on `db` as dicts (column -> value), under the same
+        checks as `run`. Raises GuardTrip when the guard refuses or stops
+        the statement (and the driver's error when it fails).
+        """
+        try:
+            return [dict(row._mapping) for row in self._fetch(db, sql.strip().rstrip(";"))]
+        except GuardTrip as e:
+            self._count(e, sql)
+            raise
+
+    def _count(self, trip: GuardTrip, sql: str):
+        with self._lock:
+            self.trips[trip.reason] = self.trips.get(trip.reason, 0) + 1
+        print(f"[SQL Guard] Refused a query ({trip.reason}): {sql[:80]}")
+
+    def _run(self, db: SQLDatabase, sql: str) -> str:
+        rows = self._fetch(db, sql)
+        result = str([tuple(row) for row in rows]) if rows else ""
+        if len(result) > self.max_result_chars:
+            raise GuardTrip(
+                "result_too_large",
+                f"result is {len(result)} characters (max {self.max_result_chars}). Select fewer columns or rows.",
+            )
+        return result
+
+    def _fetch(self, db: SQLDatabase, sql: str) -> list:
+        if ";" in _strip_literals(sql):
+            raise GuardTrip("not_read_only", _NOT_READ_ONLY)
+
+        with db._engine.connect() as conn, _read_only(conn.connection.dbapi_connection, db.dialect, sql):
+            dbapi_conn = conn.connection.dbapi_connection
+            self._check_plan(conn, db.dialect, sql)
+
+            deadline = time.monotonic() + self.timeout_s
+            timer = None
+            if db.dialect == "sqlite":
+                dbapi_conn.set_progress_handler(lambda: int(time.monotonic() > deadline), _PROGRESS_STEPS)
+            elif db.dialect == "duckdb":
+                timer = threading.Timer(self.timeout_s, dbapi_conn.interrupt)
+                timer.start()
+            try:
+                rows = conn.exec_driver_sql(sql).fetchmany(self.max_rows + 1)
+            except Exception as e:
+                if time.monotonic() > deadline:
+                    raise GuardTrip("timeout", f"query stopped after {self.timeout_s:.0f}s. Aggregate (GROUP BY, COUNT, SUM) or query 'srag_daily' instead.") from e
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                if db.dialect == "sqlite":
+                    dbapi_conn.set_progress_handler(None, 0)
+
+        if len(rows) > self.max_rows:
+            raise GuardTrip(
+                "too_many_rows",
+                f"query returns more than {self.max_rows} rows. Aggregate it (GROUP BY, COUNT, SUM) or add a LIMIT.",
+            )
+        return rows
+
+    def _check_plan(self, conn, dialect: str, sql: str):
+        if dialect == "sqlite":
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            small = _small_sources(sql)
+            full_scans = {}
+            for _, parent, _, detail in plan:
+                match = _SQLITE_SCAN.match(detail)
+                if match and match.group(1).lower() not in small:
+                    full_scans.setdefault(parent, []).append(match.group(1))
+            for tables in full_scans.values():
+                if len(tables) > 1:
+                    raise GuardTrip(
+                        "cartesian_join",
+                        f"cartesian join ({', '.join(tables)} fully scanned in nested loops). "
+                        "Add a join condition, or aggregate 'srag_daily' instead.",
+                    )
+        elif dialect == "duckdb":
+            plan = "\n".join(str(row[-1]) for row in conn.exec_driver_sql(f"EXPLAIN {sql}").fetchall())
+            if any(op in plan for op in _DUCKDB_UNCONDITIONED_JOINS):
+                estimates = sorted((int(n.replace(',', '')) for n in _DUCKDB_ESTIMATE.findall(plan)), reverse=True)
+                if len(estimates) > 1 and estimates[0] * estimates[1] > MAX_CROSS_ROWS:
+                    raise GuardTrip(
+                        "cartesian_join",
+                        f"join without a usable condition (~{estimates[0]} x ~{estimates[1]} rows). "
+                        "Add an equality join condition, or aggregate 'srag_daily' instead.",
+                    )
+
+
+@contextmanager
+def _read_only(dbapi_conn, dialect: str, sql: str):
+    """Refuses (SQLite: denies while preparing) anything but reads for the block."""
+    if dialect == "duckdb":
+        statements = duckdb.extract_statements(sql) if DUCKDB_INSTALLED else []
+        if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+            raise GuardTrip("not_read_only", _NOT_READ_ONLY)
+        yield
+        return
+    if dialect != "sqlite":
+        yield
+        return
+
+    denied = []
+
+    def authorize(action, *_):
+        if action in _SQLITE_READ_ACTIONS:
+            return sqlite3.SQLITE_OK
+        denied.append(action)
+        return sqlite3.SQLITE_DENY
+
+    dbapi_conn.set_authorizer(authorize)
+    try:
+        yield
+    except GuardTrip:
+        raise
+    except Exception as e:
+        if denied:
+            raise GuardTrip("not_read_only", _NOT_READ_ONLY) from e
+        raise
+    finally:
+        dbapi_conn.set_authorizer(None)
+
+
+def _strip_literals(sql: str) -> str:
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+
+def _small_sources(sql: str) -> set:
+    """Names (and aliases) of sources whose full scan is cheap: CTEs, subqueries and the rollup."""
+    text = _strip_literals(sql)
+    small = {name.lower() for name in _CTE_NAME.findall(text)} | {DAILY_ROLLUP_TABLE}
+    for table, alias in _TABLE_REF.findall(text):
+        if table.lower() in small and alias:
+            small.add(alias.lower())
+    return small
@@ -0,0 +1,289 @@
+# src/internal/data_retrieval/sql_replay.py
+import os
+import re
+import json
+import hashlib
+import tempfile
+import datetime
+import pandas as pd
+from langchain_community.utilities import SQLDatabase
+from .sql_guard import SQLGuard, GuardTrip
+
+# Bump when the artifact layout (or how SQL is parametrized) changes.
+SQL_REPLAY_FORMAT_VERSION = 1
+
+# Larger results are not candidates for binding an output key.
+MAX_REPLAY_ROWS = 1000
+
+# Literal dates within this many days of the reference date are encoded as
+# day offsets (30/60-day windows); older first-of-month dates as months.
+DAY_OFFSET_HORIZON = 90
+
+_DATE_LITERAL = re.compile(r"'(\d{4}-\d{2}-\d{2})'")
+_MONTH_LITERAL = re.compile(r"'(\d{4}-\d{2})'")
+_PLACEHOLDER = re.compile(r"\{(days|months|month_start|month):([+-]\d+)\}")
+
+
+def template_version(*parts: str) -> str:
+    """Version of a prompt template: any change to its text invalidates compiled SQL."""
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+# --- Parametrization ---
+
+def _month_index(ts: pd.Timestamp) -> int:
+    return ts.year * 12 + ts.month - 1
+
+
+def _encode_date(literal: str, ref: pd.Timestamp) -> str:
+    try:
+        ts = pd.Timestamp(literal)
+    except ValueError:
+        return f"'{literal}'"
+    days = (ts - ref).days
+    months = _month_index(ts) - _month_index(ref)
+    if ts.day == ref.day and months and ts == ref + pd.DateOffset(months=months):
+        return f"'{{months:{months:+d}}}'"
+    if abs(days) > DAY_OFFSET_HORIZON and ts.day == 1:
+        return f"'{{month_start:{months:+d}}}'"
+    return f"'{{days:{days:+d}}}'"
+
+
+def parametrize_sql(sql: str, reference_date) -> str:
+    """
+    Replaces the date literals an agent wrote for `reference_date` by
+    placeholders relative to it, e.g. '2025-05-20' -> '{days:-29}',
+    '2024-07-01' -> '{month_start:-11}', '2024-07' -> '{month:-11}'.
+    """
+    ref = pd.Timestamp(reference_date).normalize()
+    sql = _DATE_LITERAL.sub(lambda m: _encode_date(m.group(1), ref), sql)
+    return _MONTH_LITERAL.sub(lambda m: f"'{{month:{_month_index(pd.Timestamp(m.group(1) + '-01')) - _month_index(ref):+d}}}'", sql)
+
+
+def render_sql(sql: str, reference_date) -> str:
+    """Inverse of `parametrize_sql` for a (new) reference date."""
+    ref = pd.Timestamp(reference_date).normalize()
+
+    def value(m):
+        kind, n = m.group(1), int(m.group(2))
+        if kind == "days":
+            return (ref + pd.Timedelta(days=n)).strftime('%Y-%m-%d')
+        if kind == "months":
+            return (ref + pd.DateOffset(months=n)).strftime('%Y-%m-%d')
+        month = ref.to_period('M') + n
+        return month.start_time.strftime('%Y-%m-%d') if kind == "month_start" else month.strftime('%Y-%m')
+
+    return _PLACEHOLDER.sub(value, sql)
+
+
+# --- Execution & Binding ---
+
+def _execute(db: SQLDatabase, sql: str, guard: SQLGuard) -> list:
+    # Rows as dicts (column -> value), under the guard the agent's queries ran under.
+    return guard.fetch(db, sql)
+
+
+def schema_signature(db: SQLDatabase) -> dict:
+    """Columns of every table the agents can see."""
+    return {
+        table: list(db.run(f'SELECT * FROM "{table}" LIMIT 0', fetch="cursor").keys())
+        for table in sorted(db.get_usable_table_names())
+    }
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        # Agents report floats rounded to 2 decimals.
+        return abs(a - b) <= 0.006
+    if isinstance(a, datetime.date) or isinstance(b, datetime.date):
+        # DuckDB returns dates, SQLite and the agent ISO strings.
+        return str(a)[:10] == str(b)[:10]
+    return a == b
+
+
+def _name_tokens(name: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def _named_after(column: str, key: str) -> bool:
+    # Whole name parts: "icu_rate" matches "rate" or "icu_rate_pct", "a" matches nothing.
+    col, wanted = _name_tokens(column), _name_tokens(key)
+    return bool(col and wanted) and (col <= wanted or wanted <= col)
+
+
+def _bind_scalar(key: str, value, results: list):
+    candidates = []
+    for sql, rows in results:
+        if len(rows) == 1:
+            candidates += [(sql, col) for col, cell in rows[0].items() if cell is not None and _same(cell, value)]
+    if len(candidates) > 1:
+        # Ambiguous (e.g. several zeros): only trust a column named after the key.
+        candidates = [(sql, col) for sql, col in candidates if _named_after(col, key)]
+    if len({c for c in candidates}) != 1:
+        return None
+    sql, col = candidates[0]
+    return {"key": key, "kind": "scalar", "sql": sql, "column": col}
+
+
+def _bind_rows(key: str, items: list, results: list):
+    if not items or not all(isinstance(i, dict) for i in items):
+        return None
+    fields = list(items[0].keys())
+    for sql, rows in reversed(results):
+        if len(rows) != len(items):
+            continue
+        columns = {}
+        for field in fields:
+            for col in rows[0].keys():
+                if all(_same(row[col], item.get(field)) for row, item in zip(rows, items)):
+                    columns[field] = col
+                    break
+        if len(columns) == len(fields):
+            return {"key": key, "kind": "rows", "sql": sql, "columns": columns}
+    return None
+
+
+def _run_bindings(db: SQLDatabase, bindings: list, reference_date, guard: SQLGuard) -> dict:
+    output, cache = {}, {}
+    for binding in bindings:
+        sql = render_sql(binding["sql"], reference_date)
+        if sql not in cache:
+            cache[sql] = _execute(db, sql, guard)
+        rows = cache[sql]
+        if binding["kind"] == "scalar":
+            output[binding["key"]] = rows[0][binding["column"]] if rows else None
+        else:
+            output[binding["key"]] = [
+                {field: (str(row[col]) if isinstance(row[col], datetime.date) else row[col]) for field, col in binding["columns"].items()}
+                for row in rows
+            ]
+    return output
+
+
+class SQLReplayStore:
+    """
+    Compiled SQL for the LLM SQL agents.
+
+    After a successful agent run, the statements it executed are bound to
+    the keys of its JSON answer (the query and column each value came
+    from), date literals are made relative to the reference date, and the
+    result is validated by replaying it. Later runs execute that SQL
+    directly - no LLM calls - as long as the prompt template and the DB
+    schema are unchanged. One JSON artifact per node, template version and
+    SQL engine. Compiled statements run under the node's SQLGuard (a
+    default one when none is given); a trip is a replay miss.
+    """
+
+    def __init__(self, replay_dir: str):
+        self.replay_dir = os.path.abspath(replay_dir)
+        os.makedirs(self.replay_dir, exist_ok=True)
+
+    def _path(self, node: str, template: str, sql_engine: str) -> str:
+        return os.path.join(self.replay_dir, f"{node}-{sql_engine}-{template}.json")
+
+    def load(self, node: str, template: str, sql_engine: str):
+        try:
+            with open(self._path(node, template, sql_engine), "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return artifact if artifact.get("version") == SQL_REPLAY_FORMAT_VERSION else None
+
+    def _save(self, artifact: dict):
+        path = self._path(artifact["node"], artifact["template"], artifact["sql_engine"])
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.replay_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, indent=2)
+        os.replace(tmp_path, path)
+
+    # --- Public API ---
+
+    def replay(self, db: SQLDatabase, node: str, template: str, sql_engine: str, reference_date,
+               guard: SQLGuard = None):
+        """Output of the compiled SQL against `db`, or None when the agent has to run."""
+        artifact = self.load(node, template, sql_engine)
+        if artifact is None:
+            return None
+        try:
+            if schema_signature(db) != artifact["schema"]:
+                print(f"[SQL Replay] {node}: schema changed, falling back to the agent.")
+                return None
+            output = _run_bindings(db, artifact["bindings"], reference_date, guard or SQLGuard())
+        except GuardTrip as e:
+            print(f"[SQL Replay] {node}: compiled SQL refused by the guard ({e.reason}), falling back to the agent.")
+            return None
+        except Exception as e:
+            print(f"[SQL Replay] {node}: replay failed ({e}), falling back to the agent.")
+            return None
+        print(f"[SQL Replay] {node}: answered from compiled SQL ({len(artifact['bindings'])} key(s)).")
+        return output
+
+    def compile(self, db: SQLDatabase, node: str, template: str, sql_engine: str,
+                statements: list, output: dict, reference_date, guard: SQLGuard = None) -> bool:
+        """
+        Binds each key of an agent's `output` to one of the `statements` it
+        ran and stores the artifact if the replay reproduces `output`.
+        """
+        if not output or not statements:
+            return False
+        guard = guard or SQLGuard()
+        try:
+            results = []
+            for sql in dict.fromkeys(statements):
+                try:
+                    rows = _execute(db, sql, guard)
+                except GuardTrip:
+                    # Not a candidate: only statements the guard lets through get compiled.
+                    continue
+                if len(rows) <= MAX_REPLAY_ROWS:
+                    results.append((sql, rows))
+
+            bindings = []
+            for key, value in output.items():
+                binding = _bind_rows(key, value, results) if isinstance(value, list) else _bind_scalar(key, value, results)
+                if binding is None:
+                    print(f"[SQL Replay] {node}: could not trace '{key}' to a query; not compiled.")
+                    return False
+                binding["sql"] = parametrize_sql(binding["sql"], reference_date)
+                bindings.append(binding)
+
+            # Validate: the parametrized SQL must reproduce the agent's answer.
+            replayed = _run_bindings(db, bindings, reference_date, guard)
+            for key, value in output.items():
+                expected = value if isinstance(value, list) else [value]
+                got = replayed[key] if isinstance(value, list) else [replayed[key]]
+                if len(got) != len(expected) or not all(
+                    _same(g, e) if not isinstance(e, dict) else all(_same(g[k], e.get(k)) for k in g)
+                    for g, e in zip(got, expected)
+                ):
+                    print(f"[SQL Replay] {node}: replay of '{key}' does not match the agent; not compiled.")
+                    return False
+
+            self._save({
+                "version": SQL_REPLAY_FORMAT_VERSION,
+                "node": node,
+                "template": template,
+                "sql_engine": sql_engine,
+                "schema": schema_signature(db),
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "bindings": bindings,
+            })
+        except Exception as e:
+            print(f"[SQL Replay] {node}: could not compile ({e}).")
+            return False
+
+        print(f"[SQL Replay] {node}: compiled {len(bindings)} key(s).")
+        return True
+
+
+def get_replay_store(replay_dir: str):
+    """SQLReplayStore for `replay_dir`, or None (replay off) when no directory is given."""
+    if not replay_dir:
+        return None
+    try:
+        return SQLReplayStore(replay_dir)
+    except OSError as e:
+        print(f"[SQL Replay] Disabled, cannot open {replay_dir}: {e}")
+        return None
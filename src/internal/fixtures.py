@@ -0,0 +1,214 @@
+# src/internal/fixtures.py
+import os
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableBinding, RunnableParallel, RunnableSequence
+from langchain_core.tools import BaseTool, Tool
+
+FIXTURE_MODES = ("off", "record", "replay")
+
+# Bump when the key layout changes: old fixtures then have to be re-recorded.
+FIXTURE_FORMAT_VERSION = 1
+
+
+class FixtureMissError(KeyError):
+    """Replay mode met a call that was never recorded."""
+
+
+class FixtureStore:
+    """
+    Recorded LLM replies and search results, one JSON file per call under
+    `fixture_dir/llm` and `fixture_dir/search`, keyed by a hash of the
+    request. In "record" mode calls go through and are stored; in "replay"
+    mode they are served from disk after `latency_s` seconds (None: the
+    latency measured when recording), and a missing one is an error.
+    """
+
+    def __init__(self, fixture_dir: str, mode: str = "replay", latency_s: Optional[float] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown fixture mode '{mode}'. Use 'record' or 'replay'.")
+        self.fixture_dir = os.path.abspath(fixture_dir)
+        self.mode = mode
+        self.latency_s = latency_s
+        for kind in ("llm", "search"):
+            os.makedirs(os.path.join(self.fixture_dir, kind), exist_ok=True)
+
+    @staticmethod
+    def key(*parts) -> str:
+        payload = json.dumps([FIXTURE_FORMAT_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.fixture_dir, kind, f"{key}.json")
+
+    def load(self, kind: str, key: str) -> dict:
+        try:
+            with open(self._path(kind, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FixtureMissError(f"No recorded {kind} call {key[:12]} in {self.fixture_dir}; record the run first.") from None
+
+    def save(self, kind: str, key: str, fixture: dict):
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.join(self.fixture_dir, kind))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self._path(kind, key))
+
+    def latency(self, fixture: dict) -> float:
+        return fixture.get("seconds", 0.0) if self.latency_s is None else self.latency_s
+
+
+def _request_parts(model: str, messages: List[BaseMessage], stop, kwargs: dict) -> list:
+    return [
+        model,
+        [(m.type, m.content, getattr(m, "tool_calls", None) or None, getattr(m, "tool_call_id", None)) for m in messages],
+        stop,
+        kwargs,
+    ]
+
+
+class FixtureChatModel(BaseChatModel):
+    """
+    Chat model recording `inner`'s replies into a FixtureStore, or
+    replaying them without calling it. Tools and structured output are
+    bound through `inner` (strict schemas, forced tool choice), so requests
+    (and their keys) are the ones production runs send, in both modes.
+    """
+
+    inner: Any
+    store: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"fixture-{self.store.mode}"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", None) or type(self.inner).__name__
+
+    @property
+    def _identifying_params(self) -> dict:
+        # Reported as the call's model, so replayed calls are priced in telemetry.
+        return {"model_name": self.model_name}
+
+    @property
+    def temperature(self):
+        return getattr(self.inner, "temperature", None)
+
+    def bind_tools(self, tools, **kwargs):
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+    def with_structured_output(self, schema, **kwargs) -> Runnable:
+        # `inner` builds the request and its parser; only the model call is swapped for this one.
+        structured = self.inner.with_structured_output(schema, **kwargs)
+        rebound = _rebind(structured, self.inner, self)
+        if rebound is structured:
+            raise ValueError(f"Cannot route {type(self.inner).__name__}'s structured output through fixtures.")
+        return rebound
+
+    def _key(self, messages, stop, kwargs) -> str:
+        return self.store.key(*_request_parts(self.model_name, messages, stop, kwargs))
+
+    def _replayed(self, fixture: dict) -> ChatResult:
+        message = messages_from_dict([fixture["message"]])[0]
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _record(self, key: str, result: ChatResult, seconds: float):
+        self.store.save("llm", key, {
+            "model": self.model_name,
+            "seconds": round(seconds, 3),
+            "message": message_to_dict(result.generations[0].message),
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        if self.store.mode == "replay":
+            fixture = self.store.load("llm", key)
+            time.sleep(self.store.latency(fixture))
+            return self._replayed(fixture)
+
+        start = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self._record(key, result, time.perf_counter() - start)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        if self.store.mode == "replay":
+            fixture = self.store.load("llm", key)
+            await asyncio.sleep(self.store.latency(fixture))
+            return self._replayed(fixture)
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        self._record(key, result, time.perf_counter() - start)
+        return result
+
+
+def _rebind(runnable: Runnable, inner, model) -> Runnable:
+    """`runnable` with calls bound to `inner` bound to `model` instead (same object when there are none)."""
+    if isinstance(runnable, RunnableBinding):
+        bound = model if runnable.bound is inner else _rebind(runnable.bound, inner, model)
+        return runnable if bound is runnable.bound else runnable.model_copy(update={"bound": bound})
+    if runnable is inner:
+        return model
+    if isinstance(runnable, RunnableSequence):
+        steps = [_rebind(step, inner, model) for step in runnable.steps]
+        changed = any(new is not old for new, old in zip(steps, runnable.steps))
+        return RunnableSequence(*steps) if changed else runnable
+    if isinstance(runnable, RunnableParallel):
+        steps = {key: _rebind(step, inner, model) for key, step in runnable.steps__.items()}
+        changed = any(steps[key] is not step for key, step in runnable.steps__.items())
+        return RunnableParallel(steps) if changed else runnable
+    return runnable
+
+
+def fixture_search_tool(store: FixtureStore, name: str, description: str, tool: BaseTool = None) -> Tool:
+    """
+    Search tool recording `tool`'s results into `store`, or replaying them
+    (no `tool` needed then). Keeps the wrapped tool's name and description.
+    """
+
+    def record(query: str, result, seconds: float):
+        store.save("search", store.key(query), {"query": query, "seconds": round(seconds, 3), "result": result})
+
+    def search(query: str):
+        if store.mode == "replay":
+            fixture = store.load("search", store.key(query))
+            time.sleep(store.latency(fixture))
+            return fixture["result"]
+        start = time.perf_counter()
+        result = tool.invoke(query)
+        record(query, result, time.perf_counter() - start)
+        return result
+
+    async def asearch(query: str):
+        if store.mode == "replay":
+            fixture = store.load("search", store.key(query))
+            await asyncio.sleep(store.latency(fixture))
+            return fixture["result"]
+        start = time.perf_counter()
+        result = await tool.ainvoke(query)
+        record(query, result, time.perf_counter() - start)
+        return result
+
+    return Tool(name=name, description=description, func=search, coroutine=asearch)
+
+
+def get_fixture_store(fixture_dir: str, mode: str, latency_s: Optional[float] = None) -> Optional[FixtureStore]:
+    """FixtureStore for record/replay runs, or None when `mode` is "off"."""
+    if mode not in FIXTURE_MODES:
+        raise ValueError(f"Unknown fixture mode '{mode}'. Use one of {FIXTURE_MODES}.")
+    if mode == "off":
+        return None
+    if not fixture_dir:
+        raise ValueError(f"Fixture mode '{mode}' needs a fixture directory.")
+    return FixtureStore(fixture_dir, mode, latency_s)
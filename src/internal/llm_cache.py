@@ -0,0 +1,85 @@
+# src/internal/llm_cache.py
+import os
+import time
+import json
+import hashlib
+import threading
+from typing import Optional
+from internal.lru_store import SQLiteLRUStore, get_shared_cache
+
+DEFAULT_LLM_CACHE_MAX_MB = 32
+CACHE_FILENAME = "llm_responses.db"
+
+# Bump when the key layout changes; old entries then simply age out.
+LLM_CACHE_VERSION = 1
+
+# Nodes whose replies are cached, and for how long (seconds). Their
+# prompts are fixed or fully determined by their inputs.
+DEFAULT_LLM_CACHE_TTLS = {
+    "NewsResearcher": 24 * 3600,
+    "IntentClassifier": 7 * 24 * 3600,
+    "ChartDesigner": 24 * 3600,
+}
+
+def model_id(llm) -> str:
+    """Model name of a chat model (ChatOpenAI's `model_name`, else `model`, else its class)."""
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__)
+
+
+class LLMResponseCache:
+    """
+    Disk cache of LLM replies, bounded in size with LRU eviction.
+
+    Entries are keyed by model, temperature and a hash of the messages
+    sent, so any change to a prompt (or its inputs) is a miss. Reads take
+    a TTL, which lets every node decide how long a reply stays fresh.
+    Stored in a small SQLite file (SQLiteLRUStore), like the SQL result cache.
+    """
+
+    def __init__(self, cache_dir: str, max_mb: int = DEFAULT_LLM_CACHE_MAX_MB):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.path = os.path.join(self.cache_dir, CACHE_FILENAME)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.store = SQLiteLRUStore(
+            self.path, "responses",
+            {"node": "TEXT NOT NULL", "model": "TEXT NOT NULL", "content": "TEXT NOT NULL", "created": "REAL NOT NULL"},
+            self.max_bytes, "LLM Cache",
+        )
+
+    @staticmethod
+    def key(model: str, temperature, messages: list) -> str:
+        payload = json.dumps(
+            [LLM_CACHE_VERSION, model, temperature, [(m.type, m.content) for m in messages]],
+            ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # --- Public API ---
+
+    def get(self, key: str, ttl_s: float) -> Optional[str]:
+        """The cached reply for `key` if younger than `ttl_s` seconds, else None."""
+        row = self.store.get(key, ["content"], "created >= ?", (time.time() - ttl_s,))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row else None
+
+    def put(self, key: str, node: str, model: str, content: str):
+        self.store.put(key, len(content.encode("utf-8")), node=node, model=model, content=content, created=time.time())
+
+    def clear(self):
+        self.store.clear()
+
+
+def get_llm_cache(cache_dir: str, max_mb: int = DEFAULT_LLM_CACHE_MAX_MB) -> Optional[LLMResponseCache]:
+    """
+    Process-wide LLMResponseCache for `cache_dir`, or None (caching off)
+    when no directory is given or it cannot be created.
+    """
+    return get_shared_cache(LLMResponseCache, cache_dir, max_mb, "LLM Cache")
@@ -0,0 +1,77 @@
+# src/internal/llm_pool.py
+import threading
+from typing import Callable, Dict, Optional
+from pydantic import BaseModel, Field
+
+# Model used by the nodes with trivial jobs (short query, routing flags).
+DEFAULT_FAST_MODEL = "gpt-4o-mini"
+
+# Per-node model settings, keyed by node name. Nodes not listed (and fields
+# left unset) use the workflow defaults: Config.llm_model, its temperature,
+# no timeout and no token limit. Synthesis and the SQL agents stay there.
+DEFAULT_NODE_LLMS = {
+    "IntentClassifier": {"model": DEFAULT_FAST_MODEL, "timeout_s": 20.0, "max_tokens": 200},
+    "NewsResearcher": {"model": DEFAULT_FAST_MODEL, "timeout_s": 20.0, "max_tokens": 100},
+}
+
+
+class NodeLLMSettings(BaseModel):
+    """Chat model settings of one node; None keeps the workflow default."""
+
+    model: Optional[str] = Field(default=None, description="Model name")
+    temperature: Optional[float] = Field(default=None, description="LLM Temperature")
+    timeout_s: Optional[float] = Field(default=None, description="Request timeout in seconds")
+    max_tokens: Optional[int] = Field(default=None, description="Upper bound on the tokens of a reply")
+
+
+def merge_node_llms(overrides: Optional[dict] = None) -> Dict[str, NodeLLMSettings]:
+    """DEFAULT_NODE_LLMS with `overrides` applied field by field, per node."""
+    merged = {name: dict(fields) for name, fields in DEFAULT_NODE_LLMS.items()}
+    for name, fields in (overrides or {}).items():
+        merged.setdefault(name, {}).update(fields or {})
+    return {name: NodeLLMSettings(**fields) for name, fields in merged.items()}
+
+
+class LLMPool:
+    """
+    Chat model clients of a workflow, one per distinct settings: nodes
+    configured alike share a client. `build(model, temperature, timeout_s,
+    max_tokens)` creates a client; `default` holds the settings of nodes
+    without an entry in `node_settings`.
+    """
+
+    def __init__(self, build: Callable, default: NodeLLMSettings, node_settings: Dict[str, NodeLLMSettings] = None):
+        self.build = build
+        self.default = default
+        self.node_settings = node_settings or {}
+        self._clients = {}
+        self._nodes = {}
+        self._lock = threading.Lock()
+
+    def settings(self, node_name: Optional[str] = None) -> NodeLLMSettings:
+        """Settings of `node_name`: its own entry over the defaults."""
+        own = self.node_settings.get(node_name) if node_name else None
+        if own is None:
+            return self.default
+        return self.default.model_copy(update=own.model_dump(exclude_none=True))
+
+    def get(self, node_name: Optional[str] = None):
+        """Client for `node_name` (the default client when None or not configured)."""
+        settings = self.settings(node_name)
+        key = (settings.model, settings.temperature, settings.timeout_s, settings.max_tokens)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self.build(**settings.model_dump())
+            if node_name:
+                self._nodes[node_name] = key
+            return self._clients[key]
+
+    def describe(self) -> str:
+        """Which node uses which model, e.g. "gpt-4o (SynthesisAgent), gpt-4o-mini (NewsResearcher)"."""
+        by_model = {}
+        for node_name, key in sorted(self._nodes.items()):
+            by_model.setdefault(key[0], []).append(node_name)
+        return ", ".join(f"{model} ({', '.join(nodes)})" for model, nodes in sorted(by_model.items()))
+
+    def __len__(self):
+        return len(self._clients)
@@ -0,0 +1,331 @@
+# src/internal/llm_usage.py
+import os
+import json
+import time
+import datetime
+import threading
+from typing import Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig, ensure_config
+from langchain_core.runnables.config import merge_configs
+from internal.structured_output import REPAIR_EVENT, FAILURE_EVENT
+
+# USD per 1M (prompt, completion) tokens, OpenAI list prices. Dated model
+# names ("gpt-4o-2024-08-06") match by prefix; unknown models cost None.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "o4-mini": (1.10, 4.40),
+}
+
+RUN_SUMMARY_SUFFIX = ".run.json"
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of the tokens on `model`, or None when its price is unknown."""
+    if not model:
+        return None
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        # Longest prefix first, so "gpt-4o-mini-..." is not priced as "gpt-4o".
+        for name in sorted(MODEL_PRICES, key=len, reverse=True):
+            if model.startswith(name):
+                prices = MODEL_PRICES[name]
+                break
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+def with_callbacks(*handlers) -> RunnableConfig:
+    """
+    Invoke config adding `handlers` to the callbacks of the current run
+    (e.g. a workflow's RunTelemetry), instead of replacing them.
+    """
+    return merge_configs(ensure_config(), {"callbacks": list(handlers)})
+
+
+class LLMUsageTracker(BaseCallbackHandler):
+    """
+    Callback counting the LLM turns, tool calls, tokens, latency and cost
+    of a run, and the repairs of structured replies. Pass it in the invoke
+    config (see `with_callbacks`). Time to first token is only measured
+    for streaming models.
+    """
+
+    def __init__(self):
+        self.turns = 0
+        self.tool_calls = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_seconds = 0.0
+        self.first_token_seconds = []
+        self.cost_usd = 0.0
+        self.unpriced_calls = 0
+        self.repair_retries = 0
+        self.structured_failures = 0
+        self._calls = {}   # run_id -> [start, model, first token time]
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, invocation_params: dict = None):
+        params = invocation_params or {}
+        model = params.get("model_name") or params.get("model") or ""
+        with self._lock:
+            self._calls[run_id] = [time.perf_counter(), model, None]
+
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id, **kwargs):
+        self._start(run_id, kwargs.get("invocation_params"))
+
+    def on_llm_start(self, serialized: dict, prompts: list, *, run_id, **kwargs):
+        self._start(run_id, kwargs.get("invocation_params"))
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None and call[2] is None:
+                call[2] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id=None, **kwargs):
+        prompt, completion = _token_usage(response)
+        with self._lock:
+            start, model, first_token = self._calls.pop(run_id, None) or [None, "", None]
+            model = _response_model(response) or model
+            cost = estimate_cost(model, prompt, completion)
+            self.turns += 1
+            self.prompt_tokens += prompt
+            self.completion_tokens += completion
+            if cost is None:
+                self.unpriced_calls += 1
+            else:
+                self.cost_usd += cost
+            if start is not None:
+                self.llm_seconds += time.perf_counter() - start
+                if first_token is not None:
+                    self.first_token_seconds.append(first_token - start)
+
+    def on_llm_error(self, error: BaseException, *, run_id=None, **kwargs):
+        with self._lock:
+            self._calls.pop(run_id, None)
+
+    def on_tool_start(self, serialized: dict, input_str: str, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        with self._lock:
+            self.tool_calls[name] = self.tool_calls.get(name, 0) + 1
+
+    def on_custom_event(self, name: str, data, *, run_id, **kwargs):
+        with self._lock:
+            if name == REPAIR_EVENT:
+                self.repair_retries += 1
+            elif name == FAILURE_EVENT:
+                self.structured_failures += 1
+
+    def as_dict(self) -> dict:
+        ttft = self.first_token_seconds
+        return {
+            "llm_calls": self.turns,
+            "tool_calls": dict(self.tool_calls),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "llm_seconds": round(self.llm_seconds, 3),
+            "mean_time_to_first_token_s": round(sum(ttft) / len(ttft), 3) if ttft else None,
+            "cost_usd": round(self.cost_usd, 6),
+            "unpriced_llm_calls": self.unpriced_calls,
+            "repair_retries": self.repair_retries,
+            "structured_failures": self.structured_failures,
+        }
+
+    def __str__(self):
+        tools = ", ".join(f"{name} x{n}" for name, n in self.tool_calls.items()) or "none"
+        repairs = f", {self.repair_retries} repair(s)" if self.repair_retries else ""
+        return (
+            f"{self.turns} LLM turn(s), tools: {tools}, "
+            f"{self.prompt_tokens} prompt / {self.completion_tokens} completion tokens, "
+            f"~${self.cost_usd:.4f}{repairs}"
+        )
+
+
+class RunTelemetry(BaseCallbackHandler):
+    """
+    Callback collecting per-node usage of one workflow run: wall time,
+    LLM and tool calls, tokens, time to first token, estimated cost and
+    structured-output repairs.
+    Events are attributed through LangGraph's `langgraph_node` metadata,
+    so it only needs to be in the run config of `invoke` / `ainvoke`.
+    """
+
+    def __init__(self, workflow: str):
+        self.workflow = workflow
+        self.started = datetime.datetime.now()
+        self._start = time.perf_counter()
+        self.nodes = {}           # graph node -> LLMUsageTracker
+        self.node_seconds = {}    # graph node -> wall time
+        self.events = {}          # other custom events (e.g. routing decisions): name -> [data]
+        self._node_runs = {}      # run_id -> (graph node, start)
+        self._lock = threading.Lock()
+
+    def _tracker(self, metadata: dict) -> Optional[LLMUsageTracker]:
+        node = (metadata or {}).get("langgraph_node")
+        if node is None:
+            return None
+        with self._lock:
+            return self.nodes.setdefault(node, LLMUsageTracker())
+
+    def _run_tracker(self, run_id) -> Optional[LLMUsageTracker]:
+        # on_llm_end / on_llm_new_token carry no metadata: find the call's tracker.
+        with self._lock:
+            for tracker in self.nodes.values():
+                if run_id in tracker._calls:
+                    return tracker
+        return None
+
+    # --- Node wall time ---
+
+    def on_chain_start(self, serialized: dict, inputs, *, run_id, **kwargs):
+        node = (kwargs.get("metadata") or {}).get("langgraph_node")
+        # The node's outermost chain is the one named after it.
+        if node is not None and kwargs.get("name") == node:
+            with self._lock:
+                self._node_runs[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end_node(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id, **kwargs):
+        self._end_node(run_id)
+
+    def _end_node(self, run_id):
+        with self._lock:
+            entry = self._node_runs.pop(run_id, None)
+            if entry is not None:
+                node, start = entry
+                self.node_seconds[node] = self.node_seconds.get(node, 0.0) + time.perf_counter() - start
+
+    # --- LLM & tool calls ---
+
+    def on_chat_model_start(self, serialized: dict, messages: list, *, run_id, **kwargs):
+        tracker = self._tracker(kwargs.get("metadata"))
+        if tracker is not None:
+            tracker.on_chat_model_start(serialized, messages, run_id=run_id, **kwargs)
+
+    def on_llm_start(self, serialized: dict, prompts: list, *, run_id, **kwargs):
+        tracker = self._tracker(kwargs.get("metadata"))
+        if tracker is not None:
+            tracker.on_llm_start(serialized, prompts, run_id=run_id, **kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        tracker = self._run_tracker(run_id)
+        if tracker is not None:
+            tracker.on_llm_new_token(token, run_id=run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        tracker = self._run_tracker(run_id)
+        if tracker is not None:
+            tracker.on_llm_end(response, run_id=run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs):
+        tracker = self._run_tracker(run_id)
+        if tracker is not None:
+            tracker.on_llm_error(error, run_id=run_id)
+
+    def on_tool_start(self, serialized: dict, input_str: str, **kwargs):
+        tracker = self._tracker(kwargs.get("metadata"))
+        if tracker is not None:
+            tracker.on_tool_start(serialized, input_str, **kwargs)
+
+    def on_custom_event(self, name: str, data, *, run_id, **kwargs):
+        if name not in (REPAIR_EVENT, FAILURE_EVENT):
+            with self._lock:
+                self.events.setdefault(name, []).append(data)
+            return
+        tracker = self._tracker(kwargs.get("metadata"))
+        if tracker is not None:
+            tracker.on_custom_event(name, data, run_id=run_id)
+
+    # --- Summary ---
+
+    def summary(self, report_path: str = None) -> dict:
+        with self._lock:
+            names = sorted(set(self.nodes) | set(self.node_seconds))
+            nodes = {
+                name: {
+                    "wall_seconds": round(self.node_seconds.get(name, 0.0), 3),
+                    **(self.nodes[name].as_dict() if name in self.nodes else LLMUsageTracker().as_dict()),
+                }
+                for name in names
+            }
+        totals = {
+            "llm_calls": sum(n["llm_calls"] for n in nodes.values()),
+            "tool_calls": sum(sum(n["tool_calls"].values()) for n in nodes.values()),
+            "prompt_tokens": sum(n["prompt_tokens"] for n in nodes.values()),
+            "completion_tokens": sum(n["completion_tokens"] for n in nodes.values()),
+            "llm_seconds": round(sum(n["llm_seconds"] for n in nodes.values()), 3),
+            "cost_usd": round(sum(n["cost_usd"] for n in nodes.values()), 6),
+            "unpriced_llm_calls": sum(n["unpriced_llm_calls"] for n in nodes.values()),
+            "repair_retries": sum(n["repair_retries"] for n in nodes.values()),
+            "structured_failures": sum(n["structured_failures"] for n in nodes.values()),
+        }
+        return {
+            "workflow": self.workflow,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._start, 3),
+            "report_path": report_path,
+            "nodes": nodes,
+            "totals": totals,
+            "events": {name: list(events) for name, events in self.events.items()},
+        }
+
+    def write_summary(self, report_path: str) -> Optional[str]:
+        """
+        Writes the run summary as JSON next to the generated report
+        (`<report>.run.json`). Returns its path, or None without a report.
+        """
+        if not report_path or not os.path.isfile(report_path):
+            print("[Telemetry] No report generated; run summary not written.")
+            return None
+        summary = self.summary(report_path)
+        path = os.path.splitext(report_path)[0] + RUN_SUMMARY_SUFFIX
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            print(f"[Telemetry] Could not write run summary: {e}")
+            return None
+        totals = summary["totals"]
+        print(
+            f"[Telemetry] {summary['wall_seconds']:.2f}s, {totals['llm_calls']} LLM call(s), "
+            f"{totals['prompt_tokens']} prompt / {totals['completion_tokens']} completion tokens, "
+            f"~${totals['cost_usd']:.4f}. Summary: {path}"
+        )
+        return path
+
+
+def _response_model(response: LLMResult) -> str:
+    model = (response.llm_output or {}).get("model_name")
+    if model:
+        return model
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "response_metadata", None) or {}
+            if metadata.get("model_name"):
+                return metadata["model_name"]
+    return ""
+
+
+def _token_usage(response: LLMResult):
+    """(prompt, completion) tokens of one LLM call, from the provider's report."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+
+    # Otherwise from the messages' usage metadata (streaming, other providers).
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += metadata.get("input_tokens", 0)
+            completion += metadata.get("output_tokens", 0)
+    return prompt, completion
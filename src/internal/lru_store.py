@@ -0,0 +1,108 @@
+# src/internal/lru_store.py
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+# One cache object per (class, directory), shared by every node/agent in the process.
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+class SQLiteLRUStore:
+    """
+    Entries in one table of a small SQLite file, bounded in size with LRU
+    eviction: every entry has a `key`, its `size` in bytes and when it was
+    `last_used`, next to the `columns` (name -> SQL type) its cache stores.
+    WAL mode makes the file safe to share between threads and processes.
+
+    Errors are logged under `label` and never raised: a read-only or full
+    disk must not break the callers, it only costs them their cache.
+    """
+
+    def __init__(self, path: str, table: str, columns: dict, max_bytes: int, label: str):
+        self.path = path
+        self.table = table
+        self.columns = list(columns)
+        self.max_bytes = max_bytes
+        self.label = label
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, "
+                + "".join(f"{name} {sql_type}, " for name, sql_type in columns.items())
+                + "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)")
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str, fields: list, condition: str = "", params: tuple = ()) -> Optional[tuple]:
+        """`fields` of the entry for `key` (that also meets `condition`), or None. Marks it as used."""
+        where = f"key = ? AND ({condition})" if condition else "key = ?"
+        try:
+            with self._connect() as conn:
+                row = conn.execute(f"SELECT {', '.join(fields)} FROM {self.table} WHERE {where}", (key, *params)).fetchone()
+                if row is not None:
+                    conn.execute(f"UPDATE {self.table} SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"[{self.label}] Lookup failed: {e}")
+            return None
+        return row
+
+    def put(self, key: str, size: int, **values):
+        """Stores (or replaces) the entry for `key`, then evicts the least recently used beyond `max_bytes`."""
+        if size > self.max_bytes:
+            return
+        names = ["key", *values, "size", "last_used"]
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    (key, *values.values(), size, time.time()),
+                )
+                self._evict(conn)
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"[{self.label}] Could not store entry: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+        conn.close()
+
+
+def get_shared_cache(cache_cls, cache_dir: str, max_mb: int, label: str):
+    """
+    Process-wide `cache_cls(cache_dir, max_mb)` for `cache_dir`, or None
+    (caching off) when no directory is given or it cannot be opened.
+    """
+    if not cache_dir:
+        return None
+    cache_dir = os.path.abspath(cache_dir)
+    with _shared_lock:
+        cache = _shared.get((cache_cls, cache_dir))
+        if cache is None:
+            try:
+                cache = cache_cls(cache_dir, max_mb)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[{label}] Disabled, cannot open {cache_dir}: {e}")
+                return None
+            _shared[(cache_cls, cache_dir)] = cache
+        return cache
@@ -0,0 +1,107 @@
+# src/internal/structured_output.py
+import re
+import json
+from typing import Type
+from pydantic import BaseModel, ValidationError
+from langchain_core.callbacks.manager import dispatch_custom_event, adispatch_custom_event
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+# Extra LLM calls allowed to fix a reply that does not match its schema.
+DEFAULT_MAX_REPAIRS = 1
+
+# Custom callback events, counted by LLMUsageTracker / RunTelemetry.
+REPAIR_EVENT = "structured_output_repair"
+FAILURE_EVENT = "structured_output_failure"
+
+REPAIR_SYSTEM_PROMPT = """
+You convert answers into the required structured format.
+Keep every value of the answer; do not compute, add or drop anything.
+"""
+
+REPAIR_PROMPT = """
+The reply below does not match the required {schema} format:
+{error}
+
+Reply:
+{reply}
+
+Answer again with the same content, following the format exactly.
+"""
+
+
+class StructuredOutputError(ValueError):
+    """A reply that still does not match its schema after the repair attempts."""
+
+    def __init__(self, schema: Type[BaseModel], error):
+        super().__init__(f"No valid {schema.__name__} reply after repairs: {error}")
+        self.schema = schema
+
+
+def structured_llm(llm, schema: Type[BaseModel]) -> Runnable:
+    """
+    `llm` constrained to `schema` through (strict) function calling, which
+    also works for streamed and wrapped models. Returns a dict with the
+    "raw" message, the "parsed" model (or None) and the "parsing_error".
+    """
+    return llm.with_structured_output(schema, method="function_calling", strict=True, include_raw=True)
+
+
+def parse_reply(reply: dict):
+    """(parsed model, None) of a `structured_llm` reply, or (None, error)."""
+    parsed = reply.get("parsed")
+    if parsed is not None:
+        return parsed, None
+    return None, reply.get("parsing_error") or "the reply did not use the required format"
+
+
+def reply_text(message) -> str:
+    """What the model answered: its tool call arguments, else its text."""
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        return json.dumps(tool_calls[0].get("args", {}), ensure_ascii=False)
+    return str(getattr(message, "content", message) or "")
+
+
+def repair_messages(schema: Type[BaseModel], error, reply: str) -> list:
+    """Request to restate `reply` in the `schema` format."""
+    return [
+        SystemMessage(content=REPAIR_SYSTEM_PROMPT),
+        HumanMessage(content=REPAIR_PROMPT.format(schema=schema.__name__, error=_short(error), reply=reply)),
+    ]
+
+
+def parse_json_reply(text: str, schema: Type[BaseModel]) -> BaseModel:
+    """
+    Validates a free-text JSON answer (e.g. a SQL agent's final message)
+    against `schema`: the whole text, else the object embedded in it.
+    Raises ValidationError when neither matches.
+    """
+    text = (text or "").strip()
+    try:
+        return schema.model_validate_json(text)
+    except ValidationError:
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        if not match:
+            raise
+        return schema.model_validate_json(match.group(0))
+
+
+def report_event(name: str, data: dict, config: RunnableConfig = None):
+    """Emits a custom callback event to the current run (no-op outside one)."""
+    try:
+        dispatch_custom_event(name, data, config=config)
+    except RuntimeError:
+        pass
+
+
+async def areport_event(name: str, data: dict, config: RunnableConfig = None):
+    try:
+        await adispatch_custom_event(name, data, config=config)
+    except RuntimeError:
+        pass
+
+
+def _short(error, limit: int = 500) -> str:
+    text = str(error)
+    return text if len(text) <= limit else text[:limit] + "..."
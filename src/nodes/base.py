@@ -1,24 +1,168 @@
 # sars_lens/nodes/base.py
+import asyncio
+from pydantic import ValidationError
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from internal.llm_cache import LLMResponseCache, model_id
+from internal.structured_output import (
+    DEFAULT_MAX_REPAIRS, REPAIR_EVENT, FAILURE_EVENT, StructuredOutputError,
+    structured_llm, parse_reply, reply_text, repair_messages, report_event, areport_event,
+)
 
 class BaseNode:
     def __init__(self, llm, name: str):
         self.llm = llm
         self.name = name
+        # Opt-in reply cache (see use_response_cache).
+        self.response_cache = None
+        self.cache_ttl_s = 0
+        self.cache_bypass = False
 
-    def _invoke_llm(self, system_prompt: str, user_content: str) -> str:
+    def use_response_cache(self, cache: LLMResponseCache, ttl_s: float, bypass: bool = False):
         """
-        Standard wrapper for LLM calls with error handling.
+        Serves `_invoke_llm` from `cache` for `ttl_s` seconds. With `bypass`,
+        cached replies are ignored but fresh ones are still stored.
         """
-        messages = [
+        self.response_cache = cache
+        self.cache_ttl_s = ttl_s
+        self.cache_bypass = bypass
+
+    def _messages(self, system_prompt: str, user_content: str) -> list:
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_content)
         ]
-        response = self.llm.invoke(messages)
-        return response.content
+
+    def _cache_lookup(self, messages: list, use_cache: bool, schema=None):
+        """(cache, key, cached reply) for `messages`; cache is None when caching is off."""
+        cache = self.response_cache if use_cache and self.cache_ttl_s > 0 else None
+        if cache is None:
+            return None, None, None
+        # Structured replies are cached apart from free-text ones.
+        model = model_id(self.llm) + (f"/{schema.__name__}" if schema else "")
+        key = cache.key(model, getattr(self.llm, "temperature", None), messages)
+        cached = None if self.cache_bypass else cache.get(key, self.cache_ttl_s)
+        if cached is not None:
+            print(f"[{self.name}] LLM reply served from cache.")
+        return cache, key, cached
+
+    def _cache_store(self, cache: LLMResponseCache, key: str, content):
+        if cache is not None and isinstance(content, str) and content:
+            cache.put(key, self.name, model_id(self.llm), content)
+
+    def _invoke_llm(self, system_prompt: str, user_content: str, use_cache: bool = True) -> str:
+        """
+        Standard wrapper for LLM calls with error handling.
+        Replies come from the response cache when one is set and `use_cache`.
+        """
+        messages = self._messages(system_prompt, user_content)
+        cache, key, cached = self._cache_lookup(messages, use_cache)
+        if cached is not None:
+            return cached
+        content = self.llm.invoke(messages).content
+        self._cache_store(cache, key, content)
+        return content
+
+    async def _ainvoke_llm(self, system_prompt: str, user_content: str, use_cache: bool = True) -> str:
+        """Async `_invoke_llm`: awaits the model instead of blocking a thread."""
+        messages = self._messages(system_prompt, user_content)
+        cache, key, cached = self._cache_lookup(messages, use_cache)
+        if cached is not None:
+            return cached
+        content = (await self.llm.ainvoke(messages)).content
+        self._cache_store(cache, key, content)
+        return content
+
+    # --- Structured output ---
+
+    def _cached_model(self, cached: str, schema):
+        try:
+            return schema.model_validate_json(cached)
+        except ValidationError:
+            return None  # Stored under an older schema: ask again.
+
+    def _event(self, schema, error=None) -> dict:
+        return {"node": self.name, "schema": schema.__name__, "error": str(error)[:200] if error else None}
+
+    def _structured_call(self, messages: list, schema, max_repairs: int, config=None):
+        structured = structured_llm(self.llm, schema)
+        for attempt in range(max_repairs + 1):
+            reply = structured.invoke(messages, config=config)
+            parsed, error = parse_reply(reply)
+            if parsed is not None:
+                return parsed
+            print(f"[{self.name}] Reply does not match {schema.__name__} (attempt {attempt + 1}/{max_repairs + 1}): {error}")
+            if attempt < max_repairs:
+                report_event(REPAIR_EVENT, self._event(schema, error), config)
+                messages = messages + repair_messages(schema, error, reply_text(reply["raw"]))[1:]
+        report_event(FAILURE_EVENT, self._event(schema, error), config)
+        raise StructuredOutputError(schema, error)
+
+    def _invoke_structured(self, system_prompt: str, user_content: str, schema,
+                           use_cache: bool = True, max_repairs: int = DEFAULT_MAX_REPAIRS):
+        """
+        `_invoke_llm` with a schema-constrained reply: returns a `schema`
+        (Pydantic model) instance. A reply that does not validate is sent
+        back with the error, at most `max_repairs` times (each one counted
+        in the run telemetry), then StructuredOutputError is raised.
+        """
+        messages = self._messages(system_prompt, user_content)
+        cache, key, cached = self._cache_lookup(messages, use_cache, schema)
+        parsed = self._cached_model(cached, schema) if cached is not None else None
+        if parsed is None:
+            parsed = self._structured_call(messages, schema, max_repairs)
+            self._cache_store(cache, key, parsed.model_dump_json())
+        return parsed
+
+    async def _astructured_call(self, messages: list, schema, max_repairs: int):
+        structured = structured_llm(self.llm, schema)
+        for attempt in range(max_repairs + 1):
+            reply = await structured.ainvoke(messages)
+            parsed, error = parse_reply(reply)
+            if parsed is not None:
+                return parsed
+            print(f"[{self.name}] Reply does not match {schema.__name__} (attempt {attempt + 1}/{max_repairs + 1}): {error}")
+            if attempt < max_repairs:
+                await areport_event(REPAIR_EVENT, self._event(schema, error))
+                messages = messages + repair_messages(schema, error, reply_text(reply["raw"]))[1:]
+        await areport_event(FAILURE_EVENT, self._event(schema, error))
+        raise StructuredOutputError(schema, error)
+
+    async def _ainvoke_structured(self, system_prompt: str, user_content: str, schema,
+                                  use_cache: bool = True, max_repairs: int = DEFAULT_MAX_REPAIRS):
+        """Async `_invoke_structured`."""
+        messages = self._messages(system_prompt, user_content)
+        cache, key, cached = self._cache_lookup(messages, use_cache, schema)
+        parsed = self._cached_model(cached, schema) if cached is not None else None
+        if parsed is None:
+            parsed = await self._astructured_call(messages, schema, max_repairs)
+            self._cache_store(cache, key, parsed.model_dump_json())
+        return parsed
+
+    def _repair_reply(self, reply: str, schema, error, config=None, max_repairs: int = DEFAULT_MAX_REPAIRS):
+        """
+        Restates a free-text `reply` that failed `schema` validation (e.g. a
+        SQL agent's final answer) through a schema-constrained call, instead
+        of re-running whatever produced it. Counts as a repair.
+        """
+        if max_repairs < 1:
+            raise StructuredOutputError(schema, error)
+        report_event(REPAIR_EVENT, self._event(schema, error), config)
+        return self._structured_call(repair_messages(schema, error, reply), schema, max_repairs - 1, config)
 
     def execute(self, state: dict):
         """
         Abstract method to be implemented by child nodes.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def aexecute(self, state: dict):
+        """
+        Async counterpart of `execute`. Nodes without a native async path
+        run `execute` in a worker thread, off the event loop.
+        """
+        return await asyncio.to_thread(self.execute, state)
+
+    def as_runnable(self) -> RunnableLambda:
+        """The node as a graph step: `execute` under invoke, `aexecute` under ainvoke."""
+        return RunnableLambda(self.execute, afunc=self.aexecute, name=self.name)
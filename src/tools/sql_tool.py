@@ -3,9 +3,16 @@
 import os
 import logging
 from langchain_openai import ChatOpenAI
-from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 from langchain_core.tools import tool
+from internal.data_retrieval.connection_pool import get_readonly_engine, path_from_uri
+from internal.data_retrieval.adapters.federated_loader import get_federated_engine
+from internal.data_retrieval.sql_engines import open_duckdb_files
+from internal.data_retrieval.query_cache import CachedSQLDatabaseToolkit, get_query_cache, snapshot_of_files
+from internal.data_retrieval.sql_guard import SQLGuard
+from internal.data_retrieval.schema_cache import get_sql_database, sql_agent_prompt, DEFAULT_SAMPLE_ROWS
+from internal.llm_usage import LLMUsageTracker, with_callbacks
+from src.domain.sars.schema_context import SQL_DIALECT_HINTS
 
 logger = logging.getLogger(__name__)
 
@@ -35,32 +42,57 @@ METRIC CALCULATION RULES:
 - **Rate of Increase**: Compare count of cases in the last 7 days vs the previous 7 days.
 - **Vaccination Rate**: (Count(VACINA=1) / Count(VACINA IN (1, 2))) * 100.
 
-Start by checking the table schema if you are unsure. 
 Always return the final answer as a concise summary of the requested metric.
 """
 
-def create_sars_stats_tool(db_uri: str, llm: ChatOpenAI):
+def create_sars_stats_tool(db_uri, llm: ChatOpenAI, sql_engine: str = "sqlite", query_cache=None, sql_guard: SQLGuard = None,
+                          schema_sample_rows: int = DEFAULT_SAMPLE_ROWS):
     """
     Creates a specialized SQL agent tool for querying SARS/SRAG data.
     
     Args:
-        db_uri (str): Connection string (e.g., 'sqlite:///sars_data.db')
+        db_uri (str | list): Connection string (e.g., 'sqlite:///sars_data.db'), or a list
+            of yearly DB URIs queried together as one 'srag_records' view.
         llm (ChatOpenAI): The language model instance
+        sql_engine (str): "sqlite" (default) or "duckdb" to run the agent's
+            queries on DuckDB over the same file(s).
+        query_cache (SQLResultCache): Optional on-disk cache of query results,
+            keyed by the DB files' versions (see get_query_cache).
+        sql_guard (SQLGuard): Row cap / timeout / plan checks on the agent's
+            queries (defaults to SQLGuard()).
+        schema_sample_rows (int): Sample rows per table in the schema given
+            to the agent up front.
     """
     logger.info(f"Initializing SARS Data Agent... (Connecting to: {db_uri})")
 
     try:
-        db = SQLDatabase.from_uri(db_uri) # , engine_args={"connect_args": {"check_same_thread": False}} # Fail - Delete later
+        # Shared read-only, memory-mapped pool (same one the data adapter uses).
+        # Its connections are created with check_same_thread=False.
+        db_uris = list(db_uri) if isinstance(db_uri, (list, tuple)) else [db_uri]
+        db_paths = [path_from_uri(uri) for uri in db_uris]
+        if sql_engine == "duckdb":
+            db = open_duckdb_files(db_paths, schema_sample_rows)
+        elif len(db_uris) > 1:
+            engine = get_federated_engine(db_paths)
+            db = get_sql_database(engine, schema_sample_rows, schema="temp", view_support=True)
+        else:
+            db = get_sql_database(get_readonly_engine(db_paths[0]), schema_sample_rows)
     except Exception as e:
         logger.critical(f"Failed to connect to database at {db_uri}: {e}")
         raise # Critical error, stop tool initialization
 
+    snapshot = snapshot_of_files(db_paths, sql_engine)
+    toolkit = CachedSQLDatabaseToolkit(
+        db=db, llm=llm, cache=query_cache, guard=sql_guard or SQLGuard(),
+        snapshot=snapshot if query_cache else "", schema_key=f"{snapshot}:{schema_sample_rows}",
+    )
     sql_agent_executor = create_sql_agent(
         llm=llm,
-        db=db,
+        toolkit=toolkit,
         agent_type="openai-tools",
         verbose=True,
-        suffix=SARS_AGENT_PROMPT_SUFFIX
+        # Schema injected up front: no list-tables / schema turns.
+        prompt=sql_agent_prompt(SARS_AGENT_PROMPT_SUFFIX + SQL_DIALECT_HINTS[sql_engine])
     )
 
     @tool
@@ -73,8 +105,10 @@ def create_sars_stats_tool(db_uri: str, llm: ChatOpenAI):
         """
         try:
             logger.info(f"Executing SQL query command for: {query[:50]}...")
-            response = sql_agent_executor.invoke({"input": query})
-            # sql_agent_executor.tools[0].db._engine.dispose() # Fail - Delete later
+            usage = LLMUsageTracker()
+            response = sql_agent_executor.invoke({"input": query}, config=with_callbacks(usage))
+            logger.info(f"Agent run: {usage}")
+            logger.info(f"SQL queries so far: {toolkit.stats}")
             return response["output"]
         except Exception as e:
             logger.error(f"Error during SQL Agent execution for query '{query[:50]}...': {e}")
@@ -96,7 +130,7 @@ if __name__ == "__main__":
     # Initialize Components
     try:
         test_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        sars_tool = create_sars_stats_tool(DB_FILE, test_llm)
+        sars_tool = create_sars_stats_tool(DB_FILE, test_llm, query_cache=get_query_cache("./data/sql_cache"))
         test_query = "What is the mortality rate among closed cases?"
         
         print("\n--- Running SQL Agent Debug Test ---")
@@ -6,18 +6,33 @@ import logging
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools import Tool
+from internal.fixtures import FixtureStore, fixture_search_tool
 
 logger = logging.getLogger(__name__)
 
 # NOTE: The tool now relies ONLY on the OS environment variables 
 # (TAVILY_API_KEY) being set externally by main_agent.py.
 
-def create_search_tool():
+SEARCH_TOOL_NAME = "sars_news_search"
+
+def create_search_tool(fixtures: FixtureStore = None):
     """
     Factory function that returns the best available search tool for SARS news.
     
     Strategy: Tries to use Tavily (API Key needed), falls back to DuckDuckGo (Free).
+    With `fixtures`, results are recorded into the store or, in replay mode,
+    served from it without any search backend (or API key).
     """
+    if fixtures is not None and fixtures.mode == "replay":
+        return fixture_search_tool(fixtures, SEARCH_TOOL_NAME, "Recorded SARS news search results.")
+
+    search_tool = _create_live_search_tool()
+    if fixtures is not None:
+        return fixture_search_tool(fixtures, search_tool.name, search_tool.description, search_tool)
+    return search_tool
+
+
+def _create_live_search_tool():
     tavily_key = os.getenv("TAVILY_API_KEY")
     
     if tavily_key:
@@ -30,7 +45,7 @@ def create_search_tool():
         )
         
         # Customizing metadata for the SARS context
-        search_tool.name = "sars_news_search"
+        search_tool.name = SEARCH_TOOL_NAME
         search_tool.description = (
             "A search engine optimized for retrieving real-time news about SARS, "
             "COVID-19, and influenza outbreaks. "
@@ -45,7 +60,7 @@ def create_search_tool():
         
         # Wrap DDG in a custom Tool to enforce the healthcare context
         return Tool(
-            name="sars_news_search",
+            name=SEARCH_TOOL_NAME,
             func=ddg_search.run,
             description=(
                 "Search for current news regarding SARS, hospital occupancy, and vaccination campaigns. "
@@ -1,40 +1,162 @@
 # src/workflows/agents/chart_calculator/node.py
 
-import json
-import re
+import os
+import time
 import pandas as pd
+from pydantic import ValidationError
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 
 from src.nodes.base import BaseNode
-from .states import ChartCalculatorState
+from .states import ChartCalculatorState, ChartSeries
 from .prompts import (
     SYSTEM_PROMPT, 
     CHART_CALCULATION_PROMPT, 
     REQUEST_CHARTS, 
     REFERENCE_DATE_CONTEXT,
 )
-from src.domain.sars.schema_context import DATA_DICTIONARY_TEXT
+from src.domain.sars.schema_context import build_data_dictionary
+from src.domain.sars.cleaning import latest_date as frame_latest_date
+from src.domain.sars.series_engine import build_chart_data, fill_series, CHART_SERIES
+from internal.data_retrieval.analytics_db import open_analytics_db, write_analytics_tables, frame_fingerprint
+from internal.data_retrieval.query_cache import CachedSQLDatabaseToolkit
+from internal.data_retrieval.sql_replay import template_version
+from internal.data_retrieval.sql_guard import SQLGuard
+from internal.data_retrieval.sql_engines import open_duckdb_frame
+from internal.data_retrieval.schema_cache import sql_agent_prompt, DEFAULT_SAMPLE_ROWS
+from internal.data_retrieval.agent_pool import SQLAgentPool
+from internal.llm_usage import LLMUsageTracker, with_callbacks
+from internal.structured_output import parse_json_reply
+
+CHARTS_MODES = ("deterministic", "agent")
 
 class ChartCalculatorNode(BaseNode):
-    def __init__(self, llm):
+    """
+    Builds the chart series. `mode`: "deterministic" computes them with the
+    series engine (no LLM); "agent" asks the SQL agent (or replays its
+    compiled SQL, see SQLReplayStore) and repairs its reply.
+    """
+    def __init__(self, llm, sql_engine: str = "sqlite", query_cache=None, mode: str = "deterministic", replay_store=None,
+                 sql_guard: SQLGuard = None, schema_sample_rows: int = DEFAULT_SAMPLE_ROWS):
         super().__init__(llm, "ChartCalculator")
+        if mode not in CHARTS_MODES:
+            raise ValueError(f"Unknown charts mode '{mode}'. Use one of {CHARTS_MODES}.")
+        self.sql_engine = sql_engine
+        self.query_cache = query_cache
+        self.mode = mode
+        self.replay_store = replay_store
+        self.sql_guard = sql_guard or SQLGuard()
+        self.schema_sample_rows = schema_sample_rows
+        # Executors are built once per data snapshot and reused across runs.
+        self.agent_pool = SQLAgentPool(self.name)
 
     def _create_ephemeral_db(self, df: pd.DataFrame) -> SQLDatabase:
-        engine = create_engine("sqlite:///:memory:")
-        df.to_sql("srag_records", engine, index=False, if_exists='replace')
-        return SQLDatabase(engine=engine)
+        # One shared connection, usable from any thread: pooled executors
+        # built on this DB may serve later runs on other threads.
+        engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        # srag_records + srag_daily, dates as ISO strings (see DATA_DICTIONARY_TEXT)
+        write_analytics_tables(df, engine)
+        return SQLDatabase(engine=engine, sample_rows_in_table_info=self.schema_sample_rows)
+
+    def _get_database(self, state: dict, df: pd.DataFrame) -> SQLDatabase:
+        """
+        With sql_engine='duckdb', DuckDB over the columnar frame. Otherwise the
+        shared analytics DB built at load time when available (indexed,
+        read-only, pooled), or an in-memory copy of `df`.
+        """
+        if self.sql_engine == "duckdb":
+            return open_duckdb_frame(df, self.schema_sample_rows)
+
+        db_path = state.get("analytics_db_path")
+        if db_path and os.path.exists(db_path):
+            return open_analytics_db(db_path, self.schema_sample_rows)
+        return self._create_ephemeral_db(df)
+
+    def _get_toolkit(self, db: SQLDatabase, snapshot: str) -> CachedSQLDatabaseToolkit:
+        """
+        SQL tools behind the guard, with results (if a cache is set) and the
+        schema description cached per data snapshot.
+        """
+        return CachedSQLDatabaseToolkit(
+            db=db, llm=self.llm, cache=self.query_cache, guard=self.sql_guard,
+            snapshot=snapshot if self.query_cache else "", schema_key=f"{snapshot}:{self.schema_sample_rows}",
+            # Statements are only recorded for the replay store to compile.
+            executed_sql=[] if self.replay_store is not None else None,
+        )
+
+    def _template_version(self) -> str:
+        return template_version(
+            SYSTEM_PROMPT, CHART_CALCULATION_PROMPT, REQUEST_CHARTS, REFERENCE_DATE_CONTEXT,
+            build_data_dictionary(self.sql_engine),
+        )
+
+    def _replay(self, db: SQLDatabase, latest_date: pd.Timestamp):
+        if self.replay_store is None:
+            return None
+        return self.replay_store.replay(db, self.name, self._template_version(), self.sql_engine, latest_date, self.sql_guard)
+
+    def _build_agent(self, db: SQLDatabase, snapshot: str):
+        toolkit = self._get_toolkit(db, snapshot)
+        # The schema is in the prompt, so the agent starts with its queries.
+        agent_executor = create_sql_agent(
+            llm=self.llm, toolkit=toolkit, agent_type="openai-tools",
+            prompt=sql_agent_prompt(SYSTEM_PROMPT), verbose=False
+        )
+        return agent_executor, toolkit
+
+    def _run_agent(self, state: dict, df: pd.DataFrame, ref_context: str, latest_date: pd.Timestamp) -> dict:
+        """
+        Compiled SQL of an earlier agent run, else the agent itself, both on
+        the DB of the checked-out pool entry: it is opened (or, in-memory,
+        copied) once per entry, when the entry is built.
+        """
+        snapshot = f"{self.sql_engine}:{frame_fingerprint(df)}"
+        build = lambda: self._build_agent(self._get_database(state, df), snapshot)
+        with self.agent_pool.checkout(snapshot, build) as (agent_executor, toolkit, build_seconds):
+            db = toolkit.db
+            result = self._replay(db, latest_date)
+            if result is None:
+                result = self._invoke_agent(agent_executor, toolkit, build_seconds, db, ref_context, latest_date)
+            return result
+
+    def _invoke_agent(self, agent_executor, toolkit: CachedSQLDatabaseToolkit, build_seconds: float,
+                      db: SQLDatabase, ref_context: str, latest_date: pd.Timestamp) -> dict:
+        usage = LLMUsageTracker()
+        print(f"[{self.name}] Agent executor: " + (f"built in {build_seconds:.3f}s" if build_seconds else "reused"))
+        print(f"[{self.name}] Calculating Chart Data...")
+        prompt = CHART_CALCULATION_PROMPT.format(
+            data_dictionary=build_data_dictionary(self.sql_engine),
+            reference_context=ref_context,
+            request=REQUEST_CHARTS
+        )
+        
+        start = time.perf_counter()
+        response = agent_executor.invoke({"input": prompt}, config=with_callbacks(usage))
+        data = self._parse_response(response["output"], usage)
+        print(f"[{self.name}] Agent run: {time.perf_counter() - start:.2f}s, {usage}")
+        print(f"[{self.name}] SQL queries: {toolkit.stats}")
+
+        # Compile the run so the next ones can skip the LLM.
+        if self.replay_store is not None and data:
+            self.replay_store.compile(
+                db, self.name, self._template_version(), self.sql_engine,
+                toolkit.executed_sql, data, latest_date, self.sql_guard,
+            )
+        return data
 
-    def _parse_response(self, raw_output: str) -> dict:
+    def _parse_response(self, raw_output: str, usage: LLMUsageTracker) -> dict:
+        """
+        The agent's answer validated against ChartSeries. One that does not
+        match is restated by a schema-constrained call (a counted repair)
+        rather than dropped: raises StructuredOutputError if that fails too.
+        """
         try:
-            match = re.search(r'\{.*\}', raw_output, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            return json.loads(raw_output)
-        except json.JSONDecodeError:
-            print(f"[{self.name}] Failed to parse JSON. Raw: {raw_output[:100]}...")
-            return {}
+            return parse_json_reply(raw_output, ChartSeries).model_dump()
+        except ValidationError as e:
+            print(f"[{self.name}] Answer does not match ChartSeries. Raw: {raw_output[:100]}...")
+            return self._repair_reply(raw_output, ChartSeries, e, config=with_callbacks(usage)).model_dump()
 
     def _normalize_sql_result(self, data_list):
         """
@@ -63,39 +185,10 @@ class ChartCalculatorNode(BaseNode):
                 })
         return normalized
 
-    def _fill_daily_gaps(self, sparse_data: list, end_date: pd.Timestamp) -> list:
-        # 1. Normalize Input Keys
-        clean_data = self._normalize_sql_result(sparse_data)
-        
-        # 2. Build Target Date Range (Strings)
-        # We use strings for reliable dictionary lookups
-        idx = pd.date_range(end=end_date, periods=30, freq='D')
-        date_map = {d.strftime('%Y-%m-%d'): 0 for d in idx}
-        
-        # 3. Map SQL Results to Date Range
-        for item in clean_data:
-            d_str = str(item['date'])[:10] # Ensure YYYY-MM-DD
-            if d_str in date_map:
-                date_map[d_str] = item['count']
-                
-        # 4. Convert back to List[Dict] sorted by date
-        return [{"date": d, "count": c} for d, c in date_map.items()]
-
-    def _fill_monthly_gaps(self, sparse_data: list, end_date: pd.Timestamp) -> list:
-        clean_data = self._normalize_sql_result(sparse_data)
-        
-        # Target: Last 12 months, anchored to start of month
-        start_date = end_date - pd.DateOffset(months=11)
-        idx = pd.date_range(start=start_date, periods=12, freq='MS')
-        date_map = {d.strftime('%Y-%m'): 0 for d in idx}
-        
-        for item in clean_data:
-            # Handle various date formats (2023-01-01 or 2023-01)
-            d_str = str(item['date'])[:7] # YYYY-MM
-            if d_str in date_map:
-                date_map[d_str] += item['count'] # Sum if multiple entries per month
-        
-        return [{"date": d, "count": c} for d, c in date_map.items()]
+    def _fill_gaps(self, name: str, sparse_data: list, end_date: pd.Timestamp) -> list:
+        """Gap-fills the agent's `name` series on the deterministic mode's window (see CHART_SERIES)."""
+        granularity, periods = CHART_SERIES[name]
+        return fill_series(self._normalize_sql_result(sparse_data), granularity, periods, end_date)
 
     def execute(self, state: dict) -> dict:
         key_str = "chart_calc_state"
@@ -115,12 +208,9 @@ class ChartCalculatorNode(BaseNode):
         if not state.get("include_charts", True):
             return output
 
-        # Date Prep
-        df_analysis = df.copy()
-        df_analysis['DT_NOTIFIC'] = pd.to_datetime(df_analysis['DT_NOTIFIC'], errors='coerce')
-        
+        # Time Anchor (computed once by the cleaning stage)
         try:
-            latest_date = df_analysis['DT_NOTIFIC'].max()
+            latest_date = frame_latest_date(df)
             if pd.isna(latest_date): raise ValueError("No dates")
             
             ref_context = REFERENCE_DATE_CONTEXT.format(
@@ -132,27 +222,20 @@ class ChartCalculatorNode(BaseNode):
             latest_date = pd.Timestamp.now()
             ref_context = ""
 
-        # SQL Agent Setup
-        db = self._create_ephemeral_db(df)
-        agent_executor = create_sql_agent(
-            llm=self.llm, db=db, agent_type="openai-tools", verbose=False
-        )
+        # Deterministic fast path: gap-filled series straight from the frame.
+        if self.mode == "deterministic":
+            output[key_str]["chart_data"] = build_chart_data(df, latest_date)
+            print(f"[{self.name}] Charts Data Ready (deterministic).")
+            return output
 
+        # Compiled SQL of an earlier agent run, else the SQL agent
         try:
-            print(f"[{self.name}] Calculating Chart Data...")
-            prompt = CHART_CALCULATION_PROMPT.format(
-                data_dictionary=DATA_DICTIONARY_TEXT,
-                reference_context=ref_context,
-                request=REQUEST_CHARTS
-            )
-            
-            response = agent_executor.invoke({"input": prompt, "system_message": SYSTEM_PROMPT})
-            data = self._parse_response(response["output"])
+            data = self._run_agent(state, df, ref_context, latest_date)
             
             # Post-Processing with robust gap filling
             processed_data = {
-                "daily_cases_30d": self._fill_daily_gaps(data.get('daily_cases_30d', []), latest_date),
-                "monthly_cases_12m": self._fill_monthly_gaps(data.get('monthly_cases_12m', []), latest_date)
+                name: self._fill_gaps(name, data.get(name, []), latest_date)
+                for name in CHART_SERIES
             }
             
             print(f"[{self.name}] Charts Data Ready.")
@@ -13,7 +13,7 @@ REFERENCE_DATE_CONTEXT = """
 """
 
 REQUEST_CHARTS = """
-Retrieve the data points required for charts:
+Retrieve the data points required for charts (from the 'srag_daily' table, summing n_cases):
 1. "daily_cases_30d": List of daily case counts for the "LAST 30 DAYS" window. 
    - GROUP BY day.
    - Keys MUST be: "date" (YYYY-MM-DD), "count" (Int).
@@ -1,5 +1,15 @@
-from typing import TypedDict, Dict, Any
+from typing import TypedDict, Dict, Any, List
 import pandas as pd
+from pydantic import BaseModel, Field
 
 class ChartCalculatorState(TypedDict):
-    chart_data: Dict[str, Any]
\ No newline at end of file
+    chart_data: Dict[str, Any]
+
+class ChartPoint(BaseModel):
+    date: str = Field(description="Day or first day of the month, YYYY-MM-DD")
+    count: int = Field(description="Number of cases")
+
+class ChartSeries(BaseModel):
+    """Chart series of the SQL agent's final answer."""
+    daily_cases_30d: List[ChartPoint] = Field(description="Daily case counts of the last 30 days")
+    monthly_cases_12m: List[ChartPoint] = Field(description="Monthly case counts of the last 12 months")
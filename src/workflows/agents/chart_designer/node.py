@@ -1,8 +1,15 @@
-import uuid
+import hashlib
+import asyncio
 import json
 from src.nodes.base import BaseNode
 from .prompts import SYSTEM_PROMPT, CHART_GENERATION_PROMPT
 
+# Charts of the report: (html key, chart_data key, title, chart type, color)
+CHARTS = (
+    ("daily_30d_html", "daily_cases_30d", "Casos Diários (Últimos 30 Dias)", "bar", "#2E86C1"),
+    ("monthly_12m_html", "monthly_cases_12m", "Evolução Mensal (Últimos 12 Meses)", "line", "#C0392B"),
+)
+
 class ChartDesignerNode(BaseNode):
     def __init__(self, llm):
         # LLM is now REQUIRED
@@ -10,18 +17,16 @@ class ChartDesignerNode(BaseNode):
             raise ValueError("ChartDesignerNode now requires an LLM instance.")
         super().__init__(llm, "ChartDesigner")
 
-    def _generate_chart_snippet(self, data: list, title: str, chart_type: str, color: str) -> str:
-        if not data:
-            return f"<div style='padding:20px; text-align:center'>Sem dados para: {title}</div>"
-
-        # 1. Generate Unique ID to prevent overlap collisions
-        unique_id = f"chart_{uuid.uuid4().hex}"
+    def _chart_prompt(self, data: list, title: str, chart_type: str, color: str) -> str:
+        # 1. Unique ID per chart to prevent overlap collisions. Derived from the
+        # title, so the prompt is stable across runs (cacheable, replayable).
+        unique_id = f"chart_{hashlib.md5(title.encode('utf-8')).hexdigest()[:12]}"
 
         # 2. Prepare Prompt
         # We dump the data to JSON string for the LLM to read
         data_json = json.dumps(data, indent=2)
         
-        user_prompt = CHART_GENERATION_PROMPT.format(
+        return CHART_GENERATION_PROMPT.format(
             title=title,
             chart_type=chart_type,
             div_id=unique_id,
@@ -29,46 +34,60 @@ class ChartDesignerNode(BaseNode):
             data_json=data_json
         )
 
+    def _generate_chart_snippet(self, data: list, title: str, chart_type: str, color: str) -> str:
+        if not data:
+            return f"<div style='padding:20px; text-align:center'>Sem dados para: {title}</div>"
+
         # 3. Invoke LLM
         try:
             print(f"[{self.name}] Asking LLM to generate {chart_type} chart for '{title}'...")
-            response = self._invoke_llm(SYSTEM_PROMPT, user_prompt)
-            
-            # 4. Clean Output (Strip Markdown if present)
-            clean_html = response.replace("```html", "").replace("```", "").strip()
-            
-            return clean_html
+            response = self._invoke_llm(SYSTEM_PROMPT, self._chart_prompt(data, title, chart_type, color))
+            return self._clean_html(response)
+
+        except Exception as e:
+            print(f"[{self.name}] Error generating chart: {e}")
+            return f"<!-- Error generating chart: {e} -->"
+
+    async def _agenerate_chart_snippet(self, data: list, title: str, chart_type: str, color: str) -> str:
+        if not data:
+            return f"<div style='padding:20px; text-align:center'>Sem dados para: {title}</div>"
+
+        try:
+            print(f"[{self.name}] Asking LLM to generate {chart_type} chart for '{title}'...")
+            response = await self._ainvoke_llm(SYSTEM_PROMPT, self._chart_prompt(data, title, chart_type, color))
+            return self._clean_html(response)
 
         except Exception as e:
             print(f"[{self.name}] Error generating chart: {e}")
             return f"<!-- Error generating chart: {e} -->"
 
+    def _clean_html(self, response: str) -> str:
+        # 4. Clean Output (Strip Markdown if present)
+        return response.replace("```html", "").replace("```", "").strip()
+
     def execute(self, state: dict) -> dict:
         chart_data = state['chart_calc_state'].get("chart_data", {})
-        key_str = "chart_plot_state"
-        output = {key_str: {}}
-        charts_html = {}
-        
         print(f"[{self.name}] Generating Visualizations via LLM...")
 
-        # 1. Daily Chart (Bar)
-        charts_html["daily_30d_html"] = self._generate_chart_snippet(
-            data=chart_data.get("daily_cases_30d", []),
-            title="Casos Diários (Últimos 30 Dias)",
-            chart_type="bar",
-            color="#2E86C1"
-        )
+        # 1. Daily Chart (Bar), 2. Monthly Chart (Line)
+        charts_html = {
+            html_key: self._generate_chart_snippet(chart_data.get(data_key, []), title, chart_type, color)
+            for html_key, data_key, title, chart_type, color in CHARTS
+        }
 
-        # 2. Monthly Chart (Line)
-        charts_html["monthly_12m_html"] = self._generate_chart_snippet(
-            data=chart_data.get("monthly_cases_12m", []),
-            title="Evolução Mensal (Últimos 12 Meses)",
-            chart_type="line",
-            color="#C0392B"
-        )
+        print(f"[{self.name}] Charts Generated.")
+        return {"chart_plot_state": {"charts_html": charts_html}}
+
+    async def aexecute(self, state: dict) -> dict:
+        chart_data = state['chart_calc_state'].get("chart_data", {})
+        print(f"[{self.name}] Generating Visualizations via LLM...")
+
+        # Both charts are generated concurrently.
+        snippets = await asyncio.gather(*(
+            self._agenerate_chart_snippet(chart_data.get(data_key, []), title, chart_type, color)
+            for _, data_key, title, chart_type, color in CHARTS
+        ))
+        charts_html = {spec[0]: html for spec, html in zip(CHARTS, snippets)}
 
         print(f"[{self.name}] Charts Generated.")
-        output[key_str]["charts_html"] = charts_html
-        return output
-        # return {key_str: {"charts_html": charts_html}}
-        # return {"charts_html": charts_html}
\ No newline at end of file
+        return {"chart_plot_state": {"charts_html": charts_html}}
@@ -1,41 +1,108 @@
 # src/workflows/agents/intent_agent/nodes.py
 
+import time
 from src.nodes.base import BaseNode
+from internal.structured_output import StructuredOutputError, report_event, areport_event
 from .prompts import INTENT_SYSTEM_PROMPT
-import json
+from .states import IntentFlags
+from .router import IntentRouter
+
+# Custom callback event with each routing decision (see RunTelemetry.events).
+ROUTER_EVENT = "intent_router"
 
 
 class IntentNode(BaseNode):
+    """
+    Sets the routing flags of a request. With a `router`, common requests
+    are routed locally and only the ones it is not confident about cost
+    an LLM call.
+    """
 
-    def __init__(self, llm):
+    def __init__(self, llm, router: IntentRouter = None):
         super().__init__(llm, "IntentClassifier")
+        self.router = router
 
-    def execute(self, state: dict) -> dict:
+    def _user_prompt(self, state: dict):
         user_prompt = state.get("user_prompt")
         print(f"[{self.name}] Analyzing request: '{user_prompt}'")
+        if not user_prompt:
+            print("No user prompt provided. Creating full report.")
+        return user_prompt
+
+    def execute(self, state: dict) -> dict:
+        user_prompt = self._user_prompt(state)
 
         # Fallback for empty prompt -> Full Report
         if not user_prompt:
-            print("No user prompt provided. Creating full report.")
             return {"include_metrics": True, "include_charts": True, "include_news": True}
 
-        response = self._invoke_llm(INTENT_SYSTEM_PROMPT, user_prompt)
+        decision, event = self._local_route(user_prompt)
+        if event is not None:
+            report_event(ROUTER_EVENT, event)
+        if decision is not None:
+            return decision
 
+        start = time.perf_counter()
         try:
-            # Simple cleanup to ensure JSON parsing
-            clean_json = response.replace("```json", "").replace("```", "").strip()
-            flags = json.loads(clean_json)
-
-            if "is_off_topic" not in flags:
-                flags["is_off_topic"] = False
-
-            print(f"[{self.name}] Routing Decision: {flags}")
-            return flags
-        except Exception as e:
-            print(f"[{self.name}] Parsing Error: {e}. Defaulting to FULL report.")
-            return {
-                "include_metrics": True,
-                "include_charts": True,
-                "include_news": True,
-                "is_off_topic": False
-            }
\ No newline at end of file
+            return self._route(self._invoke_structured(INTENT_SYSTEM_PROMPT, user_prompt, IntentFlags))
+        except StructuredOutputError as e:
+            return self._full_report(e)
+        finally:
+            self._record_llm(start)
+
+    async def aexecute(self, state: dict) -> dict:
+        user_prompt = self._user_prompt(state)
+        if not user_prompt:
+            return {"include_metrics": True, "include_charts": True, "include_news": True}
+
+        decision, event = self._local_route(user_prompt)
+        if event is not None:
+            await areport_event(ROUTER_EVENT, event)
+        if decision is not None:
+            return decision
+
+        start = time.perf_counter()
+        try:
+            return self._route(await self._ainvoke_structured(INTENT_SYSTEM_PROMPT, user_prompt, IntentFlags))
+        except StructuredOutputError as e:
+            return self._full_report(e)
+        finally:
+            self._record_llm(start)
+
+    def _local_route(self, user_prompt: str):
+        """(flags or None, router event or None): flags when the router is confident, no LLM call needed."""
+        if self.router is None:
+            return None, None
+        decision = self.router.route(user_prompt)
+        event = {
+            "hit": decision is not None,
+            "layer": decision.layer if decision else None,
+            "confidence": round(decision.confidence, 3) if decision else None,
+            "router": self.router.stats.as_dict(),
+        }
+        if decision is None:
+            print(f"[{self.name}] Router not confident, asking the LLM.")
+            return None, event
+        print(f"[{self.name}] Routed locally ({decision.layer}, confidence {decision.confidence:.2f}), no LLM call.")
+        print(f"[{self.name}] Router: {self.router.stats}")
+        print(f"[{self.name}] Routing Decision: {decision.flags}")
+        return dict(decision.flags), event
+
+    def _record_llm(self, start: float):
+        if self.router is not None:
+            self.router.record_llm(time.perf_counter() - start)
+            print(f"[{self.name}] Router: {self.router.stats}")
+
+    def _route(self, intent: IntentFlags) -> dict:
+        flags = intent.model_dump()
+        print(f"[{self.name}] Routing Decision: {flags}")
+        return flags
+
+    def _full_report(self, error: Exception) -> dict:
+        print(f"[{self.name}] Parsing Error: {error}. Defaulting to FULL report.")
+        return {
+            "include_metrics": True,
+            "include_charts": True,
+            "include_news": True,
+            "is_off_topic": False
+        }
\ No newline at end of file
@@ -0,0 +1,270 @@
+# src/workflows/agents/intent_agent/router.py
+import re
+import time
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    from rank_bm25 import BM25Okapi
+    RANK_BM25_INSTALLED = True
+except ImportError:
+    RANK_BM25_INSTALLED = False
+    BM25Okapi = None
+
+# Below this confidence the IntentClassifier asks the LLM.
+DEFAULT_ROUTER_THRESHOLD = 0.6
+
+# BM25 matches weaker than this are treated as no match at all.
+MIN_BM25_SCORE = 1.0
+
+# Confidence of a request naming sections without saying "only".
+SECTIONS_CONFIDENCE = 0.9
+
+FLAGS = ("include_metrics", "include_charts", "include_news")
+
+SECTION_PATTERNS = {
+    "include_metrics": re.compile(
+        r"\b(metric\w*|kpis?|stats?|statistic\w*|estatistic\w*|numbers?|numeros?|indicador\w*|"
+        r"rates?|taxas?|mortalidade|mortality|letalidade|obitos?|deaths?)\b"
+    ),
+    "include_charts": re.compile(
+        r"\b(charts?|graphs?|graficos?|plots?|visualiza\w*|curvas?|dashboards?)\b"
+    ),
+    "include_news": re.compile(
+        r"\b(news|noticias?|articles?|artigos?|manchetes?|headlines?|imprensa|midia|media)\b"
+    ),
+}
+ONLY_PATTERN = re.compile(r"\b(only|just|solely|somente|apenas|exclusivamente|unicamente)\b")
+# Portuguese "só" ("only"), matched before accents are stripped: "so" is not "only" in English.
+ONLY_PT_PATTERN = re.compile(r"(?<!\w)só(?!\w)")
+FULL_PATTERN = re.compile(
+    r"\b(full|complete|completo|completa|entire|whole|inteiro|geral|tudo|everything|all sections)\b"
+)
+# Negated sections ("sem notícias", "don't include news") are left to the LLM.
+NEGATION_PATTERN = re.compile(
+    r"\b(without|except|excluding|not|nor|dont|don t|doesnt|never|sem|exceto|menos|nao|nem)\b"
+)
+# "no" only negates before a section: in Portuguese it means "in the" ("no Brasil").
+NO_SECTION_PATTERN = re.compile(
+    r"\bno\s+(?:" + "|".join(pattern.pattern for pattern in SECTION_PATTERNS.values()) + ")"
+)
+REPORT_PATTERN = re.compile(r"\b(reports?|relatorios?|boletim|resumo|summary|overview|panorama|status|situacao)\b")
+# Any of these makes a request on-topic, whatever BM25 says.
+DOMAIN_PATTERN = re.compile(
+    r"\b(srag|sars|covid\w*|corona\w*|influenza|gripe|flu|virus|respirat\w*|epidemi\w*|surtos?|outbreaks?|"
+    r"saude|health|hospita\w*|uti|icu|vacin\w*|vaccin\w*|casos?|cases?|pacientes?|patients?|obitos?|deaths?|"
+    r"mortal\w*|letalidade|sindrome|syndrome)\b"
+)
+
+# Function words (EN/PT) left out of BM25, so that matches hinge on content words.
+STOPWORDS = frozenset(
+    "a an the of in on at to for and or with about me my i is are was what how why which who "
+    "give show tell please o os as um uma de da do das dos em no na nos nas para por com e ou "
+    "sobre que qual quais como me meu minha".split()
+)
+
+# Labeled prompts for the BM25 layer, in English and Portuguese.
+# Labels name the sections included; "off_topic" marks unrelated requests.
+ROUTER_EXAMPLES = [
+    ("create a full report", "full"),
+    ("generate the complete SRAG report", "full"),
+    ("status of SRAG in Brazil", "full"),
+    ("current SARS situation in Brazil", "full"),
+    ("how is covid and influenza doing in brazil this month", "full"),
+    ("give me an overview of severe acute respiratory syndrome", "full"),
+    ("relatorio completo de SRAG", "full"),
+    ("status da SRAG no Brasil", "full"),
+    ("como esta a situacao da sindrome respiratoria aguda grave", "full"),
+    ("panorama epidemiologico de srag covid e influenza", "full"),
+    ("what are the mortality and icu rates", "metrics"),
+    ("give me the key numbers and statistics", "metrics"),
+    ("vaccination rate and death rate of srag patients", "metrics"),
+    ("how many cases increased in the last 30 days percentage", "metrics"),
+    ("quais sao as taxas de mortalidade e uti", "metrics"),
+    ("me mostre os indicadores e estatisticas de srag", "metrics"),
+    ("qual a taxa de vacinacao e de obitos", "metrics"),
+    ("show me the charts of daily cases", "charts"),
+    ("plot the monthly trend of cases", "charts"),
+    ("visualize the evolution of srag cases over time", "charts"),
+    ("mostre os graficos de casos diarios", "charts"),
+    ("grafico da evolucao mensal de casos", "charts"),
+    ("latest news about srag outbreaks", "news"),
+    ("what is happening in the news about covid and flu", "news"),
+    ("why are cases rising explain with news context", "news"),
+    ("noticias recentes sobre surtos de srag", "news"),
+    ("o que a imprensa diz sobre a campanha de vacinacao", "news"),
+    ("contexto das noticias sobre hospitais lotados", "news"),
+    ("rates and charts without news", "metrics+charts"),
+    ("taxas e graficos sem noticias", "metrics+charts"),
+    ("mortality rate and the latest news", "metrics+news"),
+    ("taxa de mortalidade e noticias recentes", "metrics+news"),
+    ("charts and news of the last month", "charts+news"),
+    ("graficos e noticias do ultimo mes", "charts+news"),
+    ("who won the world cup", "off_topic"),
+    ("tell me a joke", "off_topic"),
+    ("write python code to sort a list", "off_topic"),
+    ("what is the weather tomorrow", "off_topic"),
+    ("recommend a good movie", "off_topic"),
+    ("quem ganhou a copa do mundo", "off_topic"),
+    ("me conte uma piada", "off_topic"),
+    ("receita de bolo de chocolate", "off_topic"),
+    ("qual a cotacao do dolar hoje", "off_topic"),
+]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, accent- and apostrophe-free text (so "notícias"/"noticias" and "don't"/"dont" match alike)."""
+    text = unicodedata.normalize("NFKD", re.sub(r"['’`]", "", text.lower()))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list:
+    return [token for token in re.findall(r"[a-z0-9]+", normalize(text)) if token not in STOPWORDS]
+
+
+def _on_topic(text: str) -> bool:
+    """Whether normalized `text` names the domain or a report."""
+    return DOMAIN_PATTERN.search(text) is not None or REPORT_PATTERN.search(text) is not None
+
+
+def label_flags(label: str) -> dict:
+    """Routing flags of an example label ("full", "metrics+news", "off_topic", ...)."""
+    if label in ("full", "off_topic"):
+        # Off-topic requests still get a standard report (see INTENT_SYSTEM_PROMPT).
+        flags = {flag: True for flag in FLAGS}
+    else:
+        sections = set(label.split("+"))
+        flags = {flag: flag.split("_", 1)[1] in sections for flag in FLAGS}
+    flags["is_off_topic"] = label == "off_topic"
+    return flags
+
+
+@dataclass
+class RouteDecision:
+    flags: dict
+    confidence: float
+    layer: str      # "keyword" or "bm25"
+
+
+@dataclass
+class RouterStats:
+    hits: int = 0
+    deferred: int = 0               # requests left to the LLM
+    route_seconds: float = 0.0      # time spent routing locally
+    llm_seconds: float = 0.0        # time the deferred LLM classifications took
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.deferred
+        return self.hits / total if total else 0.0
+
+    @property
+    def saved_seconds(self) -> Optional[float]:
+        """Estimated LLM time the hits saved (mean deferred call x hits), None before any LLM call."""
+        if not self.deferred:
+            return None
+        return self.hits * self.llm_seconds / self.deferred
+
+    def as_dict(self) -> dict:
+        saved = self.saved_seconds
+        return {
+            "hits": self.hits,
+            "deferred": self.deferred,
+            "hit_rate": round(self.hit_rate, 3),
+            "route_seconds": round(self.route_seconds, 4),
+            "estimated_saved_seconds": round(saved, 3) if saved is not None else None,
+        }
+
+    def __str__(self):
+        saved = self.saved_seconds
+        return (
+            f"{self.hits} local hit(s), {self.deferred} deferred to the LLM ({self.hit_rate:.0%} hit rate), "
+            + (f"~{saved:.2f}s LLM time saved" if saved is not None else "LLM time saved unknown yet")
+        )
+
+
+class IntentRouter:
+    """
+    Routes common requests without an LLM call. Two layers:
+    - keywords: "only <sections>" and full-report requests (confidence
+      1.0), other requests naming sections (SECTIONS_CONFIDENCE)
+    - BM25 over ROUTER_EXAMPLES for the rest: the best label, with the
+      share of its score against the runner-up label as confidence
+    Both layers only route on-topic requests (a domain or report word)
+    to sections; anything else is off-topic by BM25 or left to the LLM.
+    `route` returns None when neither reaches `threshold`, or for negated
+    requests ("sem notícias"): the caller then asks the LLM (and reports
+    its latency through `record_llm`).
+    """
+
+    def __init__(self, threshold: float = DEFAULT_ROUTER_THRESHOLD, examples: list = None):
+        self.threshold = threshold
+        self.examples = examples or ROUTER_EXAMPLES
+        self.stats = RouterStats()
+        self._lock = threading.Lock()
+        self._bm25 = BM25Okapi([tokenize(prompt) for prompt, _ in self.examples]) if RANK_BM25_INSTALLED else None
+
+    def _keyword_route(self, text: str, only: bool) -> Optional[RouteDecision]:
+        if not _on_topic(text):
+            # "numbers", "rates", "charts" also fit unrelated requests.
+            return None
+        sections = {flag for flag, pattern in SECTION_PATTERNS.items() if pattern.search(text)}
+        if sections and only:
+            return RouteDecision(self._section_flags(sections), 1.0, "keyword")
+        if FULL_PATTERN.search(text) and REPORT_PATTERN.search(text):
+            return RouteDecision(label_flags("full"), 1.0, "keyword")
+        if sections:
+            # Sections named without "only": most likely just those.
+            return RouteDecision(self._section_flags(sections), SECTIONS_CONFIDENCE, "keyword")
+        return None
+
+    @staticmethod
+    def _section_flags(sections: set) -> dict:
+        flags = {flag: flag in sections for flag in FLAGS}
+        flags["is_off_topic"] = False
+        return flags
+
+    def _bm25_route(self, text: str) -> Optional[RouteDecision]:
+        if self._bm25 is None:
+            return None
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        best = {}
+        on_topic = _on_topic(text)
+        for (_, label), score in zip(self.examples, self._bm25.get_scores(tokens)):
+            if on_topic and label == "off_topic":
+                continue
+            best[label] = max(best.get(label, 0.0), float(score))
+        if not best:
+            return None
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        label, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if top < MIN_BM25_SCORE or (not on_topic and label != "off_topic"):
+            return None
+        return RouteDecision(label_flags(label), top / (top + max(runner_up, 0.0)), "bm25")
+
+    def route(self, prompt: str) -> Optional[RouteDecision]:
+        start = time.perf_counter()
+        text = normalize(prompt or "")
+        only = ONLY_PATTERN.search(text) is not None or ONLY_PT_PATTERN.search((prompt or "").lower()) is not None
+        decision = None
+        if not (NEGATION_PATTERN.search(text) or NO_SECTION_PATTERN.search(text)):
+            decision = self._keyword_route(text, only) or self._bm25_route(text)
+        if decision is not None and decision.confidence < self.threshold:
+            decision = None
+        with self._lock:
+            self.stats.route_seconds += time.perf_counter() - start
+            if decision is not None:
+                self.stats.hits += 1
+            else:
+                self.stats.deferred += 1
+        return decision
+
+    def record_llm(self, seconds: float):
+        """Latency of an LLM classification the router deferred to."""
+        with self._lock:
+            self.stats.llm_seconds += seconds
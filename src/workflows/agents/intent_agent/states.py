@@ -0,0 +1,9 @@
+# src/workflows/agents/intent_agent/states.py
+from pydantic import BaseModel, Field
+
+class IntentFlags(BaseModel):
+    """Routing decision of the IntentClassifier (structured LLM reply)."""
+    include_metrics: bool = Field(description="User wants stats, rates or a full report")
+    include_charts: bool = Field(description="User wants charts, plots or a full report")
+    include_news: bool = Field(description="User wants news, context or a full report")
+    is_off_topic: bool = Field(description="Request unrelated to SARS/SRAG, COVID, influenza, health or epidemiology")
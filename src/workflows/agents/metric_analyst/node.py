@@ -1,12 +1,25 @@
-import json
-import re
+import os
+import time
 import pandas as pd
+from pydantic import ValidationError
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 
 from src.nodes.base import BaseNode 
-from src.domain.sars.schema_context import DATA_DICTIONARY_TEXT
+from src.domain.sars.schema_context import build_data_dictionary
+from src.domain.sars.cleaning import latest_date as frame_latest_date
+from src.domain.sars.metrics_engine import compute_metrics, INCREASE_WINDOW_DAYS
+from internal.data_retrieval.analytics_db import open_analytics_db, write_analytics_tables, frame_fingerprint
+from internal.data_retrieval.query_cache import CachedSQLDatabaseToolkit
+from internal.data_retrieval.sql_replay import template_version
+from internal.data_retrieval.sql_guard import SQLGuard
+from internal.data_retrieval.sql_engines import open_duckdb_frame
+from internal.data_retrieval.schema_cache import sql_agent_prompt, DEFAULT_SAMPLE_ROWS
+from internal.data_retrieval.agent_pool import SQLAgentPool
+from internal.llm_usage import LLMUsageTracker, with_callbacks
+from internal.structured_output import parse_json_reply
 
 from .prompts import (
     SYSTEM_PROMPT, 
@@ -14,40 +27,98 @@ from .prompts import (
     REQUEST_METRICS, 
     REFERENCE_DATE_CONTEXT
 )
+from .states import MetricsResult
+
+METRICS_MODES = ("deterministic", "agent", "crosscheck")
+
+# Percentage points an agent KPI may differ from the deterministic one.
+CROSSCHECK_TOLERANCE = 0.5
 
 class MetricsAnalystNode(BaseNode):
-    def __init__(self, llm):
+    """
+    Computes the report KPIs. `mode`:
+    - "deterministic": metrics engine over the frame, no LLM (milliseconds)
+    - "agent": LLM SQL agent (or its compiled SQL, see SQLReplayStore)
+    - "crosscheck": both; the deterministic values are reported and any
+      disagreement of the agent is logged
+
+    `analysis_window_days` is the data lookback the frame was loaded with
+    (None: all available data). Every metric covers that window only, so
+    it is reported next to `total_cases_analyzed`.
+    """
+    def __init__(self, llm, sql_engine: str = "sqlite", query_cache=None, mode: str = "deterministic", replay_store=None,
+                 sql_guard: SQLGuard = None, schema_sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                 analysis_window_days: int = None):
         super().__init__(llm, "MetricsAnalyst")
+        if mode not in METRICS_MODES:
+            raise ValueError(f"Unknown metrics mode '{mode}'. Use one of {METRICS_MODES}.")
+        self.sql_engine = sql_engine
+        self.query_cache = query_cache
+        self.mode = mode
+        self.replay_store = replay_store
+        self.sql_guard = sql_guard or SQLGuard()
+        self.schema_sample_rows = schema_sample_rows
+        self.analysis_window_days = analysis_window_days
+        # Executors are built once per data snapshot and reused across runs.
+        self.agent_pool = SQLAgentPool(self.name)
 
     def _create_ephemeral_db(self, df: pd.DataFrame) -> SQLDatabase:
-        engine = create_engine("sqlite:///:memory:")
-        df.to_sql("srag_records", engine, index=False, if_exists='replace')
-        return SQLDatabase(engine=engine)
+        # One shared connection, usable from any thread: pooled executors
+        # built on this DB may serve later runs on other threads.
+        engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        # srag_records + srag_daily, dates as ISO strings (see DATA_DICTIONARY_TEXT)
+        write_analytics_tables(df, engine)
+        return SQLDatabase(engine=engine, sample_rows_in_table_info=self.schema_sample_rows)
+
+    def _get_database(self, state: dict, df: pd.DataFrame) -> SQLDatabase:
+        """
+        With sql_engine='duckdb', DuckDB over the columnar frame. Otherwise the
+        shared analytics DB built at load time when available (indexed,
+        read-only, pooled), or an in-memory copy of `df`.
+        """
+        if self.sql_engine == "duckdb":
+            return open_duckdb_frame(df, self.schema_sample_rows)
+
+        db_path = state.get("analytics_db_path")
+        if db_path and os.path.exists(db_path):
+            return open_analytics_db(db_path, self.schema_sample_rows)
+        return self._create_ephemeral_db(df)
 
-    def _parse_response(self, raw_output: str) -> dict:
+    def _get_toolkit(self, db: SQLDatabase, snapshot: str) -> CachedSQLDatabaseToolkit:
+        """
+        SQL tools behind the guard, with results (if a cache is set) and the
+        schema description cached per data snapshot.
+        """
+        return CachedSQLDatabaseToolkit(
+            db=db, llm=self.llm, cache=self.query_cache, guard=self.sql_guard,
+            snapshot=snapshot if self.query_cache else "", schema_key=f"{snapshot}:{self.schema_sample_rows}",
+            # Statements are only recorded for the replay store to compile.
+            executed_sql=[] if self.replay_store is not None else None,
+        )
+
+    def _parse_response(self, raw_output: str, usage: LLMUsageTracker) -> dict:
+        """
+        The agent's answer validated against MetricsResult. One that does not
+        match is restated by a schema-constrained call (a counted repair)
+        rather than dropped: raises StructuredOutputError if that fails too.
+        """
         try:
-            match = re.search(r'\{.*\}', raw_output, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            return json.loads(raw_output)
-        except json.JSONDecodeError:
-            print(f"[{self.name}] Failed to parse JSON: {raw_output[:50]}...")
-            return {}
+            return parse_json_reply(raw_output, MetricsResult).model_dump()
+        except ValidationError as e:
+            print(f"[{self.name}] Answer does not match MetricsResult: {raw_output[:50]}...")
+            return self._repair_reply(raw_output, MetricsResult, e, config=with_callbacks(usage)).model_dump()
 
     def _sanitize_metrics(self, metrics: dict) -> dict:
         """
         Post-processing to ensure data quality for the report.
-        Handles None values and scaling issues (0.12 vs 12.0).
+        Handles scaling issues (0.12 vs 12.0). None means "not available"
+        and is kept as is; the report renders it as n/a, never as 0%.
         """
         cleaned = {}
         # Metrics that are definitely 0-100 percentages
         percentage_keys = ["mortality_rate", "icu_rate", "vaccination_rate"]
         
         for k, v in metrics.items():
-            if v is None:
-                cleaned[k] = 0.0
-                continue
-                
             if isinstance(v, (int, float)):
                 # Heuristic: If a known percentage metric is <= 1.0, 
                 # the LLM likely returned a ratio (0.12) instead of % (12.0).
@@ -61,6 +132,85 @@ class MetricsAnalystNode(BaseNode):
                 
         return cleaned
 
+    def _template_version(self) -> str:
+        return template_version(
+            SYSTEM_PROMPT, METRICS_CALCULATION_PROMPT, REQUEST_METRICS, REFERENCE_DATE_CONTEXT,
+            build_data_dictionary(self.sql_engine),
+        )
+
+    def _replay(self, db: SQLDatabase, latest_date: pd.Timestamp):
+        if self.replay_store is None:
+            return None
+        return self.replay_store.replay(db, self.name, self._template_version(), self.sql_engine, latest_date, self.sql_guard)
+
+    def _build_agent(self, db: SQLDatabase, snapshot: str):
+        toolkit = self._get_toolkit(db, snapshot)
+        # The schema is in the prompt, so the agent starts with its query.
+        agent_executor = create_sql_agent(
+            llm=self.llm,
+            toolkit=toolkit,
+            agent_type="openai-tools",
+            prompt=sql_agent_prompt(SYSTEM_PROMPT),
+            verbose=False 
+        )
+        return agent_executor, toolkit
+
+    def _run_agent(self, state: dict, df: pd.DataFrame, ref_context: str, latest_date: pd.Timestamp) -> dict:
+        """
+        Compiled SQL of an earlier agent run, else the agent itself, both on
+        the DB of the checked-out pool entry: it is opened (or, in-memory,
+        copied) once per entry, when the entry is built.
+        """
+        snapshot = f"{self.sql_engine}:{frame_fingerprint(df)}"
+        build = lambda: self._build_agent(self._get_database(state, df), snapshot)
+        with self.agent_pool.checkout(snapshot, build) as (agent_executor, toolkit, build_seconds):
+            db = toolkit.db
+            result = self._replay(db, latest_date)
+            if result is None:
+                result = self._invoke_agent(agent_executor, toolkit, build_seconds, db, ref_context, latest_date)
+            return result
+
+    def _invoke_agent(self, agent_executor, toolkit: CachedSQLDatabaseToolkit, build_seconds: float,
+                      db: SQLDatabase, ref_context: str, latest_date: pd.Timestamp) -> dict:
+        usage = LLMUsageTracker()
+        print(f"[{self.name}] Agent executor: " + (f"built in {build_seconds:.3f}s" if build_seconds else "reused"))
+        print(f"[{self.name}] Executing SQL Agent...")
+        
+        user_prompt = METRICS_CALCULATION_PROMPT.format(
+            data_dictionary=build_data_dictionary(self.sql_engine),
+            reference_context=ref_context,
+            request=REQUEST_METRICS
+        )
+        
+        start = time.perf_counter()
+        response = agent_executor.invoke({"input": user_prompt}, config=with_callbacks(usage))
+        raw_metrics = self._parse_response(response["output"], usage)
+        print(f"[{self.name}] Agent run: {time.perf_counter() - start:.2f}s, {usage}")
+        print(f"[{self.name}] SQL queries: {toolkit.stats}")
+
+        # Compile the run so the next ones can skip the LLM.
+        if self.replay_store is not None and raw_metrics:
+            self.replay_store.compile(
+                db, self.name, self._template_version(), self.sql_engine,
+                toolkit.executed_sql, raw_metrics, latest_date, self.sql_guard,
+            )
+        return raw_metrics
+
+    def _coverage(self, df: pd.DataFrame) -> dict:
+        return {"total_cases_analyzed": len(df), "analysis_window_days": self.analysis_window_days}
+
+    def _crosscheck(self, agent_metrics: dict, metrics: dict) -> dict:
+        """Logs every KPI where the agent disagrees with the metrics engine."""
+        mismatches = 0
+        for key, expected in metrics.items():
+            got = agent_metrics.get(key)
+            if not isinstance(got, (int, float)) or abs(got - expected) > CROSSCHECK_TOLERANCE:
+                mismatches += 1
+                print(f"[{self.name}] Crosscheck mismatch on {key}: agent={got}, deterministic={expected}")
+        if not mismatches:
+            print(f"[{self.name}] Crosscheck OK: agent matches the deterministic metrics.")
+        return dict(metrics)
+
     def execute(self, state: dict) -> dict:
         key_str = "metrics_state"
         output = {key_str: {}}
@@ -77,17 +227,14 @@ class MetricsAnalystNode(BaseNode):
             print(f"[{self.name}] Warning: DataFrame is empty.")
             return output
 
-        # Ensure DT_NOTIFIC is datetime
-        df_analysis = df.copy()
-        df_analysis['DT_NOTIFIC'] = pd.to_datetime(df_analysis['DT_NOTIFIC'], errors='coerce')
-        
-        # 1. Determine Time Anchor
+        # 1. Determine Time Anchor (computed once by the cleaning stage)
         try:
-            latest_date = df_analysis['DT_NOTIFIC'].max()
+            latest_date = frame_latest_date(df)
             if pd.isna(latest_date):
                 raise ValueError("No valid dates found")
             
-            date_30d_ago = latest_date - pd.Timedelta(days=30)
+            # First day of the 30-day window, as the metrics engine counts it.
+            date_30d_ago = latest_date - pd.Timedelta(days=INCREASE_WINDOW_DAYS - 1)
             
             ref_context = REFERENCE_DATE_CONTEXT.format(
                 reference_date=latest_date.strftime('%Y-%m-%d'),
@@ -103,40 +250,34 @@ class MetricsAnalystNode(BaseNode):
             print(f"[{self.name}] Skipped (Metrics disabled).")
             return output
 
-        # 3. Setup & Execute Agent
-        db = self._create_ephemeral_db(df) 
-        agent_executor = create_sql_agent(
-            llm=self.llm,
-            db=db,
-            agent_type="openai-tools",
-            verbose=False 
-        )
+        # 3. Deterministic fast path: the KPIs have fixed formulas.
+        if self.mode == "deterministic":
+            metrics = compute_metrics(df, latest_date)
+            metrics.update(self._coverage(df))
+            print(f"[{self.name}] Metrics Calculated (deterministic): {metrics}")
+            output[key_str] = metrics
+            return output
 
+        # 4. Compiled SQL of an earlier agent run, else the agent itself
         try:
-            print(f"[{self.name}] Executing SQL Agent...")
-            
-            user_prompt = METRICS_CALCULATION_PROMPT.format(
-                data_dictionary=DATA_DICTIONARY_TEXT,
-                reference_context=ref_context,
-                request=REQUEST_METRICS
-            )
-            
-            response = agent_executor.invoke({
-                "input": user_prompt, 
-                "system_message": SYSTEM_PROMPT
-            })
-            
-            raw_metrics = self._parse_response(response["output"])
-            
-            # 4. Sanitize Results
-            metrics = self._sanitize_metrics(raw_metrics)
-            metrics["total_cases_analyzed"] = len(df)
+            raw_metrics = self._run_agent(state, df, ref_context, latest_date)
 
-            print(f"[{self.name}] Metrics Calculated: {metrics}")
-            output[key_str] = metrics
-            return output
+            # 5. Sanitize Results
+            metrics = self._sanitize_metrics(raw_metrics)
 
         except Exception as e:
             print(f"[{self.name}] Error: {e}")
-            output[key_str] = {"error": str(e)}
-            return output
\ No newline at end of file
+            if self.mode != "crosscheck":
+                output[key_str] = {"error": str(e)}
+                return output
+            metrics = {}
+
+        # 6. Crosscheck: the deterministic values are reported, the agent's
+        # are compared against them.
+        if self.mode == "crosscheck":
+            metrics = self._crosscheck(metrics, compute_metrics(df, latest_date))
+
+        metrics.update(self._coverage(df))
+        print(f"[{self.name}] Metrics Calculated: {metrics}")
+        output[key_str] = metrics
+        return output
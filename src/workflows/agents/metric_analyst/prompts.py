@@ -5,7 +5,7 @@ You are an expert SQL Data Analyst specialized in Epidemiology.
 You are analyzing the Brazilian SRAG (Severe Acute Respiratory Syndrome) database.
 Your job is to generate precise SQL queries to calculate metrics requested by the user.
 
-You have access to an in-memory SQLite database with the table 'srag_records'.
+You have access to a SQL database with the tables 'srag_daily' and 'srag_records'.
 """
 
 REFERENCE_DATE_CONTEXT = """
@@ -20,10 +20,13 @@ Calculate the following aggregate metrics.
 **IMPORTANT:** Return all rates as **PERCENTAGES (0-100)**, not ratios (0-1).
 (e.g., if the ratio is 0.12, return 12.0).
 
-1. "mortality_rate": (Count(EVOLUCAO=2) * 100.0) / Count(EVOLUCAO IN (1, 2, 3)).
-2. "icu_rate": (Count(UTI=1) * 100.0) / Count(UTI IN (1, 2)).
-3. "vaccination_rate": (Count(VACINA=1) * 100.0) / Count(VACINA IN (1, 2)).
+Compute them all from the 'srag_daily' table (a single query is enough).
+
+1. "mortality_rate": SUM(n_deaths) * 100.0 / SUM(n_closed).
+2. "icu_rate": SUM(n_icu) * 100.0 / SUM(n_icu_known).
+3. "vaccination_rate": SUM(n_vac) * 100.0 / SUM(n_vac_known).
 4. "increase_rate": Percentage growth of cases in the "LAST 30 DAYS" vs the "PREVIOUS 30 DAYS".
+   - Current_Count / Previous_Count: SUM(n_cases) over each window's dates.
    - Formula: ((Current_Count - Previous_Count) * 100.0) / Previous_Count.
    - If Previous_Count is 0, return 0.0.
 """
@@ -1,7 +1,15 @@
 # src/workflows/agents/metric_analyst_llm/states.py
 
-from typing import TypedDict
+from typing import TypedDict, Optional
 import pandas as pd
+from pydantic import BaseModel, Field
 
 class Metrics(TypedDict):
     metrics: dict
+
+class MetricsResult(BaseModel):
+    """KPIs of the SQL agent's final answer, as percentages (0-100); null when not available."""
+    mortality_rate: Optional[float] = Field(description="Deaths over closed cases, %")
+    icu_rate: Optional[float] = Field(description="ICU admissions over cases with known ICU status, %")
+    vaccination_rate: Optional[float] = Field(description="Vaccinated over cases with known vaccination status, %")
+    increase_rate: Optional[float] = Field(description="Growth of cases in the last 30 days vs the previous 30 days, %")
@@ -6,22 +6,56 @@ from tools.web_search_tool import create_search_tool
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SEARCH_QUERY = "SRAG Brasil surto casos recentes vacinação"
+
 class NewsResearcherNode(BaseNode):
-    def __init__(self, llm):
+    def __init__(self, llm, search_tool=None):
         super().__init__(llm, "NewsResearcher")
-        self.search_tool = create_search_tool()
-
-    def execute(self, state: dict) -> dict:
-        output = {"news_state": {}}
+        self.search_tool = search_tool or create_search_tool()
 
-        # --- SAFEGUARD: SHORT CIRCUIT ---
-        if state.get("is_off_topic", False):
-            print(f"[{self.name}] 🛡️ Safeguard triggered: Off-topic prompt. Skipping Search.")
-            output["news_state"] = {
+    def _off_topic_output(self) -> dict:
+        print(f"[{self.name}] 🛡️ Safeguard triggered: Off-topic prompt. Skipping Search.")
+        return {
+            "news_state": {
                 "news_snippets": [],
                 "news_analysis": "Skipped due to off-topic request."
             }
-            return output
+        }
+
+    def _parse_results(self, raw_output) -> list:
+        # 3. Parse Output
+        try:
+            if isinstance(raw_output, str):
+                news_list = json.loads(raw_output)
+            else:
+                news_list = raw_output
+            
+            # Normalize to List[Dict]
+            if isinstance(news_list, dict):
+                news_list = [news_list]
+            elif not isinstance(news_list, list):
+                news_list = [{"title": "Search Result", "url": "#", "content": str(raw_output)}]
+                
+        except json.JSONDecodeError:
+            logger.warning("News tool returned non-JSON string. Wrapping raw content.")
+            news_list = [{"title": "Raw Search Output", "url": "#", "content": str(raw_output)}]
+        return news_list
+
+    def _output(self, news_list: list) -> dict:
+        print(f"[{self.name}] Retrieved {len(news_list)} snippets.")
+        
+        # 4. Update State
+        return {
+            "news_state": {
+                "news_snippets": news_list,
+                "news_analysis": json.dumps(news_list, indent=2)
+            }
+        }
+
+    def execute(self, state: dict) -> dict:
+        # --- SAFEGUARD: SHORT CIRCUIT ---
+        if state.get("is_off_topic", False):
+            return self._off_topic_output()
 
         # 1. Generate Targeted Search Query
         # We ask the LLM to formulate the best query for "current situation"
@@ -29,40 +63,36 @@ class NewsResearcherNode(BaseNode):
             search_query = self._invoke_llm(SYSTEM_PROMPT, SEARCH_QUERY_PROMPT).strip().replace('"', '')
         except Exception as e:
             logger.warning(f"LLM Query Generation failed: {e}. Using default.")
-            search_query = "SRAG Brasil surto casos recentes vacinação"
+            search_query = DEFAULT_SEARCH_QUERY
 
         print(f"[{self.name}] Executing Search for: '{search_query}'")
         
         # 2. Execute Search (Tool Step)
         try:
-            raw_output = self.search_tool.invoke(search_query)
-            
-            # 3. Parse Output
-            try:
-                if isinstance(raw_output, str):
-                    news_list = json.loads(raw_output)
-                else:
-                    news_list = raw_output
-                
-                # Normalize to List[Dict]
-                if isinstance(news_list, dict):
-                    news_list = [news_list]
-                elif not isinstance(news_list, list):
-                    news_list = [{"title": "Search Result", "url": "#", "content": str(raw_output)}]
-                    
-            except json.JSONDecodeError:
-                logger.warning("News tool returned non-JSON string. Wrapping raw content.")
-                news_list = [{"title": "Raw Search Output", "url": "#", "content": str(raw_output)}]
-                
+            news_list = self._parse_results(self.search_tool.invoke(search_query))
         except Exception as e:
             logger.error(f"Search Tool Execution Failed: {e}")
             news_list = [{"title": "Error", "url": "#", "content": f"Search failed: {str(e)}"}]
 
-        print(f"[{self.name}] Retrieved {len(news_list)} snippets.")
-        
-        # 4. Update State
-        output["news_state"] = {
-            "news_snippets": news_list,
-            "news_analysis": json.dumps(news_list, indent=2)
-        }
-        return output
\ No newline at end of file
+        return self._output(news_list)
+
+    async def aexecute(self, state: dict) -> dict:
+        if state.get("is_off_topic", False):
+            return self._off_topic_output()
+
+        try:
+            search_query = (await self._ainvoke_llm(SYSTEM_PROMPT, SEARCH_QUERY_PROMPT)).strip().replace('"', '')
+        except Exception as e:
+            logger.warning(f"LLM Query Generation failed: {e}. Using default.")
+            search_query = DEFAULT_SEARCH_QUERY
+
+        print(f"[{self.name}] Executing Search for: '{search_query}'")
+
+        # Tools without a native async search run in a worker thread.
+        try:
+            news_list = self._parse_results(await self.search_tool.ainvoke(search_query))
+        except Exception as e:
+            logger.error(f"Search Tool Execution Failed: {e}")
+            news_list = [{"title": "Error", "url": "#", "content": f"Search failed: {str(e)}"}]
+
+        return self._output(news_list)
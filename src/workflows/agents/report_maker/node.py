@@ -66,7 +66,7 @@ class ReportMakerNode(BaseNode):
         
         # 1. Retrieve Data
         metrics = state.get("metrics_state", {})
-        charts = state['chart_plot_state'].get("charts_html", {})
+        charts = state.get("chart_plot_state", {}).get("charts_html", {})
         news = state.get("news_state", {}).get("news_snippets", [])
         synthesis = state.get("synthesis_state", {}).get("synthesis_result", {})
 
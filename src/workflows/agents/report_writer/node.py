@@ -1,6 +1,12 @@
 from src.nodes.base import BaseNode
+from src.domain.sars.metrics_engine import describe_window
 from .prompts import WRITER_SYSTEM_PROMPT, WRITER_USER_PROMPT
 
+def _pct(value) -> str:
+    # None is a KPI the data cannot support, not a zero.
+    return "n/a" if value is None else f"{value}%"
+
+
 class ReportWriterNode(BaseNode):
     def __init__(self, llm):
         super().__init__(llm, "ReportWriter")
@@ -11,10 +17,12 @@ class ReportWriterNode(BaseNode):
         
         # Prepare Prompt
         prompt = WRITER_USER_PROMPT.format(
-            increase_rate=metrics.get('increase_rate'),
-            mortality_rate=metrics.get('mortality_rate'),
-            icu_rate=metrics.get('icu_rate'),
-            vac_rate=metrics.get('vaccination_rate'),
+            increase_rate=_pct(metrics.get('increase_rate')),
+            mortality_rate=_pct(metrics.get('mortality_rate')),
+            icu_rate=_pct(metrics.get('icu_rate')),
+            vac_rate=_pct(metrics.get('vaccination_rate')),
+            total_cases=metrics.get('total_cases_analyzed', 'n/a'),
+            analysis_window=describe_window(metrics.get('analysis_window_days')),
             news_analysis=news
         )
         
@@ -8,10 +8,11 @@ WRITER_USER_PROMPT = """
 Please generate a Markdown report based on the following data.
 
 ## 1. Key Metrics
-- Rate of Increase: {increase_rate}%
-- Mortality Rate: {mortality_rate}%
-- ICU Occupancy: {icu_rate}%
-- Vaccination Rate: {vac_rate}%
+- Rate of Increase: {increase_rate}
+- Mortality Rate: {mortality_rate}
+- ICU Occupancy: {icu_rate}
+- Vaccination Rate: {vac_rate}
+- Cases Analyzed: {total_cases} ({analysis_window}; every metric covers this window only)
 
 ## 2. Contextual Analysis (From News)
 {news_analysis}
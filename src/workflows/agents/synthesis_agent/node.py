@@ -1,7 +1,7 @@
-import json
-import re
 from src.nodes.base import BaseNode
+from src.domain.sars.metrics_engine import describe_window
 from .prompts import SYSTEM_PROMPT, ANALYSIS_PROMPT
+from .states import SynthesisResult
 
 class SynthesisNode(BaseNode):
     def __init__(self, llm):
@@ -9,7 +9,12 @@ class SynthesisNode(BaseNode):
 
     def _format_metrics(self, metrics: dict) -> str:
         if not metrics: return "No metrics available."
-        return "\n".join([f"- {k}: {v}" for k, v in metrics.items()])
+        lines = []
+        for k, v in metrics.items():
+            if k == "analysis_window_days":
+                v = describe_window(v)
+            lines.append(f"- {k}: {'n/a' if v is None else v}")
+        return "\n".join(lines)
 
     def _format_news(self, news: list) -> str:
         if not news: return "No news available."
@@ -17,7 +22,8 @@ class SynthesisNode(BaseNode):
 
     def _format_chart_summary(self, chart_data: dict) -> str:
         # Provide the LLM with a text summary of the visual data so it can analyze the trend
-        daily = chart_data['chart_data'].get('daily_cases_30d', [])
+        # No 'chart_data' when the request skipped the charts branch
+        daily = chart_data.get('chart_data', {}).get('daily_cases_30d', [])
         if not daily: return "No trend data."
         
         start = daily[0]['count']
@@ -25,20 +31,12 @@ class SynthesisNode(BaseNode):
         peak = max([d['count'] for d in daily])
         return f"Daily Cases (30d): Started at {start}, Peaked at {peak}, Ended at {end}."
 
-    def execute(self, state: dict) -> dict:
-        output = {"synthesis_state": {}}
-
+    def _build_prompt(self, state: dict):
+        """The analysis prompt, or None (with a dummy synthesis) for off-topic requests."""
         # --- SAFEGUARD: SHORT CIRCUIT ---
         if state.get("is_off_topic", False):
             print(f"[{self.name}] 🛡️ Safeguard triggered: Off-topic. Returning dummy synthesis.")
-            output["synthesis_state"] = {
-                "synthesis_result": {
-                    "executive_summary": "Analysis skipped due to off-topic request.",
-                    "risk_assessment": "N/A",
-                    "deep_dive": "N/A"
-                }
-            }
-            return output
+            return None
 
         print(f"[{self.name}] Synthesizing Insights...")
 
@@ -48,39 +46,57 @@ class SynthesisNode(BaseNode):
         chart_str = self._format_chart_summary(state.get('chart_calc_state', {}))
 
         # 2. Build Prompt
-        user_prompt = ANALYSIS_PROMPT.format(
+        return ANALYSIS_PROMPT.format(
             metrics_section=metrics_str,
             news_section=news_str,
             chart_section=chart_str
         )
 
-        # 3. Invoke LLM
-        try:
-            raw_response = self._invoke_llm(SYSTEM_PROMPT, user_prompt)
-            
-            # 4. Parse JSON Output
-            # We use regex to find the JSON block in case the LLM adds chatter
-            match = re.search(r'\{.*\}', raw_response, re.DOTALL)
-            if match:
-                synthesis_result = json.loads(match.group(0))
-            else:
-                # Fallback: Treat whole response as the 'deep_dive'
-                synthesis_result = {
-                    "executive_summary": "Auto-generated summary unavailable.",
-                    "deep_dive": raw_response,
-                    "risk_assessment": "Unknown"
+    def _off_topic_output(self) -> dict:
+        return {
+            "synthesis_state": {
+                "synthesis_result": {
+                    "executive_summary": "Analysis skipped due to off-topic request.",
+                    "risk_assessment": "N/A",
+                    "deep_dive": "N/A"
                 }
-            output["synthesis_state"] = {"synthesis_result": synthesis_result}
-            print(f"[{self.name}] Analysis Complete.")
-            return output
+            }
+        }
 
-        except Exception as e:
-            print(f"[{self.name}] Error: {e}")
-            output["synthesis_state"] = {
+    def _output(self, result: SynthesisResult) -> dict:
+        # 4. Structured reply (validated against SynthesisResult)
+        print(f"[{self.name}] Analysis Complete.")
+        return {"synthesis_state": {"synthesis_result": result.model_dump()}}
+
+    def _error_output(self, e: Exception) -> dict:
+        print(f"[{self.name}] Error: {e}")
+        return {
+            "synthesis_state": {
                 "synthesis_result": {
                     "executive_summary": "Error during synthesis.",
                     "deep_dive": str(e),
                     "risk_assessment": "Error"
                 }
             }
-            return output
\ No newline at end of file
+        }
+
+    def execute(self, state: dict) -> dict:
+        user_prompt = self._build_prompt(state)
+        if user_prompt is None:
+            return self._off_topic_output()
+
+        # 3. Invoke LLM
+        try:
+            return self._output(self._invoke_structured(SYSTEM_PROMPT, user_prompt, SynthesisResult))
+        except Exception as e:
+            return self._error_output(e)
+
+    async def aexecute(self, state: dict) -> dict:
+        user_prompt = self._build_prompt(state)
+        if user_prompt is None:
+            return self._off_topic_output()
+
+        try:
+            return self._output(await self._ainvoke_structured(SYSTEM_PROMPT, user_prompt, SynthesisResult))
+        except Exception as e:
+            return self._error_output(e)
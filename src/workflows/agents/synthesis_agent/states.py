@@ -1,4 +1,5 @@
 from typing import TypedDict, List, Dict, Any
+from pydantic import BaseModel, Field
 
 class SynthesisAgentState(TypedDict):
     # Inputs (Context from upstream agents)
@@ -7,4 +8,10 @@ class SynthesisAgentState(TypedDict):
     # chart_data: Dict[str, Any]
     
     # Output (To be consumed by Report Maker)
-    synthesis_result: Dict[str, str] # Structured analysis (e.g., {'summary': '...', 'risk': '...'})
\ No newline at end of file
+    synthesis_result: Dict[str, str] # Structured analysis (e.g., {'summary': '...', 'risk': '...'})
+
+class SynthesisResult(BaseModel):
+    """Strategic analysis of the SynthesisAgent (structured LLM reply)."""
+    executive_summary: str = Field(description="High-level overview of the current situation, max 3 sentences")
+    deep_dive: str = Field(description="Metrics and trends correlated with the news")
+    risk_assessment: str = Field(description="Threat level (Low, Moderate, High, Critical) and 2 recommendations")
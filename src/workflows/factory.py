@@ -1,6 +1,6 @@
 import os
 import sys
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models.chat_models import BaseChatModel
 
 # Ensure 'src' is in path for internal imports
 current_file = os.path.abspath(__file__)
@@ -11,7 +11,9 @@ if src_dir not in sys.path:
 try:
     from settings import settings
     from workflows.workflow_config import Config
-    from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+    from internal.data_retrieval.ports.clinical_data import ClinicalDataPort
+    from internal.llm_pool import LLMPool, merge_node_llms
+    from workflows.shared.utils import build_data_adapter, build_llm, build_llm_pool
 except ImportError as e:
     raise ImportError(f"Factory Import Error: {e}. Check PYTHONPATH.")
 
@@ -29,8 +31,29 @@ class WorkflowFactory:
         return Config(
             openai_api_key=settings.OPENAI_API_KEY,
             db_uri=settings.DB_URI,
+            db_uris=settings.DB_URIS,
+            snapshot_dir=str(settings.SNAPSHOT_DIR),
+            analytics_dir=str(settings.ANALYTICS_DIR),
+            sql_engine=settings.SQL_ENGINE,
+            sql_cache_dir=str(settings.SQL_CACHE_DIR) if settings.SQL_CACHE_MAX_MB > 0 else None,
+            sql_cache_max_mb=settings.SQL_CACHE_MAX_MB,
+            sql_guard_max_rows=settings.SQL_GUARD_MAX_ROWS,
+            sql_guard_timeout_s=settings.SQL_GUARD_TIMEOUT_S,
+            sql_schema_sample_rows=settings.SQL_SCHEMA_SAMPLE_ROWS,
+            llm_cache_dir=str(settings.LLM_CACHE_DIR) if settings.LLM_CACHE_ENABLED else None,
+            llm_cache_max_mb=settings.LLM_CACHE_MAX_MB,
+            llm_cache_bypass=settings.LLM_CACHE_BYPASS,
+            fixture_mode=settings.FIXTURE_MODE,
+            fixture_dir=str(settings.FIXTURE_DIR),
+            fixture_latency_s=settings.FIXTURE_LATENCY_S,
+            intent_router_threshold=settings.INTENT_ROUTER_THRESHOLD,
+            metrics_mode=settings.METRICS_MODE,
+            charts_mode=settings.CHARTS_MODE,
+            sql_replay_dir=str(settings.SQL_REPLAY_DIR) if settings.SQL_REPLAY_ENABLED else None,
+            data_lookback_days=settings.DATA_LOOKBACK_DAYS,
             project_root=root_dir,
-            llm_model="gpt-4o",
+            llm_model=settings.LLM_MODEL,
+            node_llms=merge_node_llms(settings.NODE_LLMS),
 
             langfuse_enabled=settings.LANGFUSE_ENABLED,
             LANGFUSE_SECRET_KEY=settings.LANGFUSE_SECRET_KEY,
@@ -39,22 +62,22 @@ class WorkflowFactory:
         )
 
     @staticmethod
-    def get_llm(config: Config = None) -> ChatOpenAI:
+    def get_llm(config: Config = None) -> BaseChatModel:
         if not config:
             config = WorkflowFactory.get_config()
             
-        return ChatOpenAI(
-            model=config.llm_model,
-            temperature=config.temperature,
-            api_key=config.openai_api_key.get_secret_value()
-        )
+        return build_llm(config, temperature=config.temperature)
+
+    @staticmethod
+    def get_llm_pool(config: Config = None) -> LLMPool:
+        if not config:
+            config = WorkflowFactory.get_config()
+
+        return build_llm_pool(config)
 
     @staticmethod
-    def get_data_adapter(config: Config = None) -> SqliteSragAdapter:
+    def get_data_adapter(config: Config = None) -> ClinicalDataPort:
         if not config:
             config = WorkflowFactory.get_config()
             
-        return SqliteSragAdapter(
-            db_uri=config.db_uri,
-            root_dir=config.project_root
-        )
\ No newline at end of file
+        return build_data_adapter(config)
\ No newline at end of file
@@ -0,0 +1,180 @@
+# src/workflows/shared/utils.py
+
+import sqlite3
+from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+from internal.data_retrieval.adapters.federated_loader import FederatedSragAdapter
+from internal.data_retrieval.analytics_db import build_analytics_db
+from internal.data_retrieval.query_cache import get_query_cache
+from internal.data_retrieval.sql_replay import get_replay_store
+from internal.data_retrieval.sql_guard import SQLGuard
+from langchain_openai import ChatOpenAI
+from internal.llm_cache import get_llm_cache
+from internal.fixtures import FixtureChatModel, get_fixture_store
+from internal.llm_pool import LLMPool, NodeLLMSettings
+from tools.web_search_tool import create_search_tool
+from workflows.agents.intent_agent.router import IntentRouter
+
+try:
+    from langfuse.langchain import CallbackHandler
+    LANGFUSE_INSTALLED = True
+except ImportError:
+    LANGFUSE_INSTALLED = False
+    CallbackHandler = None
+
+
+def build_data_adapter(config):
+    """
+    Returns the SRAG data adapter for a workflow Config: a single-file
+    SqliteSragAdapter, or a FederatedSragAdapter when several yearly DBs
+    are configured in `db_uris`.
+    """
+    db_uris = config.db_uris or [config.db_uri]
+    common = dict(
+        root_dir=config.project_root,
+        snapshot_dir=config.snapshot_dir,
+        sort_by_date=config.sort_by_date,
+        lookback_days=config.data_lookback_days,
+    )
+
+    if len(db_uris) > 1:
+        return FederatedSragAdapter(db_uris=db_uris, **common)
+    return SqliteSragAdapter(db_uri=db_uris[0], **common)
+
+
+def prepare_analytics_db(df, config):
+    """
+    Builds (or reuses) the shared analytics DB for the loaded frame.
+    Returns its path, or None when `analytics_dir` is not configured, the
+    agents run on DuckDB, or the build fails, in which case the SQL nodes fall back to in-memory copies.
+    """
+    if not config.analytics_dir or config.sql_engine != "sqlite" or df.empty:
+        return None
+    try:
+        return build_analytics_db(df, config.analytics_dir)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[Analytics DB] Could not build the analytics DB: {e}")
+        return None
+
+
+def build_query_cache(config):
+    """SQL result cache shared by the SQL agent nodes, or None when disabled."""
+    return get_query_cache(config.sql_cache_dir, config.sql_cache_max_mb)
+
+
+def build_replay_store(config):
+    """Compiled-SQL store shared by the SQL agent nodes, or None when disabled."""
+    return get_replay_store(config.sql_replay_dir)
+
+
+def build_sql_guard(config):
+    """Cost guardrails shared by the SQL agent nodes."""
+    return SQLGuard(max_rows=config.sql_guard_max_rows, timeout_s=config.sql_guard_timeout_s)
+
+
+def attach_llm_cache(config, *nodes):
+    """
+    Puts the LLM reply cache in front of the nodes that have a TTL in
+    `llm_cache_ttls`. No-op when the cache is disabled.
+    """
+    cache = get_llm_cache(config.llm_cache_dir, config.llm_cache_max_mb)
+    if cache is None:
+        return
+    for node in nodes:
+        ttl_s = config.llm_cache_ttls.get(node.name)
+        if ttl_s:
+            node.use_response_cache(cache, ttl_s, bypass=config.llm_cache_bypass)
+
+
+def build_fixture_store(config):
+    """Record/replay store of LLM and search calls, or None when fixtures are off."""
+    fixtures = get_fixture_store(config.fixture_dir, config.fixture_mode, config.fixture_latency_s)
+    if fixtures is not None:
+        print(f"[Fixtures] LLM and search calls in {fixtures.mode} mode ({fixtures.fixture_dir}).")
+    return fixtures
+
+
+def build_llm(config, temperature: float = 0, fixtures=None, model: str = None, timeout_s: float = None, max_tokens: int = None):
+    """
+    A workflow chat model (`model` defaults to the config's llm_model).
+    Streamed, with token usage, for the run summary's telemetry; recording
+    or replaying through `fixtures` (default: the config's fixture store)
+    when fixtures are on.
+    """
+    llm = ChatOpenAI(
+        model=model or config.llm_model,
+        temperature=temperature,
+        timeout=timeout_s,
+        max_tokens=max_tokens,
+        api_key=config.openai_api_key.get_secret_value(),
+        streaming=config.llm_streaming,
+        stream_usage=True,
+    )
+    fixtures = fixtures or build_fixture_store(config)
+    if fixtures is None:
+        return llm
+    return FixtureChatModel(inner=llm, store=fixtures)
+
+
+def build_llm_pool(config, fixtures=None):
+    """
+    Chat model clients of a workflow, per node as set in `node_llms`
+    (see DEFAULT_NODE_LLMS); nodes configured alike share one client.
+    """
+    fixtures = fixtures or build_fixture_store(config)
+
+    def build(model, temperature, timeout_s, max_tokens):
+        return build_llm(config, temperature=temperature, fixtures=fixtures, model=model, timeout_s=timeout_s, max_tokens=max_tokens)
+
+    default = NodeLLMSettings(model=config.llm_model, temperature=config.temperature)
+    return LLMPool(build, default, config.node_llms)
+
+
+def build_search_tool(config, fixtures=None):
+    """News search tool, recorded or replayed through `fixtures` when fixtures are on."""
+    return create_search_tool(fixtures=fixtures or build_fixture_store(config))
+
+
+def build_intent_router(config):
+    """Local intent router of the conditional workflow, or None when disabled."""
+    if config.intent_router_threshold is None:
+        return None
+    return IntentRouter(threshold=config.intent_router_threshold)
+
+
+def build_tracing_callbacks(config, name: str = "Workflow") -> list:
+    """
+    Safely initializes Langfuse only if enabled, configured, and installed.
+    """
+    callbacks = []
+
+    # 1. Check Configuration Flag (Fastest check)
+    if not config.langfuse_enabled:
+        return callbacks
+
+    # 2. Check if Library is Installed
+    if not LANGFUSE_INSTALLED:
+        print(f"[{name}] ⚠️ Config enabled Langfuse, but 'langfuse' package is not installed.")
+        print(f"[{name}]    Run: pip install langfuse")
+        return callbacks
+
+    # 3. Check for Credentials
+    if config.LANGFUSE_PUBLIC_KEY and config.LANGFUSE_SECRET_KEY:
+        try:
+            print(f"[{name}] 🔍 Initializing Langfuse Tracing...")
+            # v3: Automatically reads from os.environ, which settings.py populated
+            handler = CallbackHandler()
+            callbacks.append(handler)
+        except Exception as e:
+            print(f"[{name}] ⚠️ Langfuse Init Failed: {e}")
+    else:
+        print(f"[{name}] ⚠️ Langfuse enabled but keys missing in .env")
+
+    return callbacks
+
+
+def build_run_config(config, telemetry) -> dict:
+    """
+    Invoke config of a workflow run: the in-process RunTelemetry always,
+    Langfuse tracing when enabled.
+    """
+    return {"callbacks": [telemetry] + build_tracing_callbacks(config, telemetry.workflow)}
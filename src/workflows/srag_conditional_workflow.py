@@ -1,16 +1,16 @@
 # src/workflows/srag_conditional_workflow.py
 
 import os
+import asyncio
 from typing import TypedDict, Dict, Any, List, Annotated
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 import operator
-from langfuse.langchain import CallbackHandler
 
 # 1. Import Configuration & Infrastructure
 from .workflow_config import Config
-from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+from .shared.utils import build_data_adapter, prepare_analytics_db, build_query_cache, build_replay_store, build_sql_guard, attach_llm_cache, build_fixture_store, build_llm_pool, build_search_tool, build_intent_router, build_run_config
 from tools.report_tool import setup_report_tool
+from internal.llm_usage import RunTelemetry
 
 # 2. Import All Specialized Agent Nodes
 from .agents.intent_agent.node import IntentNode
@@ -23,14 +23,6 @@ from .agents.report_maker.node import ReportMakerNode
 
 from .workflow_states import SragWorkflowState
 
-try:
-    from langfuse.langchain import CallbackHandler
-    LANGFUSE_INSTALLED = True
-except ImportError:
-    LANGFUSE_INSTALLED = False
-    # Define a dummy class to prevent NameError if used in type hinting (optional)
-    CallbackHandler = None
-
 # --- Routing Logic for Parallel Execution ---
 def route_based_on_intent(state: SragWorkflowState) -> List[str]:
     """
@@ -91,16 +83,12 @@ class SragWorkflow:
         self.config = config
         
         # --- A. Initialize Shared Infrastructure ---
-        self.llm = ChatOpenAI(
-            model=config.llm_model, 
-            temperature=0, 
-            api_key=config.openai_api_key.get_secret_value()
-        )
+        # Recorded / replayed LLM and search calls when fixtures are on
+        fixtures = build_fixture_store(config)
+        # One client per distinct node model settings (Config.node_llms)
+        self.llms = build_llm_pool(config, fixtures)
         
-        self.adapter = SqliteSragAdapter(
-            db_uri=config.db_uri, 
-            root_dir=config.project_root
-        )
+        self.adapter = build_data_adapter(config)
         
         # Initialize Tool for Report Maker
         template_dir = os.path.join(config.project_root, "reports", "templates")
@@ -108,13 +96,25 @@ class SragWorkflow:
         self.report_tool = setup_report_tool(template_dir, output_dir)
 
         # --- B. Initialize All Nodes ---
-        self.intent_node = IntentNode(self.llm)
-        self.metrics_node = MetricsAnalystNode(self.llm)
-        self.calc_node = ChartCalculatorNode(self.llm)
-        self.design_node = ChartDesignerNode(self.llm)
-        self.news_node = NewsResearcherNode(self.llm)
-        self.synth_node = SynthesisNode(self.llm)
+        self.intent_node = IntentNode(self.llms.get("IntentClassifier"), router=build_intent_router(config))
+        query_cache = build_query_cache(config)
+        replay_store = build_replay_store(config)
+        sql_guard = build_sql_guard(config)
+        self.metrics_node = MetricsAnalystNode(
+            self.llms.get("MetricsAnalyst"), sql_engine=config.sql_engine, query_cache=query_cache, mode=config.metrics_mode,
+            replay_store=replay_store, sql_guard=sql_guard, schema_sample_rows=config.sql_schema_sample_rows,
+            analysis_window_days=config.data_lookback_days,
+        )
+        self.calc_node = ChartCalculatorNode(
+            self.llms.get("ChartCalculator"), sql_engine=config.sql_engine, query_cache=query_cache, mode=config.charts_mode,
+            replay_store=replay_store, sql_guard=sql_guard, schema_sample_rows=config.sql_schema_sample_rows,
+        )
+        self.design_node = ChartDesignerNode(self.llms.get("ChartDesigner"))
+        self.news_node = NewsResearcherNode(self.llms.get("NewsResearcher"), search_tool=build_search_tool(config, fixtures))
+        self.synth_node = SynthesisNode(self.llms.get("SynthesisAgent"))
         self.maker_node = ReportMakerNode(self.report_tool)
+        attach_llm_cache(config, self.intent_node, self.design_node, self.news_node, self.synth_node)
+        print(f"[LLM Pool] {len(self.llms)} client(s): {self.llms.describe()}")
 
     def _construct_graph(self):
         def dispatcher_logic(state):
@@ -129,21 +129,21 @@ class SragWorkflow:
         
         # --- Add Nodes ---
         # workflow.add_node("intent", self.intent_node.execute)
-        workflow.add_node("intent_agent", self.intent_node.execute)
+        workflow.add_node("intent_agent", self.intent_node.as_runnable())
         workflow.add_node("dispatcher", dispatcher_logic)
 
-        workflow.add_node("metrics_analyst", self.metrics_node.execute)
-        workflow.add_node("chart_calculator", self.calc_node.execute)
-        workflow.add_node("chart_designer", self.design_node.execute)
-        workflow.add_node("news_researcher", self.news_node.execute)
+        workflow.add_node("metrics_analyst", self.metrics_node.as_runnable())
+        workflow.add_node("chart_calculator", self.calc_node.as_runnable())
+        workflow.add_node("chart_designer", self.design_node.as_runnable())
+        workflow.add_node("news_researcher", self.news_node.as_runnable())
 
         # Marker Nodes (For Synchronization)
         workflow.add_node("mark_metrics", mark_metrics_done)
         workflow.add_node("mark_news", mark_news_done)
         workflow.add_node("mark_charts", mark_charts_done)
 
-        workflow.add_node("synthesis_agent", self.synth_node.execute)
-        workflow.add_node("report_maker", self.maker_node.execute)
+        workflow.add_node("synthesis_agent", self.synth_node.as_runnable())
+        workflow.add_node("report_maker", self.maker_node.as_runnable())
 
 
 
@@ -193,36 +193,6 @@ class SragWorkflow:
         workflow.add_edge("report_maker", END)
         return workflow.compile()
 
-    def _get_callbacks(self):
-        """
-        Safely initializes Langfuse only if enabled, configured, and installed.
-        """
-        callbacks = []
-
-        # 1. Check Configuration Flag (Fastest check)
-        if not self.config.langfuse_enabled:
-            return callbacks
-
-        # 2. Check if Library is Installed
-        if not LANGFUSE_INSTALLED:
-            print(f"[{self.name}] ⚠️ Config enabled Langfuse, but 'langfuse' package is not installed.")
-            print(f"[{self.name}]    Run: pip install langfuse")
-            return callbacks
-
-        # 3. Check for Credentials
-        if self.config.LANGFUSE_PUBLIC_KEY and self.config.LANGFUSE_SECRET_KEY:
-            try:
-                print(f"[{self.name}] 🔍 Initializing Langfuse Tracing...")
-                # v3: Automatically reads from os.environ, which settings.py populated
-                handler = CallbackHandler()
-                callbacks.append(handler)
-            except Exception as e:
-                print(f"[{self.name}] ⚠️ Langfuse Init Failed: {e}")
-        else:
-            print(f"[{self.name}] ⚠️ Langfuse enabled but keys missing in .env")
-
-        return callbacks
-
     def load_data(self):
         """Helper to fetch data using the adapter before starting the graph."""
         print(f"[{self.name}] Loading Clinical Data...")
@@ -232,8 +202,8 @@ class SragWorkflow:
             print(f"[{self.name}] Data Load Error: {e}")
             raise e
 
-    def run(self, user_prompt: str=""):
-        """Main execution method."""
+    def _prepare_state(self, user_prompt: str = "") -> dict:
+        """Loads the data and builds the initial graph state (blocking I/O)."""
         # 1. Prepare Data
         df = self.load_data()
         
@@ -241,6 +211,7 @@ class SragWorkflow:
         initial_state = {
             "user_prompt": user_prompt,
             "raw_data": df,
+            "analytics_db_path": prepare_analytics_db(df, self.config),
             "include_metrics": False,
             "include_charts": False,
             "include_news": False,
@@ -251,15 +222,34 @@ class SragWorkflow:
             "synthesis_result": {},
             "branches_completed": []
         }
+        return initial_state
+
+    def run(self, user_prompt: str=""):
+        """Main execution method."""
+        initial_state = self._prepare_state(user_prompt)
         
         # 3. Execute Graph
-        run_config = {}
-        callbacks = self._get_callbacks()
-        if callbacks:
-            run_config["callbacks"] = callbacks
+        telemetry = RunTelemetry(self.name)
+        run_config = build_run_config(self.config, telemetry)
 
         print(f"[{self.name}] Starting Workflow Graph...")
         app = self._construct_graph()
         result = app.invoke(initial_state, config=run_config)
+        telemetry.write_summary(result.get("final_report_path"))
         
         return result
+
+    async def arun(self, user_prompt: str = ""):
+        """
+        Async counterpart of `run`: nodes run on the event loop, so the
+        branches (and many reports in one process) overlap on their I/O.
+        """
+        initial_state = await asyncio.to_thread(self._prepare_state, user_prompt)
+        telemetry = RunTelemetry(self.name)
+        run_config = build_run_config(self.config, telemetry)
+
+        print(f"[{self.name}] Starting Workflow Graph (async)...")
+        app = self._construct_graph()
+        result = await app.ainvoke(initial_state, config=run_config)
+        telemetry.write_summary(result.get("final_report_path"))
+        return result
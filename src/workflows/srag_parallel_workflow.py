@@ -1,15 +1,16 @@
 # src/workflows/srag_parallel_workflow.py
 
 import os
+import asyncio
 from typing import TypedDict, Dict, Any, List, Annotated
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 import operator
 
 # 1. Import Configuration & Infrastructure
 from .workflow_config import Config
-from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+from .shared.utils import build_data_adapter, prepare_analytics_db, build_query_cache, build_replay_store, build_sql_guard, attach_llm_cache, build_fixture_store, build_llm_pool, build_search_tool, build_run_config
 from tools.report_tool import setup_report_tool
+from internal.llm_usage import RunTelemetry
 
 # 2. Import All Specialized Agent Nodes
 from .agents.intent_agent.node import IntentNode
@@ -59,16 +60,12 @@ class SragWorkflow:
         self.config = config
         
         # --- A. Initialize Shared Infrastructure ---
-        self.llm = ChatOpenAI(
-            model=config.llm_model, 
-            temperature=0, 
-            api_key=config.openai_api_key.get_secret_value()
-        )
+        # Recorded / replayed LLM and search calls when fixtures are on
+        fixtures = build_fixture_store(config)
+        # One client per distinct node model settings (Config.node_llms)
+        self.llms = build_llm_pool(config, fixtures)
         
-        self.adapter = SqliteSragAdapter(
-            db_uri=config.db_uri, 
-            root_dir=config.project_root
-        )
+        self.adapter = build_data_adapter(config)
         
         # Initialize Tool for Report Maker
         template_dir = os.path.join(config.project_root, "reports", "templates")
@@ -77,12 +74,24 @@ class SragWorkflow:
 
         # --- B. Initialize All Nodes ---
         # self.intent_node = IntentNode(self.llm)
-        self.metrics_node = MetricsAnalystNode(self.llm)
-        self.calc_node = ChartCalculatorNode(self.llm)
-        self.design_node = ChartDesignerNode(self.llm)
-        self.news_node = NewsResearcherNode(self.llm)
-        self.synth_node = SynthesisNode(self.llm)
+        query_cache = build_query_cache(config)
+        replay_store = build_replay_store(config)
+        sql_guard = build_sql_guard(config)
+        self.metrics_node = MetricsAnalystNode(
+            self.llms.get("MetricsAnalyst"), sql_engine=config.sql_engine, query_cache=query_cache, mode=config.metrics_mode,
+            replay_store=replay_store, sql_guard=sql_guard, schema_sample_rows=config.sql_schema_sample_rows,
+            analysis_window_days=config.data_lookback_days,
+        )
+        self.calc_node = ChartCalculatorNode(
+            self.llms.get("ChartCalculator"), sql_engine=config.sql_engine, query_cache=query_cache, mode=config.charts_mode,
+            replay_store=replay_store, sql_guard=sql_guard, schema_sample_rows=config.sql_schema_sample_rows,
+        )
+        self.design_node = ChartDesignerNode(self.llms.get("ChartDesigner"))
+        self.news_node = NewsResearcherNode(self.llms.get("NewsResearcher"), search_tool=build_search_tool(config, fixtures))
+        self.synth_node = SynthesisNode(self.llms.get("SynthesisAgent"))
         self.maker_node = ReportMakerNode(self.report_tool)
+        attach_llm_cache(config, self.design_node, self.news_node, self.synth_node)
+        print(f"[LLM Pool] {len(self.llms)} client(s): {self.llms.describe()}")
 
     def _construct_graph(self):
         # Dispatcher Node: A lightweight pass-through to anchor the start
@@ -96,18 +105,18 @@ class SragWorkflow:
         # workflow.add_node("intent", self.intent_node.execute)
         workflow.add_node("dispatcher", dispatcher_node)
 
-        workflow.add_node("metrics_analyst", self.metrics_node.execute)
-        workflow.add_node("chart_calculator", self.calc_node.execute)
-        workflow.add_node("chart_designer", self.design_node.execute)
-        workflow.add_node("news_researcher", self.news_node.execute)
+        workflow.add_node("metrics_analyst", self.metrics_node.as_runnable())
+        workflow.add_node("chart_calculator", self.calc_node.as_runnable())
+        workflow.add_node("chart_designer", self.design_node.as_runnable())
+        workflow.add_node("news_researcher", self.news_node.as_runnable())
 
         # Marker Nodes (For Synchronization)
         workflow.add_node("mark_metrics", mark_metrics_done)
         workflow.add_node("mark_news", mark_news_done)
         workflow.add_node("mark_charts", mark_charts_done)
 
-        workflow.add_node("synthesis_agent", self.synth_node.execute)
-        workflow.add_node("report_maker", self.maker_node.execute)
+        workflow.add_node("synthesis_agent", self.synth_node.as_runnable())
+        workflow.add_node("report_maker", self.maker_node.as_runnable())
 
 
 
@@ -161,14 +170,15 @@ class SragWorkflow:
             print(f"[{self.name}] Data Load Error: {e}")
             raise e
 
-    def run(self):
-        """Main execution method."""
+    def _prepare_state(self) -> dict:
+        """Loads the data and builds the initial graph state (blocking I/O)."""
         # Prepare Data
         df = self.load_data()
         
         # Define Initial State
         initial_state = {
             "raw_data": df,
+            "analytics_db_path": prepare_analytics_db(df, self.config),
             "include_metrics": True,
             "include_charts": True,
             "include_news": True,
@@ -180,10 +190,31 @@ class SragWorkflow:
             "synthesis_result": {},
             "branches_completed": []
         }
+        return initial_state
+
+    def run(self):
+        """Main execution method."""
+        initial_state = self._prepare_state()
         
         # Execute Graph
+        telemetry = RunTelemetry(self.name)
         print(f"[{self.name}] Starting Workflow Graph...")
         app = self._construct_graph()
-        result = app.invoke(initial_state)
+        result = app.invoke(initial_state, config=build_run_config(self.config, telemetry))
+        telemetry.write_summary(result.get("final_report_path"))
         
         return result
+
+    async def arun(self):
+        """
+        Async counterpart of `run`: nodes run on the event loop, so the
+        branches (and many reports in one process) overlap on their I/O.
+        """
+        initial_state = await asyncio.to_thread(self._prepare_state)
+
+        telemetry = RunTelemetry(self.name)
+        print(f"[{self.name}] Starting Workflow Graph (async)...")
+        app = self._construct_graph()
+        result = await app.ainvoke(initial_state, config=build_run_config(self.config, telemetry))
+        telemetry.write_summary(result.get("final_report_path"))
+        return result
@@ -1,7 +1,10 @@
 # src/workflows/workflow_config.py
 
 from pydantic import BaseModel, Field, SecretStr
-from typing import Optional
+from typing import Optional, List, Dict, Literal
+from internal.llm_cache import DEFAULT_LLM_CACHE_TTLS
+from internal.fixtures import FIXTURE_MODES
+from internal.llm_pool import NodeLLMSettings, merge_node_llms
 
 class Config(BaseModel):
     """
@@ -11,9 +14,33 @@ class Config(BaseModel):
     openai_api_key: SecretStr = Field(..., description="API Key for OpenAI")
     llm_model: str = Field(default="gpt-4o", description="Model name to use")
     temperature: float = Field(default=0.0, description="LLM Temperature")
+    node_llms: Dict[str, NodeLLMSettings] = Field(default_factory=merge_node_llms, description="Model, temperature, timeout and max tokens per node name; unset fields (and nodes not listed) use llm_model / temperature")
+    llm_streaming: bool = Field(default=True, description="Stream LLM replies, so the run summary can report time to first token")
+    llm_cache_dir: Optional[str] = Field(default=None, description="Directory for the on-disk cache of LLM replies (None disables it)")
+    llm_cache_max_mb: int = Field(default=32, description="Size bound of the LLM reply cache; least recently used replies are evicted first")
+    llm_cache_ttls: Dict[str, float] = Field(default_factory=lambda: dict(DEFAULT_LLM_CACHE_TTLS), description="Seconds a cached reply stays fresh, per node name; nodes not listed are never cached")
+    llm_cache_bypass: bool = Field(default=False, description="Ignore cached LLM replies (fresh ones are still stored)")
+    fixture_mode: Literal[FIXTURE_MODES] = Field(default="off", description="Record LLM replies and search results into fixture_dir, replay them offline, or neither")
+    fixture_dir: Optional[str] = Field(default=None, description="Directory of the recorded LLM and search fixtures")
+    fixture_latency_s: Optional[float] = Field(default=None, description="Simulated latency of each replayed call (None uses the latency recorded)")
+    intent_router_threshold: Optional[float] = Field(default=0.6, description="Confidence from which requests are routed locally, without the intent LLM call (None disables the router)")
 
     # Data Settings
     db_uri: str = Field(..., description="URI for the SQLite database (e.g. sqlite:///path/to/db)")
+    db_uris: List[str] = Field(default_factory=list, description="Yearly SQLite databases federated into one SRAG table (empty uses db_uri only)")
+    snapshot_dir: Optional[str] = Field(default=None, description="Directory for columnar data snapshots (None disables the cache)")
+    sort_by_date: bool = Field(default=False, description="Return the SRAG frame ordered by DT_NOTIFIC")
+    data_lookback_days: Optional[int] = Field(default=None, description="Only load rows from the last N days of data (None loads everything)")
+    analytics_dir: Optional[str] = Field(default=None, description="Directory for the shared, indexed analytics DB the SQL agents query (None uses per-node in-memory copies)")
+    sql_engine: Literal["sqlite", "duckdb"] = Field(default="sqlite", description="Engine the SQL agents query: the SQLite analytics DB or DuckDB over the columnar frame")
+    sql_cache_dir: Optional[str] = Field(default=None, description="Directory for the on-disk cache of SQL agent query results (None disables it)")
+    sql_cache_max_mb: int = Field(default=64, description="Size bound of the SQL result cache; least recently used results are evicted first")
+    metrics_mode: Literal["deterministic", "agent", "crosscheck"] = Field(default="deterministic", description="How MetricsAnalystNode computes the KPIs: metrics engine, SQL agent, or both compared")
+    sql_guard_max_rows: int = Field(default=1000, description="Agent queries returning more rows are refused with an error the agent can correct from")
+    sql_guard_timeout_s: float = Field(default=15.0, description="Wall-clock limit per agent query; longer ones are interrupted")
+    sql_schema_sample_rows: int = Field(default=3, description="Sample rows per table in the schema injected into the SQL agents' prompt")
+    sql_replay_dir: Optional[str] = Field(default=None, description="Directory for compiled SQL of successful agent runs, replayed without LLM calls (None disables replay)")
+    charts_mode: Literal["deterministic", "agent"] = Field(default="deterministic", description="How ChartCalculatorNode builds the chart series: series engine or SQL agent")
     
     # Project Paths (for resolving relative DB paths)
     project_root: str = Field(..., description="Absolute path to project root")
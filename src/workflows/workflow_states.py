@@ -12,6 +12,7 @@ class SragWorkflowState(TypedDict):
     # Initial Input
     user_prompt: str
     raw_data: Any
+    analytics_db_path: str
     is_off_topic: bool
 
     include_metrics: bool
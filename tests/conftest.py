@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules import each other both as "src.<...>" and from inside src/.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,59 @@
+import os
+import time
+
+import pandas as pd
+
+from domain.sars.cleaning import clean_srag_frame
+from internal.data_retrieval.analytics_db import build_analytics_db, prune_analytics_dbs
+from internal.data_retrieval.connection_pool import file_version
+
+
+def _db(tmp_path, name, age_s):
+    path = tmp_path / f"analytics-{name}.db"
+    path.write_bytes(b"")
+    mtime = time.time() - age_s
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_prune_keeps_recent_and_young_dbs(tmp_path):
+    newest = [_db(tmp_path, f"new{i}", i) for i in range(3)]
+    young = _db(tmp_path, "young", 60)
+    old = _db(tmp_path, "old", 3 * 24 * 3600)
+    prune_analytics_dbs(str(tmp_path), max_dbs=3, grace_s=3600)
+    assert all(p.exists() for p in newest)
+    assert young.exists()
+    assert not old.exists()
+
+
+def test_prune_never_removes_kept_db(tmp_path):
+    kept = _db(tmp_path, "kept", 3 * 24 * 3600)
+    other = _db(tmp_path, "other", 3 * 24 * 3600)
+    prune_analytics_dbs(str(tmp_path), keep=str(kept), max_dbs=0, grace_s=0)
+    assert kept.exists()
+    assert not other.exists()
+
+
+def test_reuse_keeps_the_db_file_version(tmp_path):
+    df = clean_srag_frame(pd.DataFrame({
+        "DT_NOTIFIC": ["2024-03-01", "2024-03-02"], "EVOLUCAO": [1, 2], "UTI": [1, 2], "VACINA": [1, 9],
+    }))
+    db_path = build_analytics_db(df, str(tmp_path))
+    version = file_version(db_path)
+    time.sleep(0.01)
+    assert build_analytics_db(df, str(tmp_path)) == db_path
+    assert file_version(db_path) == version
+    assert os.path.exists(db_path + ".used")
+
+
+def test_prune_goes_by_last_use_not_db_mtime(tmp_path):
+    used = _db(tmp_path, "used", 3 * 24 * 3600)
+    (tmp_path / "analytics-used.db.used").write_bytes(b"")
+    stale = _db(tmp_path, "stale", 3 * 24 * 3600)
+    stale_marker = tmp_path / "analytics-stale.db.used"
+    stale_marker.write_bytes(b"")
+    old = time.time() - 3 * 24 * 3600
+    os.utime(stale_marker, (old, old))
+    prune_analytics_dbs(str(tmp_path), max_dbs=0, grace_s=3600)
+    assert used.exists()
+    assert not stale.exists() and not stale_marker.exists()
@@ -0,0 +1,40 @@
+import datetime
+
+import pandas as pd
+
+from domain.sars.cleaning import clean_srag_frame, reference_date_of
+
+TODAY = datetime.date.today()
+
+
+def _iso(days_from_today: int) -> str:
+    return (TODAY + datetime.timedelta(days=days_from_today)).isoformat()
+
+
+def _frame():
+    return pd.DataFrame({
+        "DT_NOTIFIC": [_iso(-10), _iso(-3), _iso(400), "2018-12-31"],
+        "DT_INTERNA": [_iso(-11), _iso(-1), _iso(-5), _iso(-20)],
+        "EVOLUCAO": [1, 2, 1, 1],
+    })
+
+
+def test_anchors_on_latest_non_future_notification():
+    df = clean_srag_frame(_frame())
+    assert df.attrs["latest_date"] == _iso(-3)
+    assert len(df) == 2
+    # Hospitalized after the latest notification: impossible for this data.
+    assert df["DT_INTERNA"].isna().tolist() == [False, True]
+
+
+def test_anchor_does_not_depend_on_file_times():
+    assert reference_date_of(clean_srag_frame(_frame())) == pd.Timestamp(_iso(-3))
+
+
+def test_explicit_reference_date_wins():
+    df = clean_srag_frame(_frame(), reference_date=_iso(0))
+    assert df["DT_INTERNA"].isna().tolist() == [False, False]
+
+
+def test_no_dates_falls_back_to_today():
+    assert reference_date_of(pd.DataFrame({"EVOLUCAO": [1]})) == pd.Timestamp(TODAY)
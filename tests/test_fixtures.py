@@ -0,0 +1,51 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from internal.fixtures import FixtureChatModel, FixtureStore
+from internal.structured_output import structured_llm, parse_reply
+from workflows.agents.intent_agent.states import IntentFlags
+
+FLAGS = {"include_metrics": True, "include_charts": False, "include_news": True, "is_off_topic": False}
+
+
+class RecordingChatOpenAI(ChatOpenAI):
+    """ChatOpenAI answering locally, keeping the request kwargs it got."""
+
+    requests: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.requests.append(kwargs)
+        tool_name = kwargs["tools"][0]["function"]["name"]
+        message = AIMessage(content="", tool_calls=[{"name": tool_name, "args": FLAGS, "id": "call_1"}])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def inner_model():
+    return RecordingChatOpenAI(model="gpt-4o-mini", api_key="test", requests=[])
+
+
+def test_structured_output_sends_the_production_request(tmp_path):
+    production = inner_model()
+    structured_llm(production, IntentFlags).invoke([HumanMessage(content="news only")])
+
+    inner = inner_model()
+    recorder = FixtureChatModel(inner=inner, store=FixtureStore(str(tmp_path), "record"))
+    reply = structured_llm(recorder, IntentFlags).invoke([HumanMessage(content="news only")])
+
+    assert inner.requests == production.requests
+    assert inner.requests[0]["tool_choice"]["function"]["name"] == "IntentFlags"
+    assert inner.requests[0]["tools"][0]["function"]["strict"] is True
+    assert parse_reply(reply)[0] == IntentFlags(**FLAGS)
+
+
+def test_structured_output_replays_without_the_model(tmp_path):
+    recorder = FixtureChatModel(inner=inner_model(), store=FixtureStore(str(tmp_path), "record"))
+    structured_llm(recorder, IntentFlags).invoke([HumanMessage(content="news only")])
+
+    inner = inner_model()
+    replayer = FixtureChatModel(inner=inner, store=FixtureStore(str(tmp_path), "replay", latency_s=0))
+    reply = structured_llm(replayer, IntentFlags).invoke([HumanMessage(content="news only")])
+
+    assert inner.requests == []
+    assert parse_reply(reply)[0] == IntentFlags(**FLAGS)
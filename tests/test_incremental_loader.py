@@ -0,0 +1,134 @@
+import sqlite3
+
+import pytest
+
+from internal.data_retrieval.adapters.datasus_loader_csv import DatasusCsvAdapter
+from internal.data_retrieval.adapters.incremental_loader import IncrementalSragIngestor, merge_date_ranges
+
+HEADER = "DT_NOTIFIC;EVOLUCAO;DT_INTERNA;UTI;VACINA"
+RELEASE = [
+    "01/03/2024;1;28/02/2024;2;1",
+    "01/03/2024;2;29/02/2024;1;2",
+    "02/03/2024;1;01/03/2024;2;1",
+    "02/03/2024;1;01/03/2024;2;1",
+    "05/03/2024;2;;1;9",
+]
+
+
+def _write(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text("\n".join([HEADER, *rows]) + "\n", encoding="latin1")
+    return str(path)
+
+
+def _rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT DT_NOTIFIC, EVOLUCAO, UTI FROM srag_records ORDER BY 1, 2, 3").fetchall()
+    conn.close()
+    return rows
+
+
+def _daily(db_path, date):
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM srag_daily WHERE date = ?", (date,)).fetchone()
+    conn.close()
+    return row
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    ingestor = IncrementalSragIngestor(str(tmp_path / "srag.db"))
+    ingestor.ingest(_write(tmp_path, "v1.csv", RELEASE), chunksize=2)
+    return ingestor
+
+
+def test_first_run_inserts_everything(ingestor):
+    assert len(_rows(ingestor.db_path)) == 5
+    assert ingestor.watermark()["watermark_date"] == "2024-03-05"
+
+
+def test_same_release_changes_nothing(tmp_path, ingestor):
+    result = ingestor.ingest(_write(tmp_path, "v1-again.csv", list(reversed(RELEASE))), chunksize=2)
+    assert result.changed_dates == []
+    assert (result.rows_inserted, result.rows_deleted) == (0, 0)
+
+
+def test_revised_date_is_reingested(tmp_path, ingestor):
+    first_run = ingestor.last_run_id()
+    before = _daily(ingestor.db_path, "2024-03-02")
+    revised = RELEASE[:3] + ["02/03/2024;2;01/03/2024;1;1", "02/03/2024;1;02/03/2024;2;2"] + RELEASE[4:]
+
+    result = ingestor.ingest(_write(tmp_path, "v2.csv", revised), chunksize=2)
+
+    assert result.revised_dates == ["2024-03-02"]
+    assert result.new_dates == [] and result.removed_dates == []
+    # One of the two identical rows survives; the other is replaced by two.
+    assert (result.rows_inserted, result.rows_deleted) == (2, 1)
+    assert [r for r in _rows(ingestor.db_path) if r[0] == "2024-03-02"] == [
+        ("2024-03-02", 1.0, 2.0), ("2024-03-02", 1.0, 2.0), ("2024-03-02", 2.0, 1.0),
+    ]
+    assert _daily(ingestor.db_path, "2024-03-02") != before
+    assert _daily(ingestor.db_path, "2024-03-01") is not None
+    assert ingestor.changes_since(first_run) == [("2024-03-02", "2024-03-02")]
+
+
+def test_removed_and_new_dates(tmp_path, ingestor):
+    release = RELEASE[:4] + ["06/03/2024;1;;2;1"]
+    result = ingestor.ingest(_write(tmp_path, "v3.csv", release), chunksize=2)
+    assert result.removed_dates == ["2024-03-05"]
+    assert result.new_dates == ["2024-03-06"]
+    assert {r[0] for r in _rows(ingestor.db_path)} == {"2024-03-01", "2024-03-02", "2024-03-06"}
+    assert _daily(ingestor.db_path, "2024-03-05") is None
+    assert ingestor.watermark()["watermark_date"] == "2024-03-06"
+
+
+def test_merge_date_ranges():
+    dates = ["", "2024-03-01", "2024-03-02", "2024-03-04"]
+    assert merge_date_ranges(dates) == [("2024-03-01", "2024-03-02"), ("2024-03-04", "2024-03-04")]
+
+
+def test_ingest_swaps_in_a_new_file(tmp_path, ingestor):
+    inode = (tmp_path / "srag.db").stat().st_ino
+    ingestor.ingest(_write(tmp_path, "v4.csv", RELEASE + ["07/03/2024;1;;2;1"]), chunksize=2)
+    assert (tmp_path / "srag.db").stat().st_ino != inode
+    assert not list(tmp_path.glob(".tmp-*"))
+
+
+def test_failed_ingest_leaves_store_untouched(tmp_path, ingestor):
+    broken = tmp_path / "broken.csv"
+    broken.write_text("DT_NOTIFIC;EVOLUCAO\n01/03/2024;1\n", encoding="latin1")
+    with pytest.raises(ValueError):
+        ingestor.ingest(str(broken))
+    assert len(_rows(ingestor.db_path)) == 5
+    assert ingestor.last_run_id() == 1
+    assert not list(tmp_path.glob(".tmp-*"))
+
+
+def test_bookkeeping_reads_before_first_run(tmp_path):
+    ingestor = IncrementalSragIngestor(str(tmp_path / "missing.db"))
+    assert ingestor.watermark() == {}
+    assert ingestor.last_run_id() == 0
+    assert ingestor.changes_since() == []
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_full_reload_keeps_run_history(tmp_path, ingestor):
+    release = RELEASE[:4] + ["06/03/2024;1;;2;1"]
+    DatasusCsvAdapter(_write(tmp_path, "full.csv", release)).write_to_sqlite(ingestor.db_path)
+
+    assert ingestor.last_run_id() == 2
+    assert ingestor.watermark() == {"watermark_date": "2024-03-06"}
+    assert ingestor.changes_since(1) == [("2024-03-01", "2024-03-02"), ("2024-03-05", "2024-03-06")]
+
+    # The next incremental run re-fingerprints the reloaded table once.
+    result = ingestor.ingest(_write(tmp_path, "v5.csv", release), chunksize=2)
+    assert result.run_id == 3
+    assert len(_rows(ingestor.db_path)) == 5
+
+
+def test_full_reload_of_a_plain_store_adds_no_bookkeeping(tmp_path):
+    db_path = str(tmp_path / "plain.db")
+    adapter = DatasusCsvAdapter(_write(tmp_path, "full.csv", RELEASE))
+    adapter.write_to_sqlite(db_path)
+    adapter.write_to_sqlite(db_path)
+    assert IncrementalSragIngestor(db_path).last_run_id() == 0
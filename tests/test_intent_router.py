@@ -0,0 +1,68 @@
+import pytest
+
+from workflows.agents.intent_agent.router import IntentRouter, label_flags
+
+
+@pytest.fixture
+def router():
+    return IntentRouter()
+
+
+@pytest.mark.parametrize("prompt", [
+    "don't include news, just give me the report",
+    "don’t include news, just give me the report",
+    "metrics and charts, no news",
+    "metrics and charts, nor news",
+    "taxas e graficos sem noticias",
+])
+def test_negated_requests_are_left_to_the_llm(router, prompt):
+    assert router.route(prompt) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "write python code to sort a list of numbers",
+    "what is the exchange rate of the dollar",
+    "show me a chart of bitcoin prices",
+    "tell me a joke",
+])
+def test_unrelated_requests_are_never_routed_on_topic(router, prompt):
+    decision = router.route(prompt)
+    assert decision is None or decision.flags["is_off_topic"]
+
+
+def test_english_so_is_not_only(router):
+    decision = router.route("so what is the mortality rate of srag patients")
+    assert decision is None or decision.confidence < 1.0
+
+
+def test_portuguese_so_is_only(router):
+    decision = router.route("só as métricas da srag")
+    assert decision.confidence == 1.0
+    assert decision.flags == label_flags("metrics")
+
+
+def test_portuguese_no_is_not_a_negation(router):
+    decision = router.route("status da SRAG no Brasil")
+    assert decision is not None
+    assert decision.flags == label_flags("full")
+
+
+@pytest.mark.parametrize("prompt, label", [
+    ("only charts of srag cases", "charts"),
+    ("create a full report", "full"),
+    ("relatório completo de SRAG", "full"),
+    ("what are the mortality and icu rates", "metrics"),
+    ("notícias recentes sobre surtos de srag", "news"),
+])
+def test_keyword_routes(router, prompt, label):
+    decision = router.route(prompt)
+    assert decision is not None and decision.layer == "keyword"
+    assert decision.flags == label_flags(label)
+
+
+def test_stats_count_hits_and_deferrals(router):
+    router.route("create a full report")
+    router.route("metrics and charts, no news")
+    router.record_llm(2.0)
+    assert (router.stats.hits, router.stats.deferred) == (1, 1)
+    assert router.stats.saved_seconds == 2.0
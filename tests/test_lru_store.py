@@ -0,0 +1,61 @@
+import time
+
+from internal.lru_store import SQLiteLRUStore, get_shared_cache
+from internal.llm_cache import LLMResponseCache, get_llm_cache
+from internal.data_retrieval.query_cache import SQLResultCache, get_query_cache
+
+
+def _store(tmp_path, max_bytes=10):
+    return SQLiteLRUStore(str(tmp_path / "store.db"), "entries", {"value": "TEXT NOT NULL"}, max_bytes, "Test")
+
+
+def test_put_get_and_condition(tmp_path):
+    store = _store(tmp_path)
+    store.put("a", 3, value="abc")
+    assert store.get("a", ["value"]) == ("abc",)
+    assert store.get("a", ["value"], "size > ?", (5,)) is None
+    assert store.get("missing", ["value"]) is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    store = _store(tmp_path)
+    store.put("a", 4, value="aaaa")
+    time.sleep(0.01)
+    store.put("b", 4, value="bbbb")
+    time.sleep(0.01)
+    store.get("a", ["value"])
+    store.put("c", 4, value="cccc")
+    assert store.get("b", ["value"]) is None
+    assert store.get("a", ["value"]) == ("aaaa",)
+    assert store.get("c", ["value"]) == ("cccc",)
+
+
+def test_oversized_entry_is_not_stored(tmp_path):
+    store = _store(tmp_path)
+    store.put("big", 11, value="x" * 11)
+    assert store.get("big", ["value"]) is None
+
+
+def test_shared_cache_per_class_and_directory(tmp_path):
+    llm = get_llm_cache(str(tmp_path))
+    sql = get_query_cache(str(tmp_path))
+    assert isinstance(llm, LLMResponseCache) and isinstance(sql, SQLResultCache)
+    assert get_llm_cache(str(tmp_path)) is llm
+    assert get_query_cache(str(tmp_path)) is sql
+    assert get_shared_cache(LLMResponseCache, "", 1, "Test") is None
+
+
+def test_llm_cache_ttl(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    cache.put("k", "Node", "model", "reply")
+    assert cache.get("k", ttl_s=60) == "reply"
+    assert cache.get("k", ttl_s=-1) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_sql_cache_normalized_sql(tmp_path):
+    cache = SQLResultCache(str(tmp_path))
+    cache.put("snap", "SELECT  1", "[(1,)]", 0.25)
+    assert cache.get("snap", "select 1") == ("[(1,)]", 0.25)
+    assert cache.get("other", "select 1") is None
+    assert cache.stats.hits == 1 and cache.stats.saved_seconds == 0.25
@@ -0,0 +1,22 @@
+from workflows.agents.metric_analyst.node import MetricsAnalystNode
+from workflows.agents.report_writer.node import _pct
+from workflows.agents.synthesis_agent.node import SynthesisNode
+
+
+def test_sanitize_keeps_unavailable_metrics():
+    cleaned = MetricsAnalystNode._sanitize_metrics(None, {"mortality_rate": None, "icu_rate": 0.12, "vaccination_rate": 0})
+    assert cleaned == {"mortality_rate": None, "icu_rate": 12.0, "vaccination_rate": 0}
+
+
+def test_unavailable_metrics_render_as_na():
+    assert _pct(None) == "n/a"
+    assert _pct(0.0) == "0.0%"
+    assert SynthesisNode._format_metrics(None, {"icu_rate": None}) == "- icu_rate: n/a"
+
+
+def test_metrics_name_their_window():
+    import pandas as pd
+    node = MetricsAnalystNode(None, analysis_window_days=400)
+    assert node._coverage(pd.DataFrame({"a": [1, 2]})) == {"total_cases_analyzed": 2, "analysis_window_days": 400}
+    formatted = SynthesisNode._format_metrics(None, {"analysis_window_days": None})
+    assert formatted == "- analysis_window_days: all available data"
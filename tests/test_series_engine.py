@@ -0,0 +1,30 @@
+import pandas as pd
+
+from domain.sars.series_engine import case_series, fill_series
+
+END = pd.Timestamp("2025-06-19")
+
+
+def _frame():
+    dates = ["2024-07-01", "2024-07-15", "2025-01-31", "2025-06-01", "2025-06-19", "2024-06-30"]
+    return pd.DataFrame({"DT_NOTIFIC": pd.to_datetime(dates).astype("datetime64[s]")})
+
+
+def test_monthly_window_ends_at_reference_month():
+    labels = [p["date"] for p in case_series(_frame(), "month", 12, END)]
+    assert labels[0] == "2024-07" and labels[-1] == "2025-06"
+
+
+def test_fill_matches_case_series():
+    df = _frame()
+    for granularity, periods in (("day", 30), ("month", 12), ("epiweek", 8)):
+        expected = case_series(df, granularity, periods, END)
+        rows = [{"date": d.strftime("%Y-%m-%d"), "count": 1} for d in df["DT_NOTIFIC"]]
+        assert fill_series(rows, granularity, periods, END) == expected
+
+
+def test_fill_accepts_month_labels_and_skips_bad_rows():
+    rows = [{"date": "2025-06", "count": 3}, {"date": "2025-06-02", "count": 2}, {"date": "n/a", "count": 5}]
+    series = fill_series(rows, "month", 12, END)
+    assert series[-1] == {"date": "2025-06", "count": 5}
+    assert sum(p["count"] for p in series) == 5
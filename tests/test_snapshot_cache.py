@@ -0,0 +1,45 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from internal.data_retrieval.adapters.snapshot_cache import ColumnarSnapshotCache
+
+
+def _mapped(array) -> bool:
+    base = array
+    while getattr(base, "base", None) is not None:
+        base = base.base
+        if isinstance(base, mmap.mmap):
+            return True
+    return False
+
+
+def test_round_trip_keeps_columns_mapped(tmp_path):
+    source = tmp_path / "srag.db"
+    source.write_bytes(b"data")
+    cache = ColumnarSnapshotCache(str(tmp_path / "snapshots"))
+    df = pd.DataFrame({
+        "EVOLUCAO": np.array([1, 2, 9], dtype=np.uint8),
+        "DT_NOTIFIC": pd.to_datetime(["2025-06-01", "2025-06-02", None]).astype("datetime64[s]"),
+        "SG_UF": ["SP", None, "RJ"],
+    })
+    df.attrs["latest_date"] = "2025-06-02"
+    cache.save(str(source), df)
+
+    loaded = cache.load(str(source))
+    assert loaded.attrs["latest_date"] == "2025-06-02"
+    assert loaded["EVOLUCAO"].tolist() == [1, 2, 9]
+    assert loaded["DT_NOTIFIC"].isna().tolist() == [False, False, True]
+    assert loaded["SG_UF"].astype(object).where(loaded["SG_UF"].notna(), None).tolist() == ["SP", None, "RJ"]
+    assert _mapped(loaded["EVOLUCAO"].to_numpy())
+    assert _mapped(loaded["SG_UF"].array.codes)
+
+
+def test_changed_source_misses(tmp_path):
+    source = tmp_path / "srag.db"
+    source.write_bytes(b"data")
+    cache = ColumnarSnapshotCache(str(tmp_path / "snapshots"))
+    cache.save(str(source), pd.DataFrame({"a": [1]}))
+    source.write_bytes(b"new data")
+    assert cache.load(str(source)) is None
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from langchain_community.utilities import SQLDatabase
+
+from internal.data_retrieval.sql_guard import SQLGuard
+
+ROWS = 300
+
+
+@pytest.fixture
+def db():
+    # Like the nodes' writable in-memory fallback DB.
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE srag_records (id INTEGER PRIMARY KEY, DT_NOTIFIC TEXT, EVOLUCAO INTEGER)")
+        conn.exec_driver_sql(
+            "INSERT INTO srag_records (DT_NOTIFIC, EVOLUCAO) "
+            f"WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {ROWS}) "
+            "SELECT date('2025-01-01', '+' || (i % 30) || ' days'), i % 3 FROM n"
+        )
+    return SQLDatabase(engine=engine)
+
+
+def count_rows(db):
+    with db._engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT COUNT(*) FROM srag_records").scalar()
+
+
+def test_read_query_runs(db):
+    result, reason = SQLGuard().run(db, "SELECT COUNT(*) FROM srag_records WHERE EVOLUCAO = 2;")
+    assert reason is None
+    assert result == f"[({ROWS // 3},)]"
+
+
+def test_recursive_cte_is_a_read(db):
+    result, reason = SQLGuard().run(db, "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 3) SELECT SUM(i) FROM n")
+    assert reason is None
+    assert result == "[(6,)]"
+
+
+@pytest.mark.parametrize("sql", [
+    "WITH x AS (SELECT 1) DELETE FROM srag_records",
+    "DELETE FROM srag_records",
+    "UPDATE srag_records SET EVOLUCAO = 0",
+    "INSERT INTO srag_records (EVOLUCAO) VALUES (1)",
+    "DROP TABLE srag_records",
+    "CREATE TABLE copy AS SELECT * FROM srag_records",
+    "ATTACH DATABASE ':memory:' AS other",
+    "PRAGMA query_only = OFF",
+    "SELECT 1; DELETE FROM srag_records",
+])
+def test_write_statements_are_refused(db, sql):
+    guard = SQLGuard()
+    result, reason = guard.run(db, sql)
+    assert reason == "not_read_only"
+    assert result.startswith("Error:")
+    assert count_rows(db) == ROWS
+    assert guard.trips["not_read_only"] == 1
+
+
+def test_connection_is_writable_again_after_the_guard(db):
+    SQLGuard().run(db, "DELETE FROM srag_records")
+    with db._engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM srag_records WHERE id = 1")
+    assert count_rows(db) == ROWS - 1
+
+
+def test_cartesian_join_is_refused(db):
+    result, reason = SQLGuard().run(db, "SELECT COUNT(*) FROM srag_records a, srag_records b")
+    assert reason == "cartesian_join"
+
+
+def test_row_cap(db):
+    result, reason = SQLGuard(max_rows=10).run(db, "SELECT id FROM srag_records")
+    assert reason == "too_many_rows"
+    _, reason = SQLGuard(max_rows=10).run(db, "SELECT id FROM srag_records LIMIT 10")
+    assert reason is None
+
+
+def test_timeout(db):
+    slow = (
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+        "SELECT SUM(i) FROM n"
+    )
+    result, reason = SQLGuard(timeout_s=0.2).run(db, slow)
+    assert reason == "timeout"
+
+
+def test_sql_errors_are_not_trips(db):
+    result, reason = SQLGuard().run(db, "SELECT missing_column FROM srag_records")
+    assert reason is None
+    assert "no such column" in result
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from langchain_community.utilities import SQLDatabase
+
+from internal.data_retrieval.sql_guard import SQLGuard
+from internal.data_retrieval.sql_replay import (
+    SQLReplayStore, _bind_rows, _bind_scalar, parametrize_sql, render_sql,
+)
+
+REFERENCE_DATE = "2025-06-19"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE srag_records (id INTEGER PRIMARY KEY, DT_NOTIFIC TEXT, EVOLUCAO INTEGER)")
+        conn.exec_driver_sql(
+            "INSERT INTO srag_records (DT_NOTIFIC, EVOLUCAO) VALUES "
+            "('2025-06-01', 1), ('2025-06-10', 2), ('2025-06-19', 2), ('2025-05-02', 1)"
+        )
+    return SQLDatabase(engine=engine)
+
+
+def test_bind_scalar_unique_value():
+    results = [("SELECT 4 AS total_cases, 2 AS deaths", [{"total_cases": 4, "deaths": 2}])]
+    binding = _bind_scalar("total_cases", 4, results)
+    assert binding["column"] == "total_cases"
+
+
+def test_bind_scalar_ambiguous_value_prefers_the_column_named_after_the_key():
+    results = [
+        ("SELECT 0 AS deaths, 0 AS icu_cases", [{"deaths": 0, "icu_cases": 0}]),
+    ]
+    binding = _bind_scalar("icu_cases", 0, results)
+    assert binding == {"key": "icu_cases", "kind": "scalar", "sql": results[0][0], "column": "icu_cases"}
+
+
+def test_bind_scalar_ambiguous_value_without_a_matching_name_is_not_bound():
+    results = [
+        ("SELECT 0 AS a", [{"a": 0}]),
+        ("SELECT 0 AS b", [{"b": 0}]),
+    ]
+    assert _bind_scalar("mortality_rate", 0, results) is None
+
+
+def test_bind_scalar_same_column_in_two_queries_is_not_bound():
+    results = [
+        ("SELECT 12.5 AS mortality_rate", [{"mortality_rate": 12.5}]),
+        ("SELECT 12.5 AS mortality_rate FROM srag_records LIMIT 1", [{"mortality_rate": 12.5}]),
+    ]
+    assert _bind_scalar("mortality_rate", 12.5, results) is None
+
+
+def test_bind_rows_maps_fields_to_columns():
+    rows = [{"day": "2025-06-01", "n": 1}, {"day": "2025-06-02", "n": 3}]
+    items = [{"date": "2025-06-01", "cases": 1}, {"date": "2025-06-02", "cases": 3}]
+    binding = _bind_rows("daily", items, [("SELECT ...", rows)])
+    assert binding["columns"] == {"date": "day", "cases": "n"}
+
+
+def test_bind_rows_needs_every_field():
+    rows = [{"day": "2025-06-01", "n": 1}]
+    items = [{"date": "2025-06-01", "cases": 2}]
+    assert _bind_rows("daily", items, [("SELECT ...", rows)]) is None
+
+
+def test_parametrized_dates_follow_the_reference_date():
+    sql = "SELECT COUNT(*) FROM srag_records WHERE DT_NOTIFIC >= '2025-05-20'"
+    template = parametrize_sql(sql, REFERENCE_DATE)
+    assert "{days:-30}" in template
+    assert render_sql(template, "2025-07-19").endswith("'2025-06-19'")
+
+
+def test_compile_then_replay(db, tmp_path):
+    store = SQLReplayStore(str(tmp_path))
+    statements = ["SELECT COUNT(*) AS total_cases FROM srag_records WHERE DT_NOTIFIC >= '2025-06-01'"]
+    assert store.compile(db, "MetricsAnalyst", "t1", "sqlite", statements, {"total_cases": 3}, REFERENCE_DATE)
+    assert store.replay(db, "MetricsAnalyst", "t1", "sqlite", REFERENCE_DATE) == {"total_cases": 3}
+
+
+def test_guard_trip_is_a_replay_miss(db, tmp_path):
+    store = SQLReplayStore(str(tmp_path))
+    statements = ["SELECT id, DT_NOTIFIC AS date FROM srag_records ORDER BY id"]
+    output = {"rows": [{"id": i, "date": d} for i, d in [(1, "2025-06-01"), (2, "2025-06-10"), (3, "2025-06-19"), (4, "2025-05-02")]]}
+    assert store.compile(db, "ChartCalculator", "t1", "sqlite", statements, output, REFERENCE_DATE)
+
+    guard = SQLGuard(max_rows=2)
+    assert store.replay(db, "ChartCalculator", "t1", "sqlite", REFERENCE_DATE, guard) is None
+    assert guard.trips == {"too_many_rows": 1}
+
+
+def test_compile_skips_statements_the_guard_refuses(db, tmp_path):
+    store = SQLReplayStore(str(tmp_path))
+    statements = ["WITH x AS (SELECT 1) DELETE FROM srag_records"]
+    assert not store.compile(db, "MetricsAnalyst", "t1", "sqlite", statements, {"total_cases": 4}, REFERENCE_DATE)
+    assert db.run("SELECT COUNT(*) FROM srag_records") == "[(4,)]"
+
+
+def test_toolkit_only_records_statements_for_a_replay_store(db):
+    from internal.data_retrieval.query_cache import CachedSQLDatabaseToolkit, CachedQuerySQLDatabaseTool
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    def query_tool(toolkit):
+        return next(t for t in toolkit.get_tools() if isinstance(t, CachedQuerySQLDatabaseTool))
+
+    llm = FakeListChatModel(responses=[""])
+    long_lived = CachedSQLDatabaseToolkit(db=db, llm=llm, guard=SQLGuard())
+    query_tool(long_lived).invoke("SELECT COUNT(*) FROM srag_records")
+    assert long_lived.executed_sql is None
+
+    recording = CachedSQLDatabaseToolkit(db=db, llm=llm, guard=SQLGuard(), executed_sql=[])
+    query_tool(recording).invoke("SELECT COUNT(*) FROM srag_records")
+    assert recording.executed_sql == ["SELECT COUNT(*) FROM srag_records"]
+    recording.reset_run_state()
+    assert recording.executed_sql == []
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from internal.data_retrieval.adapters.datasus_loader_csv import DatasusCsvAdapter
+from internal.data_retrieval.adapters.sqlite_loader import SqliteSragAdapter
+
+ROWS = [
+    ("2025-06-01 08:00:00", 1),
+    ("2025-06-10 23:59:59", 2),
+    ("2025-06-19 14:30:00", 2),
+    ("2025-05-02", 1),
+    ("2999-01-01", 1),  # Mistyped year: never the latest date.
+]
+
+
+def _adapter(tmp_path, rows):
+    path = tmp_path / "srag.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE srag_records (DT_NOTIFIC TEXT, EVOLUCAO INTEGER, UTI INTEGER, VACINA INTEGER)")
+        conn.executemany("INSERT INTO srag_records VALUES (?, ?, 1, 1)", rows)
+    conn.close()
+    return SqliteSragAdapter(f"sqlite:///{path}")
+
+
+def test_end_date_includes_values_with_time(tmp_path):
+    adapter = _adapter(tmp_path, ROWS)
+    df = adapter._query_srag_data(start_date="2025-06-01", end_date="2025-06-10")
+    assert adapter._iso_dates
+    assert sorted(df["DT_NOTIFIC"]) == ["2025-06-01 08:00:00", "2025-06-10 23:59:59"]
+
+
+def test_latest_date_includes_today_with_time(tmp_path):
+    adapter = _adapter(tmp_path, ROWS)
+    assert adapter.latest_date() == "2025-06-19"
+
+
+def test_lookback_anchors_on_latest_day(tmp_path):
+    adapter = _adapter(tmp_path, ROWS)
+    dates = set(adapter._query_srag_data(lookback_days=9)["DT_NOTIFIC"])
+    assert {"2025-06-10 23:59:59", "2025-06-19 14:30:00"} <= dates
+    assert "2025-06-01 08:00:00" not in dates
+
+
+@pytest.mark.parametrize("odd_value", ["19/06/2025", "20250619"])
+def test_mixed_formats_are_not_pushed_down(tmp_path, odd_value):
+    adapter = _adapter(tmp_path, ROWS + [(odd_value, 1)])
+    df = adapter._query_srag_data(start_date="2025-06-19", end_date="2025-06-19")
+    assert adapter._iso_dates is False
+    assert "2025-06-19 14:30:00" in set(df["DT_NOTIFIC"])
+
+
+def test_reader_never_writes_to_the_db(tmp_path):
+    adapter = _adapter(tmp_path, ROWS)
+    before = (tmp_path / "srag.db").stat()
+    adapter._query_srag_data(lookback_days=9)
+    adapter.latest_date()
+    after = (tmp_path / "srag.db").stat()
+    assert (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns)
+    with sqlite3.connect(tmp_path / "srag.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='index'").fetchone() == (0,)
+    conn.close()
+
+
+def test_built_db_has_date_index(tmp_path):
+    csv_path = tmp_path / "release.csv"
+    csv_path.write_text("DT_NOTIFIC;EVOLUCAO;DT_INTERNA;UTI;VACINA\n01/03/2024;1;;2;1\n", encoding="latin1")
+    DatasusCsvAdapter(str(csv_path)).write_to_sqlite(str(tmp_path / "built.db"))
+    with sqlite3.connect(tmp_path / "built.db") as conn:
+        indexes = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")]
+    conn.close()
+    assert "idx_srag_records_dt_notific" in indexes